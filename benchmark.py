@@ -0,0 +1,154 @@
+# times tableau build, solve and trace recording on seeded synthetic instances
+# (utils/synthetic.py), one json record per size and engine.
+#
+#   python benchmark.py                                      # every default size and engine
+#   python benchmark.py --sizes 30x10 1000x50 --engines bounded revised --output bench.json
+#
+# build/solve/trace times are the best of --repeat runs, the peak memory comes
+# from a separate tracemalloc run so it doesn't slow down the timed ones
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SIZES = ["30x10", "100x20", "300x30", "1000x50", "5000x100", "10000x100"]
+ENGINES = ["tableau", "bounded", "revised", "interior"]
+
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tableau build and simplex solve on synthetic catalogs.")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="projects x pollutants, e.g. 1000x50")
+    parser.add_argument("--engines", nargs="+", default=ENGINES, choices=ENGINES)
+    parser.add_argument("--trace", default="summary", choices=["summary", "pivot-log", "full"],
+                        help="trace mode timed against trace='off' (revised and interior always use summary)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-iter", type=int, default=None, help="iteration limit of every engine")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-tableau-mb", type=float, default=256.0, help="skip engines whose tableau is larger")
+    parser.add_argument("--output", default="-", help="json file, '-' for stdout")
+    return parser.parse_args(argv)
+
+
+def bestOf(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def benchEngine(engine, c, A, b, trace, repeat, maxIter=None):
+    from utils.simplex import SimplexSolver
+    from utils.boundedSimplex import BoundedSimplexSolver
+    from utils.revisedSimplex import RevisedSimplexSolver
+    from utils.interiorPoint import InteriorPointSolver
+    from utils.createTableau import createTableau, createBoundedTableau
+    from utils.instrument import profile
+
+    numVars = len(c)
+    limit = {} if maxIter is None else {'maxIter': maxIter}
+    if engine == "tableau":
+        build = lambda: createTableau(c, A, b)
+        solve = lambda T, mode: SimplexSolver().solve(T, numVars, c, trace=mode, **limit)
+    elif engine == "bounded":
+        build = lambda: createBoundedTableau(c, A, b)
+        solve = lambda T, mode: BoundedSimplexSolver().solveBounded(T, numVars, c, trace=mode, **limit)
+    elif engine == "revised":
+        # the revised and interior engines build nothing up front
+        trace = "summary"
+        build = lambda: None
+        solve = lambda T, mode: RevisedSimplexSolver().solve(c, A, b, trace=mode, **limit)
+    else:
+        trace = "summary"
+        build = lambda: None
+        solve = lambda T, mode: InteriorPointSolver(**limit).solve(c, A, b, trace=mode)
+
+    buildSeconds, tableau = bestOf(repeat, build)
+    solveSeconds, result = bestOf(repeat, lambda: solve(tableau, "off"))
+    tracedSeconds, _ = bestOf(repeat, lambda: solve(tableau, trace))
+    with profile() as stats:
+        solve(tableau, trace)
+    tracemalloc.start()
+    try:
+        solve(build(), trace)
+        peakBytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "trace": trace,
+        "status": result['status'],
+        "Z": float(result['Z']) if result['status'] == 'Optimal' else None,
+        "iterations": int(result['iterations']),
+        "crossoverIterations": int(result.get('crossoverIterations', 0)),
+        "buildSeconds": buildSeconds,
+        "solveSeconds": solveSeconds,
+        "traceSeconds": max(tracedSeconds - solveSeconds, 0.0),
+        "tableauBytes": 0 if tableau is None else int(tableau.nbytes),
+        "traceBytes": stats.counters['peakTraceBytes'],
+        "peakMemoryBytes": int(peakBytes)
+    }
+
+
+def tableauBytes(engine, numProjects, numPollutants):
+    if engine == "tableau":
+        return 8 * (numProjects + 1) * (numPollutants + 2 * numProjects + 2)
+    if engine == "bounded":
+        return 8 * (numPollutants + 1) * (numProjects + numPollutants + 1)
+    if engine == "interior":
+        # [A -I] and the normal matrix
+        return 8 * numPollutants * (numProjects + 2 * numPollutants)
+    return 8 * numPollutants * (numProjects + numPollutants)
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+    import numpy as np
+    from utils.synthetic import generateProblem
+
+    records = []
+    for size in args.sizes:
+        numProjects, numPollutants = (int(v) for v in size.lower().split("x"))
+        c, A, b = generateProblem(numProjects, numPollutants, seed=args.seed)
+        for engine in args.engines:
+            record = {"size": size, "numProjects": numProjects, "numPollutants": numPollutants, "engine": engine}
+            estimate = tableauBytes(engine, numProjects, numPollutants)
+            if estimate > args.max_tableau_mb * 2 ** 20:
+                record.update(status="Skipped", reason=f"tableau would take {estimate / 2 ** 20:,.0f} MiB")
+            else:
+                record.update(benchEngine(engine, c, A, b, args.trace, args.repeat, args.max_iter))
+            records.append(record)
+            if record['status'] == "Skipped":
+                print(f"{size:>10} {engine:>8}  skipped, {record['reason']}", file=sys.stderr)
+            else:
+                print(f"{size:>10} {engine:>8}  build {record['buildSeconds'] * 1000:9.2f} ms  "
+                      f"solve {record['solveSeconds'] * 1000:10.2f} ms  trace {record['traceSeconds'] * 1000:8.2f} ms  "
+                      f"{record['iterations']:5d} pivots  peak {record['peakMemoryBytes'] / 2 ** 20:8.1f} MiB"
+                      + ("" if record['status'] == "Optimal" else f"  {record['status']}"), file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "maxIter": args.max_iter,
+            "trace": args.trace
+        },
+        "results": records
+    }
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    json.dump(report, out, indent=2)
+    out.write("\n")
+    if out is not sys.stdout:
+        out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# headless entry point for cron jobs and pipelines, no streamlit involved.
+#
+#   python cli.py                                   # every project, default targets
+#   python cli.py --select "Wind Farm" --select "Boiler Retrofit" --engine bounded
+#   python cli.py --scenarios scenarios.jsonl --format csv > results.csv
+#
+# every scenario line is a json object, all keys are optional:
+#   {"id": "tight-co2", "projects": [...], "targets": {"CO2": 1200}, "costScale": 1.1, "costs": {"Wind Farm": 3500}}
+import argparse
+import csv
+import json
+import sys
+
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(description="Solve pollution reduction LPs without the dashboard.")
+    parser.add_argument("--projects", default="data/projects_matrix.csv", help="project matrix csv")
+    parser.add_argument("--targets", default="data/pollutant_targets.csv", help="pollutant targets csv")
+    parser.add_argument("--select", action="append", default=None, help="project to include (repeatable), default all")
+    parser.add_argument("--scenarios", default=None, help="jsonl file of scenarios, '-' for stdin")
+    parser.add_argument("--engine", default="bounded", choices=["tableau", "bounded", "revised", "interior", "auto"],
+                        help="'auto' picks bounded simplex or interior point by problem size")
+    parser.add_argument("--pricing", default="dantzig",
+                        choices=["dantzig", "steepest-edge", "devex", "partial", "bland"],
+                        help="entering column rule of the tableau engine")
+    parser.add_argument("--max-iter", type=int, default=None, help="iteration limit of the LP engine")
+    parser.add_argument("--presolve", action="store_true", help="presolve before building the tableau")
+    parser.add_argument("--integer", action="store_true", help="whole project units (branch-and-bound)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for --integer, --explain and --samples, default every cpu")
+    parser.add_argument("--explain", action="store_true",
+                        help="name the smallest conflicting targets and project limits of infeasible scenarios")
+    parser.add_argument("--samples", type=int, default=0,
+                        help="also solve this many randomly perturbed copies of every scenario (jsonl only)")
+    parser.add_argument("--cost-sigma", type=float, default=0.1, help="lognormal spread of the sampled costs")
+    parser.add_argument("--coeff-sigma", type=float, default=0.1, help="lognormal spread of the sampled reductions")
+    parser.add_argument("--format", default="jsonl", choices=["jsonl", "csv"])
+    parser.add_argument("--output", default="-", help="output file, '-' for stdout")
+    parser.add_argument("--cache-dir", default=None, help="reuse results stored under this directory")
+    parser.add_argument("--catalog-dir", default=".cache/catalog", help="where the csv files are kept as a binary matrix")
+    parser.add_argument("--profile", default=None, help="write build/solve counters of the run as json here")
+    args = parser.parse_args(argv)
+    if args.pricing != "dantzig" and args.engine != "tableau":
+        parser.error("--pricing only applies to --engine tableau")
+    if args.samples and args.format != "jsonl":
+        parser.error("--samples only applies to --format jsonl")
+    return args
+
+
+def readScenarios(path):
+    if path is None:
+        yield {}
+        return
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for lineNumber, line in enumerate(stream, 1):
+            line = line.strip()
+            if line:
+                scenario = json.loads(line)
+                scenario.setdefault("id", lineNumber)
+                yield scenario
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+    from utils.instrument import profile
+    with profile(args.profile):
+        run(args)
+
+
+def run(args):
+    # only numpy and pandas are needed from here on
+    import numpy as np
+    from utils.catalog import ProjectCatalog
+    from utils.solveLP import solveLP
+    from utils.presolve import solvePresolved
+    from utils.solveCache import SolveCache
+    from utils.branchAndBound import solveInteger
+    from utils.feasibility import findIIS
+    from utils.scenario import scenarioProblem
+    from utils.monteCarlo import runMonteCarlo
+
+    catalog = ProjectCatalog(args.projects, args.targets, storeDir=args.catalog_dir)
+    pollutantCols = catalog.pollutants
+    cache = SolveCache(cacheDir=args.cache_dir) if args.cache_dir else None
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    if args.format == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["id", "status", "Z", "project", "units"])
+
+    for scenario in readScenarios(args.scenarios):
+        try:
+            names, _, costVectorC, pollutantMatrix, targetPollutants = scenarioProblem(catalog, scenario,
+                                                                                             args.select)
+        except ValueError as e:
+            print(f"scenario {scenario.get('id')}: {e}", file=sys.stderr)
+            continue
+
+        result = None
+        if cache is not None:
+            key = cache.makeKey(names, costVectorC, pollutantMatrix.T, targetPollutants,
+                                engine=args.engine, trace="off", upperBound=20.0, presolve=args.presolve,
+                                integer=args.integer, pricing=args.pricing, maxIter=args.max_iter)
+            result = cache.get(key)
+        if result is None and args.integer:
+            result = solveInteger(costVectorC, pollutantMatrix.T, targetPollutants, workers=args.workers,
+                                  maxIter=args.max_iter)
+            if cache is not None:
+                cache.put(key, result)
+        elif result is None:
+            solve = solvePresolved if args.presolve else solveLP
+            result = solve(costVectorC, pollutantMatrix.T, targetPollutants, engine=args.engine, trace="off",
+                           pricing=args.pricing, maxIter=args.max_iter)
+            if cache is not None:
+                cache.put(key, result)
+        if result['status'] == 'IterationLimit':
+            print(f"scenario {scenario.get('id')}: stopped at the iteration limit, try --max-iter or --engine auto",
+                  file=sys.stderr)
+        elif result['status'] == 'Stalled':
+            print(f"scenario {scenario.get('id')}: {result['stalledNodes']} subproblems stopped at the iteration "
+                  f"limit, a cheaper plan may exist, try --max-iter", file=sys.stderr)
+
+        if result.get('crossoverStatus') == 'IterationLimit':
+            print(f"scenario {scenario.get('id')}: crossover stopped after {result['crossoverMaxIter']} pivots, "
+                  f"the units are the interior point solution, raise --max-iter for a vertex", file=sys.stderr)
+
+        conflict = None
+        if args.explain and result['status'] == 'Infeasible':
+            conflict = findIIS(pollutantMatrix.T, targetPollutants, workers=args.workers)
+
+        # only a plan that meets the targets has units
+        if result['status'] in ('Optimal', 'NodeLimit', 'Stalled'):
+            units = np.asarray(result['basicSolution'], dtype=float)
+            Z = float(result['Z'])
+        else:
+            units, Z = None, None
+        if args.format == "jsonl":
+            record = {
+                "id": scenario.get("id"),
+                "status": result['status'],
+                "Z": Z,
+                "iterations": int(result['iterations']) if 'iterations' in result else None,
+                "units": None if units is None else {name: float(u) for name, u in zip(names, units) if u > 1e-9}
+            }
+            if conflict is not None and conflict['status'] == 'Infeasible':
+                record["conflict"] = {
+                    "targets": {pollutantCols[k]: float(targetPollutants[k]) for k in conflict['targets']},
+                    "limits": [names[j] for j in conflict['limits']]
+                }
+            if args.samples:
+                # the last update of the run covers every sample
+                for sampled in runMonteCarlo(costVectorC, pollutantMatrix.T, targetPollutants,
+                                             numSamples=args.samples, costSigma=args.cost_sigma,
+                                             coeffSigma=args.coeff_sigma, workers=args.workers):
+                    pass
+                record["monteCarlo"] = {
+                    "samples": sampled['numSamples'],
+                    "feasibleRate": sampled['feasibleRate'],
+                    "meanZ": sampled['meanZ'] if sampled['feasibleRate'] > 0 else None,
+                    "percentiles": {str(q): float(z) for q, z in sampled['percentiles'].items()},
+                    "selectionFrequency": {name: float(f) for name, f in zip(names, sampled['selectionFrequency'])
+                                           if f > 0}
+                }
+            out.write(json.dumps(record) + "\n")
+        elif units is None:
+            writer.writerow([scenario.get('id'), result['status'], '', '', ''])
+        else:
+            for name, u in zip(names, units):
+                writer.writerow([scenario.get('id'), result['status'], Z, name, u])
+        out.flush()
+    if out is not sys.stdout:
+        out.close()
+
+
+if __name__ == "__main__":
+    main()
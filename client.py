@@ -0,0 +1,64 @@
+# sends scenarios to a running server.py and prints its answers, e.g. to
+# check the service or to load test it.
+#
+#   python client.py --scenarios scenarios.jsonl --concurrency 8 --metrics
+#   python client.py --socket /tmp/reduction.sock --repeat 100
+import argparse
+import json
+import sys
+import threading
+import time
+from cli import readScenarios
+
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(description="Send scenarios to a running server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="unix socket of the server")
+    parser.add_argument("--scenarios", default=None, help="jsonl file of scenarios, '-' for stdin, default one empty")
+    parser.add_argument("--repeat", type=int, default=1, help="send every scenario this many times")
+    parser.add_argument("--concurrency", type=int, default=1, help="requests in flight at once")
+    parser.add_argument("--metrics", action="store_true", help="print the server metrics to stderr at the end")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+    from utils.serviceClient import SolveClient
+
+    scenarios = list(readScenarios(args.scenarios)) * args.repeat
+    results = [None] * len(scenarios)
+    nextIndex = iter(range(len(scenarios)))
+    lock = threading.Lock()
+
+    # every thread keeps its own connection and takes the next scenario
+    def work():
+        with SolveClient(args.host, args.port, socketPath=args.socket) as client:
+            while True:
+                with lock:
+                    i = next(nextIndex, None)
+                if i is None:
+                    return
+                try:
+                    results[i] = client.solve(scenarios[i])
+                except (ValueError, RuntimeError, OSError) as e:
+                    results[i] = {"id": scenarios[i].get("id"), "error": str(e)}
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=work) for _ in range(max(1, args.concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    for result in results:
+        sys.stdout.write(json.dumps(result) + "\n")
+    print(f"{len(scenarios)} requests in {elapsed:.3f}s ({len(scenarios) / elapsed:,.1f}/s)", file=sys.stderr)
+    if args.metrics:
+        with SolveClient(args.host, args.port, socketPath=args.socket) as client:
+            print(json.dumps(client.metrics(), indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,22 +2,46 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
-from utils.simplex import SimplexSolver
+import os
+import json
+from utils.solveLP import solveLP
+from utils.simplex import SimplexSolver, PRICING_RULES
 from utils.createTableau import createTableau
-from time import sleep
+from utils.boundedSimplex import remapWarmStart
+from utils.solveCache import SolveCache
+from utils.presolve import solvePresolved
+from utils.branchAndBound import solveInteger
+from utils.solveJob import SolveJob
+from utils.catalog import ProjectCatalog
+from utils.feasibility import findIIS
 st.set_page_config(layout="wide", page_title="ReductionSolver")
 
-# function to load data
-@st.cache_data
+# the csv files converted once to a memory-mapped matrix, shared by every session
+@st.cache_resource
+def getCatalog():
+    return ProjectCatalog('data/projects_matrix.csv', 'data/pollutant_targets.csv')
+
+# function to load data, the catalog is only rebuilt when a csv file changed
 def loadData():
     try:
-        projectsDF = pd.read_csv('data/projects_matrix.csv')
-        targetsDF = pd.read_csv('data/pollutant_targets.csv')
-        pollutantCols = targetsDF['Pollutant'].tolist()
-        return projectsDF, targetsDF, pollutantCols
+        catalog = getCatalog()
+        catalog.refresh()
+        return catalog, catalog.projectsDF(), catalog.targetsDF(), catalog.pollutants
     except FileNotFoundError as e: # if those csv files doesnt exists
         st.error(f"Error loading data: {e}. Make sure 'data' folder and CSV files exist.")
-        return None, None, None
+        return None, None, None, None
+# one solve cache shared by every session, also kept on disk between runs
+@st.cache_resource
+def getSolveCache():
+    return SolveCache(maxEntries=64, cacheDir='.cache/solves')
+
+# frontiers keyed on their inputs, reruns from other widgets and tabs reuse them.
+# parametric simplex only runs on the dual tableau, whatever the solver mode
+@st.cache_data(max_entries=32)
+def traceFrontier(costVectorC, pollutantMatrix, base, direction, t_start, t_end):
+    tableau = createTableau(costVectorC, pollutantMatrix.T, base + t_start * direction)
+    return SimplexSolver().parametric(tableau, len(costVectorC), costVectorC, direction, t_start, t_end)
+
 # resetting fuction
 def clearSelections():
     st.session_state.project_selector = []
@@ -26,7 +50,7 @@ def clearSelections():
         st.session_state.solution_result = None
 
 # load the data
-projectsDF, targetsDF, pollutantCols = loadData()
+catalog, projectsDF, targetsDF, pollutantCols = loadData()
 
 # sidebar controls
 with st.sidebar:
@@ -53,7 +77,42 @@ with st.sidebar:
             st.button('Select All', on_click=selectAll, width='stretch')
         
         st.markdown("---")
+        solver_modes = {
+            "Tableau Simplex": ("tableau", "pivot-log"),
+            "Bounded Simplex": ("bounded", "pivot-log"),
+            "Revised Simplex (LU)": ("revised", "summary"),
+            "Interior Point": ("interior", "summary"),
+            "Automatic": ("auto", "pivot-log")
+        }
+        solver_mode = st.selectbox(
+            "Solver mode:",
+            options=list(solver_modes),
+            help="Bounded Simplex keeps the 20-unit project limits as variable bounds instead of tableau rows. "
+                 "Revised Simplex only factors the pollutant basis and is meant for large catalogs. "
+                 "Interior Point crosses the inside of the feasible region and then pivots onto a corner, "
+                 "it needs far fewer iterations on wide catalogs. Automatic picks by the size of the selection."
+        )
+        pricing_rule = st.selectbox(
+            "Pricing rule:",
+            options=PRICING_RULES,
+            disabled=solver_modes[solver_mode][0] != "tableau",
+            help="How Tableau Simplex picks the entering column. Steepest-edge and Devex usually need fewer "
+                 "iterations, the count is shown in the Simplex Iterations tab."
+        )
+        use_presolve = st.checkbox(
+            "Presolve",
+            value=False,
+            help="Drop dominated projects and redundant targets before building the tableau."
+        )
+        use_integer = st.checkbox(
+            "Whole project units",
+            value=False,
+            help="Only build whole projects. Solved by branch-and-bound on the bounded simplex, "
+                 "the solver mode and presolve are not used."
+        )
         solve_button = st.button("Solve", type="primary", width='stretch')
+        cacheStats = getSolveCache().stats()
+        st.caption(f"Solve cache: {cacheStats['hits'] + cacheStats['diskHits']} hits, {cacheStats['misses']} misses")
         # another section for individual inspection of a project
         st.markdown("---")
         st.header("2. Project Inspector")
@@ -72,44 +131,127 @@ st.title("City Pollution Reduction Solver")
 
 if projectsDF is not None:
     
-    # run solve if clicked
+    # start the solve on a background thread, cached problems are shown right away
     if solve_button:
         if not selected_project_names:
             st.warning("Please select at least one project from the sidebar.")
         else:
-            with st.spinner("Running Simplex Algorithm..."):
-                sleep(2) # waiting time loading
-                try:
-                    # filter the data
-                    filteredDF = projectsDF[projectsDF['Project Name'].isin(selected_project_names)].copy()
-                    filteredDF['Project Name'] = pd.Categorical(filteredDF['Project Name'], categories=selected_project_names, ordered=True)
-                    filteredDF = filteredDF.sort_values('Project Name')
-                    
-                    # prepare data(matrices)
-                    costVectorC = filteredDF['Costs'].values
-                    pollutantMatrix =  filteredDF[pollutantCols].values 
-                    targetPollutants = targetsDF.set_index('Pollutant').loc[pollutantCols, 'Target'].values
-                    n = len(costVectorC)
-
-                    # create the tableau
-                    tableau = createTableau(costVectorC, pollutantMatrix.T, targetPollutants)
-                    solver = SimplexSolver()
-                    result = solver.solve(tableau, numVars=n, costVectorC=costVectorC)
-                    
-                    # save to session state
-                    st.session_state.solution_result = {
-                        "result": result,
-                        "filteredDF": filteredDF,
-                        "costVectorC": costVectorC,
-                        "pollutantMatrix": pollutantMatrix, # save matrix
-                        "targetPollutants": targetPollutants,
-                        "n_vars": n,
-                        "pollutantCols": pollutantCols
-                    }
-
-                except Exception as e:
-                    st.error(f"An error occurred: {e}")
-                    st.session_state.solution_result = None
+            try:
+                # rows of the selected projects straight from the catalog matrix
+                indices = catalog.indicesOf(selected_project_names)
+                costVectorC, pollutantMatrix, targetPollutants = catalog.problem(indices)
+                filteredDF = projectsDF.iloc[indices]
+                n = len(costVectorC)
+
+                # create the tableau and solve
+                engine, trace = solver_modes[solver_mode]
+                pricing = pricing_rule if engine == "tableau" else "dantzig"
+                # identical problems are served from the cache
+                cache = getSolveCache()
+                cacheKey = cache.makeKey(filteredDF['Project Name'].tolist(), costVectorC, pollutantMatrix.T,
+                                         targetPollutants, engine=engine, trace=trace, upperBound=20.0,
+                                         presolve=use_presolve, integer=use_integer, pricing=pricing)
+                problem = {
+                    "filteredDF": filteredDF,
+                    "costVectorC": costVectorC,
+                    "pollutantMatrix": pollutantMatrix, # save matrix
+                    "targetPollutants": targetPollutants,
+                    "n_vars": n,
+                    "pollutantCols": pollutantCols
+                }
+                # a solve that is still running is replaced by this one, cached or not,
+                # so it can't finish later and overwrite what is shown
+                running = st.session_state.get('solve_job')
+                if running is not None:
+                    running["job"].cancel()
+                    st.session_state.solve_job = None
+                result = cache.get(cacheKey)
+                if result is not None:
+                    st.session_state.solution_result = dict(problem, result=result, performance=None, pivotEvents=[])
+                else:
+                    # re-optimize from the last bounded solve instead of starting over
+                    warmStart = None
+                    previous = st.session_state.get('solution_result')
+                    if engine == "bounded" and not use_integer and not use_presolve and previous is not None \
+                            and previous["result"].get('engine') == "bounded" \
+                            and previous["result"]['status'] == 'Optimal' and 'presolve' not in previous["result"]:
+                        warmStart = remapWarmStart(previous["result"], previous["filteredDF"]['Project Name'].tolist(),
+                                                   filteredDF['Project Name'].tolist(), previous["pollutantCols"], pollutantCols)
+
+                    def runSolve(job):
+                        if use_integer:
+                            return solveInteger(costVectorC, pollutantMatrix.T, targetPollutants, workers=os.cpu_count(),
+                                                onProgress=job.update)
+                        if use_presolve:
+                            return solvePresolved(costVectorC, pollutantMatrix.T, targetPollutants, engine=engine,
+                                                  trace=trace, pricing=pricing)
+                        return solveLP(costVectorC, pollutantMatrix.T, targetPollutants, engine=engine, trace=trace,
+                                       warmStart=warmStart, pricing=pricing, sensitivity=True)
+
+                    st.session_state.solve_job = {"job": SolveJob(runSolve).start(), "cacheKey": cacheKey, "problem": problem}
+
+            except Exception as e:
+                st.error(f"An error occurred: {e}")
+                st.session_state.solution_result = None
+
+    # progress of the background solve, only this part reruns while polling
+    @st.fragment(run_every=0.5)
+    def showSolveProgress():
+        pending = st.session_state.get('solve_job')
+        if pending is None:
+            return
+        job = pending["job"]
+        if job.running():
+            progress = job.progress
+            if 'nodes' in progress:
+                best = "none yet" if not np.isfinite(progress['Z']) else f"${progress['Z']:,.2f}"
+                st.progress(min(progress['nodes'] / 100000, 1.0),
+                            text=f"Branch-and-bound: {progress['nodes']} subproblems solved, best plan {best}")
+            elif progress:
+                st.progress(min(progress['iteration'] / 1000, 1.0),
+                            text=f"Iteration {progress['iteration']}, Z = {progress['Z']:,.2f}")
+            else:
+                st.progress(0.0, text="Building the tableau...")
+            if st.button("Cancel", key="cancel_solve"):
+                job.cancel()
+            return
+        # finished: store the result and redraw the whole page with it
+        st.session_state.solve_job = None
+        if job.status() == 'Done':
+            getSolveCache().put(pending["cacheKey"], job.result)
+            st.session_state.solution_result = dict(pending["problem"], result=job.result,
+                                                    performance=job.performance, pivotEvents=job.events,
+                                                    pivotEventStride=job.eventStride)
+        elif job.status() == 'Cancelled':
+            st.session_state.solve_notice = "Solve cancelled, the previous result is kept."
+        else:
+            st.session_state.solve_notice = f"An error occurred: {job.error}"
+        st.rerun()
+
+    # background search for the conflicting constraints of an infeasible result
+    @st.fragment(run_every=0.5)
+    def showConflictSearch():
+        data = st.session_state.get('solution_result') or {}
+        job = data.get('conflict_job')
+        if job is None:
+            return
+        if job.running():
+            st.progress(0.0, text=f"Searching for the conflicting constraints, {job.eventCount} pivots so far...")
+            if st.button("Cancel", key="cancel_conflict"):
+                job.cancel()
+            return
+        data['conflict_job'] = None
+        if job.status() == 'Done':
+            data['conflict'] = job.result
+        elif job.status() == 'Failed':
+            st.session_state.solve_notice = f"An error occurred: {job.error}"
+        st.rerun()
+
+    if st.session_state.get('solve_job') is not None:
+        showSolveProgress()
+    solve_notice = st.session_state.pop('solve_notice', None)
+    if solve_notice:
+        st.warning(solve_notice)
 
     # display results
     if 'solution_result' in st.session_state and st.session_state.solution_result is not None:
@@ -125,14 +267,47 @@ if projectsDF is not None:
         p_cols = data["pollutantCols"]
 
         st.header("Solver Results")
-        tab1, tab2, tab3, tab4 = st.tabs(["Optimal Solution", "Simplex Iterations", "Input Data", "About"])
+        with st.expander("Performance"):
+            performance = data.get("performance")
+            if performance is None:
+                st.write("Served from the solve cache, nothing was built or solved.")
+            else:
+                c1, c2, c3, c4 = st.columns(4)
+                c1.metric("Build Time", f"{performance['buildSeconds'] * 1000:,.2f} ms")
+                c2.metric("Solve Time", f"{performance['solveSeconds'] * 1000:,.2f} ms")
+                c3.metric("Pivots", f"{performance['pivots']}",
+                          help=f"{performance['degeneratePivots']} of them degenerate (Z did not move)")
+                c4.metric("Peak Trace Memory", f"{performance['peakTraceBytes'] / 1024:,.1f} KiB")
+                st.caption(f"Tableau {performance['tableauShape']}, {performance['peakTableauBytes'] / 1024:,.1f} KiB, "
+                           f"{performance['builds']} build(s) and {performance['solves']} solve(s).")
+                pivot_events = data.get("pivotEvents") or []
+                if pivot_events:
+                    eventsDF = pd.DataFrame(pivot_events)
+                    eventsDF['elapsedMs'] = eventsDF['elapsedNs'] / 1e6
+                    st.line_chart(eventsDF, x='elapsedMs', y='Z')
+                    if data.get("pivotEventStride", 1) > 1:
+                        st.caption(f"Every {data['pivotEventStride']}th pivot is shown, long solves are thinned out.")
+                    st.dataframe(eventsDF.drop(columns='elapsedNs'), hide_index=True, width='stretch')
+                st.download_button("Download JSON", json.dumps(performance, indent=2), "performance.json",
+                                   "application/json")
+        tab1, tab6, tab2, tab5, tab3, tab4 = st.tabs(["Optimal Solution", "Sensitivity", "Simplex Iterations",
+                                                      "Cost Frontier", "Input Data", "About"])
 
         # optimal Solution 
         with tab1:
-            tableauZ = result['finalTableau'][-1, -1]
+            tableauZ = result['Z']
             
+            if result['status'] == 'IterationLimit':
+                st.error(f"The solver stopped after {result['iterations']} iterations without reaching the optimum.")
+                st.write("Try the Interior Point or Automatic solver mode for large selections.")
+
+            elif result['status'] == 'NoIncumbent':
+                st.warning(f"Search stopped after {result['nodes']} nodes without finding a whole-unit plan yet. "
+                           f"No plan costs less than ${result['bestBound']:,.2f}.")
+                st.write("The targets can still be reachable with whole units, the search just ran out of nodes.")
+
             # check if feasible
-            if result['status'] == 'Infeasible' or tableauZ < -1e8:
+            elif result['status'] == 'Infeasible' or tableauZ < -1e8:
                 st.error("The problem is not feasible.")
                 st.write("The selected projects cannot meet the reduction targets.")
                 
@@ -148,11 +323,57 @@ if projectsDF is not None:
                     'Shortfall': targetPollutants - max_reduction
                 })
                 report_df = report_df[report_df['Shortfall'] > 1e-6]
-                st.warning("These pollutants failed to meet targets:")
-                st.dataframe(report_df, width='stretch')
+                if report_df.empty:
+                    st.info("Every target can be met on its own, only some of them together cannot.")
+                else:
+                    st.warning("These pollutants failed to meet targets:")
+                    st.dataframe(report_df, width='stretch')
+
+                # smallest set of targets and 20-unit limits that already conflict. a target out of reach
+                # on its own needs no LP, anything else is searched in the background on request
+                if 'conflict' not in data and not report_df.empty:
+                    data['conflict'] = findIIS(pollutantMatrix.T, targetPollutants, workers=1)
+                if 'conflict' not in data:
+                    if data.get('conflict_job') is None:
+                        if st.button("Find conflicting constraints",
+                                     help="Solves one small LP per target and project cap, can take a while "
+                                          "on large selections."):
+                            data['conflict_job'] = SolveJob(
+                                lambda job: findIIS(pollutantMatrix.T, targetPollutants, workers=1)).start()
+                            st.rerun()
+                    else:
+                        showConflictSearch()
+                conflict = data.get('conflict', {'status': None})
+                if conflict['status'] == 'Infeasible':
+                    st.subheader("Conflicting Constraints")
+                    st.write("These targets cannot all be met while these projects are capped at 20 units. "
+                             "Lowering any one of the targets or lifting any one of the caps removes this conflict.")
+                    c1, c2 = st.columns(2)
+                    c1.dataframe(pd.DataFrame({
+                        'Pollutant': [p_cols[k] for k in conflict['targets']],
+                        'Target': targetPollutants[conflict['targets']]
+                    }), hide_index=True, width='stretch')
+                    c2.dataframe(pd.DataFrame({
+                        'Capped Project': filteredDF['Project Name'].iloc[conflict['limits']].tolist()
+                    }), hide_index=True, width='stretch')
+                elif conflict['status'] == 'IterationLimit':
+                    st.caption("The conflicting constraints could not be narrowed down within the iteration limit.")
 
-            elif result['status'] == 'Optimal':
-                st.success("Optimal Solution Found!")
+            elif result['status'] in ('Optimal', 'NodeLimit', 'Stalled'):
+                if result['status'] == 'NodeLimit':
+                    st.warning(f"Search stopped after {result['nodes']} nodes, this is the best whole-unit plan found. "
+                               f"No plan costs less than ${result['bestBound']:,.2f}.")
+                elif result['status'] == 'Stalled':
+                    st.warning(f"{result['stalledNodes']} subproblems stopped at their iteration limit and were not "
+                               f"explored, this is the best whole-unit plan found. "
+                               f"No plan costs less than ${result['bestBound']:,.2f}.")
+                else:
+                    st.success("Optimal Solution Found!")
+                if result.get('engine') == "integer":
+                    st.caption(f"With fractional units the minimum cost would be ${result['relaxationZ']:,.2f}.")
+                if result.get('crossoverStatus') == 'IterationLimit':
+                    st.caption(f"Crossover stopped after {result['crossoverMaxIter']} pivots, the units are the "
+                               f"interior point solution rather than a corner of the feasible region.")
                 
                 # build the dataframe for visualization/analysis
                 solutionDF = pd.DataFrame({
@@ -209,7 +430,8 @@ if projectsDF is not None:
                 # final table with selection
                 st.subheader("Implementation Plan")
                 displayDF = chartDF.copy()
-                displayDF['Project Units (x_i)'] = displayDF['Project Units (x_i)'].map('{:,.4f}'.format)
+                units_format = '{:,.0f}' if result.get('engine') == "integer" else '{:,.4f}'
+                displayDF['Project Units (x_i)'] = displayDF['Project Units (x_i)'].map(units_format.format)
                 displayDF['Total Cost'] = displayDF['Total Cost'].map('${:,.2f}'.format)
                 
                 all_cols = displayDF.columns.tolist()
@@ -221,51 +443,151 @@ if projectsDF is not None:
                 def to_csv(df): return df.to_csv(index=False).encode('utf-8')
                 st.download_button("Download CSV", to_csv(displayDF), "solution.csv", "text/csv", width='stretch')
 
+        # shadow prices, reduced costs and ranges read off the final tableau
+        with tab6:
+            if result['status'] != 'Optimal' or 'reducedCosts' not in result:
+                st.info("Sensitivity is only available for an optimal solution.")
+            else:
+                project_names = filteredDF['Project Name'].tolist()
+                has_ranges = 'costRange' in result
+                st.subheader("Pollutant Targets")
+                st.caption("The shadow price is the extra cost of one more ton of reduction, "
+                           "it holds while the target stays inside its range.")
+                pollutantSensDF = pd.DataFrame({
+                    'Pollutant': p_cols,
+                    'Target': targetPollutants,
+                    'Shadow Price': result['duals']
+                })
+                if has_ranges:
+                    pollutantSensDF['Target From'] = result['targetRange'][:, 0]
+                    pollutantSensDF['Target To'] = result['targetRange'][:, 1]
+                st.dataframe(pollutantSensDF, width='stretch')
+
+                st.subheader("Projects")
+                st.caption("The reduced cost is how much cheaper an unused project has to get before it is used. "
+                           "The plan stays optimal while a cost stays inside its range.")
+                projectSensDF = pd.DataFrame({
+                    'Mitigation Project': project_names,
+                    'Project Units (x_i)': result['basicSolution'],
+                    'Cost': costVectorC,
+                    'Reduced Cost': result['reducedCosts']
+                })
+                if has_ranges:
+                    projectSensDF['Cost From'] = result['costRange'][:, 0]
+                    projectSensDF['Cost To'] = result['costRange'][:, 1]
+                st.dataframe(projectSensDF, width='stretch')
+
+                if not has_ranges:
+                    st.info("Ranges are not available for a presolved solve.")
+                else:
+                    # what-if answered from the ranges, no new solve
+                    st.subheader("What If")
+                    c1, c2 = st.columns(2)
+                    with c1:
+                        whatif_project = st.selectbox("Project:", project_names)
+                        j = project_names.index(whatif_project)
+                        change = st.number_input("Cost change (%):", value=-10.0, step=5.0)
+                        new_cost = costVectorC[j] * (1 + change / 100)
+                        low, high = result['costRange'][j]
+                        if low <= new_cost <= high:
+                            st.metric("New Minimum Cost (Z)", f"${result['Z'] + result['basicSolution'][j] * (new_cost - costVectorC[j]):,.2f}")
+                            st.write("The same plan stays optimal.")
+                        else:
+                            st.warning("Outside the cost range, the plan changes. Solve again with the new cost.")
+                    with c2:
+                        whatif_pollutant = st.selectbox("Pollutant:", list(p_cols))
+                        i = list(p_cols).index(whatif_pollutant)
+                        new_target = st.number_input("New target (tons):", value=float(targetPollutants[i]), step=1.0)
+                        low, high = result['targetRange'][i]
+                        if low <= new_target <= high:
+                            st.metric("New Minimum Cost (Z)", f"${result['Z'] + result['duals'][i] * (new_target - targetPollutants[i]):,.2f}")
+                            st.write("The same projects stay in the plan.")
+                        else:
+                            st.warning("Outside the target range, the plan changes. Solve again with the new target.")
+
         # tab 2 with the iterations of the simplex algo
         with tab2:
             st.subheader("Simplex Algorithm Steps")
             tableauList = result.get('tableauList', [])
             basicSols = result.get('basicSolutions', [])
             
-            if not tableauList:
+            pivotSummary = result.get('pivotSummary', [])
+            
+            if result.get('engine') == "integer":
+                st.info(f"Branch-and-bound solved {result['nodes']} subproblems "
+                        f"with {result['iterations']} dual simplex pivots in total.")
+            elif 'shortTargets' in result:
+                st.info("Some targets are out of reach of the selected projects, the problem was rejected "
+                        "before a tableau was built.")
+            elif not tableauList and pivotSummary:
+                # engines without a tableau only record the pivots
+                st.info(f"Solved in {len(pivotSummary)} iterations.")
+                st.dataframe(pd.DataFrame(pivotSummary), hide_index=True, width='stretch')
+            elif not tableauList and 'iterations' in result:
+                st.info(f"Solved in {result['iterations']} iterations, the iteration tableaus are not kept in the disk cache.")
+            elif not tableauList:
                 st.warning("No iterations recorded.")
             else:
                 st.info(f"Solved in {len(tableauList)-1} iterations.")
+                # the pivot log rebuilds a tableau from the pivot sequence when it is shown
+                pivot_log = result.get('pivotLog')
                 
                 # add a toggle to switch views
-                view_mode = st.radio("Display Mode:", ["Show All Iterations", "Slider View"], horizontal=True)
+                view_mode = st.radio("Display Mode:", ["Paged View", "Slider View"], horizontal=True)
+                changed_only = st.checkbox(
+                    "Only show the pivot row, pivot column and objective row",
+                    value=pivot_log is not None and tableauList[0].shape[1] > 200,
+                    disabled=pivot_log is None,
+                    help="Every other row only changes by a multiple of the pivot row."
+                )
                 st.markdown("---")
 
-                # slider view
-                if view_mode == "Slider View":
-                    index = st.slider("Select Iteration:", 0, len(tableauList)-1, 0)
-                    if index == 0:
+                # builds the dataframes of one iteration, only for the ones on screen
+                def showIteration(i):
+                    if i == 0:
                         st.markdown(f"### Initial Tableau")
                     else: 
-                        st.markdown(f"### Iteration {index}")
+                        st.markdown(f"### Iteration {i}")
                     
                     # show basic solution
-                    if index < len(basicSols) and index != 0:
-                        st.write("**Current Basic Solution:**")
-                        st.dataframe(pd.DataFrame([basicSols[index]]), hide_index=True)
+                    if i < len(basicSols) and i != 0:
+                        st.caption("**Current Basic Solution:**")
+                        st.dataframe(pd.DataFrame([basicSols[i]]), hide_index=True)
                     
-                    st.write("**Tableau:**")
-                    st.dataframe(pd.DataFrame(tableauList[index]))
-
-                # show all view
-                else:
-                    for i, tableau in enumerate(tableauList):
-                        if i == 0:
-                            st.markdown(f"### Initial Tableau")
+                    tableau = tableauList[i]
+                    if changed_only and i > 0:
+                        step = pivot_log.steps[i - 1]
+                        PR, PC = step[0], step[1]
+                        if isinstance(PR, str):
+                            # warm start: the objective row put back after the dual phase, no pivot
+                            st.caption("**Objective restored:**")
+                            st.dataframe(pd.DataFrame(tableau[[-1], :], index=["objective"]))
+                        elif PR < 0:
+                            # bounded simplex: a variable jumped to its other bound, no pivot
+                            st.caption(f"**Bound flip of column {step[3]}:**")
+                            st.dataframe(pd.DataFrame({f"column {step[3]}": tableau[:, step[3]]}))
                         else:
-                            st.markdown(f"### Iteration {i}")
-                        
-                        if i < len(basicSols) and i != 0:
-                            st.caption("**Current Basic Solution:**")
-                            st.dataframe(pd.DataFrame([basicSols[i]]), hide_index=True)
-                        
+                            st.caption(f"**Pivot on row {PR}, column {PC}:**")
+                            c1, c2 = st.columns([4, 1])
+                            c1.dataframe(pd.DataFrame(tableau[[PR, -1], :], index=[f"row {PR}", "objective"]))
+                            c2.dataframe(pd.DataFrame({f"column {PC}": tableau[:, PC]}))
+                    else:
                         st.caption("**Tableau:**")
                         st.dataframe(pd.DataFrame(tableau))
+
+                # slider view
+                if view_mode == "Slider View":
+                    index = st.slider("Select Iteration:", 0, len(tableauList)-1, 0)
+                    showIteration(index)
+
+                # paged view, only one page of iterations is rendered
+                else:
+                    c1, c2 = st.columns(2)
+                    page_size = c1.selectbox("Iterations per page:", [5, 10, 25], index=1)
+                    num_pages = (len(tableauList) + page_size - 1) // page_size
+                    page = c2.number_input(f"Page (of {num_pages}):", min_value=1, max_value=num_pages, value=1)
+                    for i in range((page - 1) * page_size, min(page * page_size, len(tableauList))):
+                        showIteration(i)
                         st.markdown("---")
 
         # about section
@@ -354,6 +676,55 @@ if projectsDF is not None:
 
             st.markdown("---")
      
+        # minimum cost over a whole range of targets, one pivot per breakpoint
+        with tab5:
+            st.subheader("Cost vs Target Frontier")
+            frontier_target = st.selectbox("Target to vary:", ["All targets (scaled together)"] + list(p_cols))
+            if frontier_target in p_cols:
+                k = list(p_cols).index(frontier_target)
+                direction = np.zeros(len(p_cols))
+                direction[k] = 1.0
+                base = targetPollutants * (1 - direction)
+                t_max = float(max(3 * targetPollutants[k], 1.0))
+                t_range = st.slider(f"{frontier_target} target (tons):", 0.0, t_max, (0.0, t_max))
+                t_title = f"{frontier_target} target (tons)"
+            else:
+                direction = np.asarray(targetPollutants, dtype=float)
+                base = np.zeros(len(p_cols))
+                t_range = st.slider("Fraction of every target:", 0.0, 2.0, (0.0, 1.5), step=0.05)
+                t_title = "Fraction of targets"
+
+            t_start, t_end = t_range
+            # only traced once asked for, then again whenever the range changes
+            if not data.get('frontier_on') and st.button("Trace frontier"):
+                data['frontier_on'] = True
+            if not data.get('frontier_on'):
+                st.caption("Traces the minimum cost over the range with parametric simplex.")
+            else:
+                frontier = traceFrontier(costVectorC, pollutantMatrix, base, direction, t_start, t_end)
+                frontierDF = frontier['frontier']
+                if frontierDF.empty and frontier['status'] == 'IterationLimit':
+                    st.error("The simplex solve at the start of this range hit its iteration limit.")
+                elif frontierDF.empty:
+                    st.error("The targets cannot be met anywhere in this range.")
+                else:
+                    if frontier['status'] == 'IterationLimit':
+                        st.warning(f"Stopped after {len(frontierDF)} breakpoints, the frontier ends at "
+                                   f"{frontierDF['t'].iloc[-1]:,.4f}.")
+                    if frontier['tInfeasible'] is not None:
+                        st.warning(f"The targets cannot be met beyond {frontier['tInfeasible']:,.4f}.")
+                    st.write(f"**{len(frontierDF)} breakpoints**, the cost is linear between them.")
+                    frontier_chart = alt.Chart(frontierDF).mark_line(point=True).encode(
+                        x=alt.X('t', title=t_title),
+                        y=alt.Y('Z', title='Minimum Total Cost (Z)'),
+                        tooltip=[alt.Tooltip('t', format=',.4f'), alt.Tooltip('Z', format='$,.2f')]
+                    ).interactive()
+                    st.altair_chart(frontier_chart, width='stretch')
+                    with st.expander("Breakpoints"):
+                        breakpointDF = frontierDF.copy()
+                        breakpointDF.columns = [t_title, 'Z'] + filteredDF['Project Name'].tolist()
+                        st.dataframe(breakpointDF, width='stretch')
+
         # view the input data
         with tab3:
             st.subheader("Raw Data")
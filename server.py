@@ -0,0 +1,53 @@
+# local solve service for scripts and other dashboards, no streamlit involved.
+#
+#   python server.py                                # http on 127.0.0.1:8765
+#   python server.py --socket /tmp/reduction.sock   # unix socket instead
+#
+#   curl -s localhost:8765/solve -d '{"targets": {"CO2": 1200}}'
+#   curl -s localhost:8765/metrics
+#
+# POST /solve takes a scenario like cli.py (or a list of them) and answers
+# with the same record cli.py writes. workers start warm, identical requests in
+# flight share one solve and requests on the same selection are batched
+import argparse
+import asyncio
+import sys
+
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(description="Serve pollution reduction LPs over local http.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on, keep it local")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="listen on this unix socket instead of tcp")
+    parser.add_argument("--projects", default="data/projects_matrix.csv", help="project matrix csv")
+    parser.add_argument("--targets", default="data/pollutant_targets.csv", help="pollutant targets csv")
+    parser.add_argument("--catalog-dir", default=".cache/catalog", help="where the csv files are kept as a binary matrix")
+    parser.add_argument("--engine", default="tableau", choices=["tableau", "bounded", "revised", "interior", "auto"],
+                        help="engine of scenarios without an \"engine\" key")
+    parser.add_argument("--workers", type=int, default=None, help="solver processes, default every cpu")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0,
+                        help="how long a batch waits for more requests on the same selection")
+    parser.add_argument("--max-batch", type=int, default=64, help="scenarios per batch")
+    parser.add_argument("--max-body-kb", type=int, default=1024, help="larger request bodies are refused (413)")
+    parser.add_argument("--read-timeout", type=float, default=30.0,
+                        help="seconds a client gets to send a request, idle connections are closed after it")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+    from utils.solveService import SolveService, serve
+
+    service = SolveService(args.projects, args.targets, catalogDir=args.catalog_dir, workers=args.workers,
+                           engine=args.engine, batchWindow=args.batch_window_ms / 1000, maxBatch=args.max_batch,
+                           maxBodyBytes=args.max_body_kb * 1024, readTimeout=args.read_timeout)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    onReady = lambda server: print(f"serving on {where} with {service.workers} warm workers", file=sys.stderr)
+    try:
+        asyncio.run(serve(service, args.host, args.port, socketPath=args.socket, onReady=onReady))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
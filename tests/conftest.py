@@ -0,0 +1,75 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.loadData import loadProblemData, prepareProblem
+from utils.feasibility import findIIS
+
+PROJECTS_PATH = os.path.join(ROOT, "data", "projects_matrix.csv")
+TARGETS_PATH = os.path.join(ROOT, "data", "pollutant_targets.csv")
+
+
+@pytest.fixture(scope="session")
+def problemData():
+    return loadProblemData(PROJECTS_PATH, TARGETS_PATH)
+
+
+# random project subsets of data/ with their targets scaled so that some of
+# them are infeasible, as (cost, pollutants x projects, targets)
+def randomProblems(problemData, count, seed):
+    projectsDF, targetsDF, pollutantCols = problemData
+    allNames = projectsDF['Project Name'].tolist()
+    rng = np.random.default_rng(seed)
+    problems = []
+    for _ in range(count):
+        names = list(rng.choice(allNames, size=int(rng.integers(5, len(allNames) + 1)), replace=False))
+        _, costVectorC, pollutantMatrix, targetPollutants = prepareProblem(projectsDF, targetsDF, pollutantCols,
+                                                                           names)
+        scale = rng.uniform(0.1, 1.2)
+        problems.append((np.asarray(costVectorC, dtype=float), pollutantMatrix.T.astype(float),
+                         np.round(targetPollutants * scale)))
+    return problems
+
+
+# small problems with negative coefficients (projects that add a pollutant)
+# and per-project limits, as (cost, pollutants x projects, targets, limits).
+# the all-limits check can't decide most of them
+def mixedSignProblems(count, seed):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for _ in range(count):
+        numProjects, numPollutants = int(rng.integers(3, 25)), int(rng.integers(2, 8))
+        A = rng.integers(-2, 4, (numPollutants, numProjects)).astype(float)
+        A *= rng.random(A.shape) < 0.6
+        upper = np.round(rng.uniform(1, 20, numProjects))
+        b = np.round(np.clip(A, 0, None) @ upper * rng.uniform(0.2, 1.1, numPollutants))
+        problems.append((np.round(rng.uniform(1, 100, numProjects)), A, b, upper))
+    return problems
+
+
+# checks a result without trusting any engine: an optimal x must meet the
+# targets and limits and its cost must equal the objective of the dual
+# solution built from the shadow prices, an infeasible one needs a farkas
+# certificate y >= 0 with b.y > u.max(A'y, 0)
+def assertSolved(result, costVectorC, pollutantMatrix, targetPollutants, upperBound=20.0, tol=1e-6):
+    numProjects = len(costVectorC)
+    upper = np.broadcast_to(np.asarray(upperBound, dtype=float), (numProjects,))
+    if result['status'] == 'Optimal':
+        x = np.asarray(result['basicSolution'])[:numProjects]
+        scale = 1 + np.abs(targetPollutants).max()
+        assert np.all(x >= -tol) and np.all(x <= upper + tol)
+        assert np.all(pollutantMatrix @ x >= targetPollutants - tol * scale)
+        Z = costVectorC @ x
+        assert result['Z'] == pytest.approx(Z, rel=tol, abs=tol)
+        y = np.maximum(np.asarray(result['duals'], dtype=float), 0.0)
+        w = np.maximum(pollutantMatrix.T @ y - costVectorC, 0.0)
+        assert targetPollutants @ y - upper @ w == pytest.approx(Z, rel=tol, abs=tol)
+    else:
+        assert result['status'] == 'Infeasible'
+        y = findIIS(pollutantMatrix, targetPollutants, upper)['certificate']
+        assert np.all(y >= 0)
+        assert targetPollutants @ y > upper @ np.maximum(pollutantMatrix.T @ y, 0.0)
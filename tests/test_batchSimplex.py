@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from conftest import randomProblems, assertSolved
+from utils.batchSimplex import BatchSimplexSolver
+from utils.createTableau import createTableau, createTableauBatch
+from utils.solveLP import solveLP
+
+
+def checkBatch(result, costs, matrices, targets):
+    for s in range(len(costs)):
+        reference = solveLP(costs[s], matrices[s], targets[s], engine="bounded", trace="off")
+        assertSolved(reference, costs[s], matrices[s], targets[s])
+        assert result['status'][s] == reference['status']
+        if reference['status'] != 'Optimal':
+            assert result['Z'][s] == np.inf
+            continue
+        x = result['basicSolution'][s]
+        assert np.all(x >= -1e-9) and np.all(x <= 20.0 + 1e-9)
+        assert np.all(matrices[s] @ x >= targets[s] - 1e-6)
+        assert result['Z'][s] == pytest.approx(costs[s] @ x, rel=1e-9)
+        assert result['Z'][s] == pytest.approx(reference['Z'], rel=1e-9)
+
+
+# stacked costs and targets, some of the scenarios infeasible
+def testStackedScenarios(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=8)[0]
+    rng = np.random.default_rng(8)
+    costs = costVectorC * rng.uniform(0.8, 1.3, (60, len(costVectorC)))
+    targets = np.round(targetPollutants * rng.uniform(0.5, 4.0, (60, len(targetPollutants))))
+    np.testing.assert_array_equal(createTableauBatch(costVectorC, pollutantMatrix, targetPollutants)[0],
+                                  createTableau(costVectorC, pollutantMatrix, targetPollutants))
+    result = BatchSimplexSolver().solve(createTableauBatch(costs, pollutantMatrix, targets), len(costVectorC))
+    assert set(result['status']) == {'Optimal', 'Infeasible'}
+    checkBatch(result, costs, [pollutantMatrix] * len(costs), targets)
+
+
+# a pollutant matrix per scenario
+def testScenarioMatrices(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=9)[0]
+    rng = np.random.default_rng(9)
+    matrices = pollutantMatrix * rng.uniform(0.7, 1.1, (30,) + pollutantMatrix.shape)
+    result = BatchSimplexSolver().solve(createTableauBatch(costVectorC, matrices, targetPollutants),
+                                        len(costVectorC))
+    checkBatch(result, [costVectorC] * len(matrices), matrices, [targetPollutants] * len(matrices))
+
+
+def testRoundOffIsNotPivotedOn(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 2, seed=21)[1]
+    costs = np.tile(costVectorC, (41, 1))
+    costs[:, 21] = np.linspace(140, 160, 41)
+    result = BatchSimplexSolver().solve(createTableauBatch(costs, pollutantMatrix, targetPollutants),
+                                        len(costVectorC))
+    for s in range(len(costs)):
+        reference = solveLP(costs[s], pollutantMatrix, targetPollutants, engine="bounded", trace="off")
+        assertSolved(reference, costs[s], pollutantMatrix, targetPollutants)
+        x = result['basicSolution'][s]
+        assert result['status'][s] == 'Optimal'
+        assert np.all(pollutantMatrix @ x >= targetPollutants - 1e-6)
+        assert result['Z'][s] == pytest.approx(costs[s] @ x, rel=1e-9)
+        assert result['Z'][s] == pytest.approx(reference['Z'], rel=1e-9)
@@ -0,0 +1,28 @@
+import json
+import pytest
+import benchmark
+
+
+# every engine reaches the same optimum, tableaus take the estimated memory
+def testSmallRun(tmp_path):
+    path = tmp_path / "bench.json"
+    benchmark.main(["--sizes", "30x10", "60x12", "--repeat", "1", "--output", str(path)])
+    report = json.loads(path.read_text())
+    assert report['meta']['repeat'] == 1
+    records = report['results']
+    assert [(r['size'], r['engine']) for r in records] == [(size, engine) for size in ("30x10", "60x12")
+                                                           for engine in benchmark.ENGINES]
+    for size in ("30x10", "60x12"):
+        sized = [r for r in records if r['size'] == size]
+        assert all(r['status'] == 'Optimal' for r in sized)
+        assert all(r['Z'] == pytest.approx(sized[0]['Z'], rel=1e-6) for r in sized)
+        for r in sized:
+            if r['engine'] in ("tableau", "bounded"):
+                assert r['tableauBytes'] == benchmark.tableauBytes(r['engine'], r['numProjects'], r['numPollutants'])
+
+
+def testSkipsLargeTableaus(tmp_path):
+    path = tmp_path / "bench.json"
+    benchmark.main(["--sizes", "2000x10", "--engines", "tableau", "--max-tableau-mb", "1", "--output", str(path)])
+    record = json.loads(path.read_text())['results'][0]
+    assert record['status'] == "Skipped"
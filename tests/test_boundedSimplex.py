@@ -0,0 +1,61 @@
+import numpy as np
+from conftest import randomProblems, mixedSignProblems, assertSolved
+from utils.boundedSimplex import BoundedSimplexSolver, remapWarmStart
+from utils.createTableau import createBoundedTableau
+from utils.solveLP import solveLP
+
+
+def solveBounded(costVectorC, pollutantMatrix, targetPollutants, **options):
+    tableau = createBoundedTableau(costVectorC, pollutantMatrix, targetPollutants)
+    return BoundedSimplexSolver().solveBounded(tableau, len(costVectorC), costVectorC, **options)
+
+
+# limits are bounds, not rows: the tableau only grows with the pollutants
+def testBoundedEngine(problemData):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 25, seed=6):
+        tableau = createBoundedTableau(costVectorC, pollutantMatrix, targetPollutants)
+        assert tableau.shape == (len(targetPollutants) + 1, len(costVectorC) + len(targetPollutants) + 1)
+        result = solveBounded(costVectorC, pollutantMatrix, targetPollutants, trace="pivot-log")
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+        if result['status'] != 'Optimal':
+            continue
+        log = result['pivotLog']
+        np.testing.assert_allclose(log.tableau(len(log) - 1), result['finalTableau'], atol=1e-8)
+
+
+# negative coefficients and a limit per project
+def testMixedSigns():
+    statuses = set()
+    for costVectorC, pollutantMatrix, targetPollutants, upper in mixedSignProblems(60, seed=7):
+        result = solveBounded(costVectorC, pollutantMatrix, targetPollutants, upperBound=upper, trace="off")
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants, upperBound=upper)
+        statuses.add(result['status'])
+    assert statuses == {'Optimal', 'Infeasible'}
+
+
+# warm starts from the basis of a problem with one project less and other
+# targets, the pivot log of every warm solve replays to its final tableau
+def testWarmStart(problemData):
+    restored = 0
+    rng = np.random.default_rng(9)
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 40, seed=9):
+        numProjects = len(costVectorC)
+        previous = solveBounded(costVectorC[1:], pollutantMatrix[:, 1:], targetPollutants, trace="off")
+        if previous['status'] != 'Optimal':
+            continue
+        names = list(range(numProjects))
+        pollutants = list(range(len(targetPollutants)))
+        warmStart = remapWarmStart(previous, names[1:], names, pollutants, pollutants)
+        targets = np.round(targetPollutants * rng.uniform(0.8, 1.2, len(targetPollutants)))
+        result = solveBounded(costVectorC, pollutantMatrix, targets, trace="pivot-log", warmStart=warmStart)
+        assert result['warmStarted']
+        cold = solveLP(costVectorC, pollutantMatrix, targets, engine="bounded", trace="off")
+        assert result['status'] == cold['status']
+        assertSolved(result, costVectorC, pollutantMatrix, targets)
+        if result['status'] != 'Optimal':
+            continue
+        log = result['pivotLog']
+        restored += any(isinstance(step[0], str) for step in log.steps)
+        np.testing.assert_allclose(log.tableau(len(log) - 1), result['finalTableau'], atol=1e-8)
+    # some of them needed the shifted objective
+    assert restored > 0
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from conftest import randomProblems
+from utils import branchAndBound
+from utils.branchAndBound import solveInteger
+from utils.loadData import prepareProblem
+
+
+def assertWholePlan(result, costVectorC, pollutantMatrix, targetPollutants):
+    x = result['basicSolution']
+    assert np.array_equal(x, np.round(x))
+    assert np.all((x >= 0) & (x <= 20))
+    assert np.all(pollutantMatrix @ x >= targetPollutants - 1e-6)
+    assert result['Z'] == pytest.approx(costVectorC @ x)
+
+
+def testWholeCatalog(problemData):
+    projectsDF, targetsDF, pollutantCols = problemData
+    _, costVectorC, pollutantMatrix, targetPollutants = prepareProblem(projectsDF, targetsDF, pollutantCols,
+                                                                       projectsDF['Project Name'].tolist())
+    costVectorC = np.asarray(costVectorC, dtype=float)
+    result = solveInteger(costVectorC, pollutantMatrix.T, targetPollutants)
+    assert result['status'] == 'Optimal'
+    assert result['Z'] == pytest.approx(236000.0)
+    assert result['relaxationZ'] <= result['Z']
+    assertWholePlan(result, costVectorC, pollutantMatrix.T, targetPollutants)
+
+
+# spawned workers search the same tree
+def testWorkers(problemData):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 3, seed=16):
+        single = solveInteger(costVectorC, pollutantMatrix, targetPollutants)
+        pooled = solveInteger(costVectorC, pollutantMatrix, targetPollutants, workers=2)
+        assert single['status'] == pooled['status']
+        if single['status'] == 'Optimal':
+            assert pooled['Z'] == pytest.approx(single['Z'])
+            assertWholePlan(pooled, costVectorC, pollutantMatrix, targetPollutants)
+
+
+def testLimits(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=16)[0]
+    result = solveInteger(costVectorC, pollutantMatrix, targetPollutants, maxNodes=1)
+    assert result['status'] == 'NodeLimit'
+    assert result['bestBound'] <= result['Z']
+    assertWholePlan(result, costVectorC, pollutantMatrix, targetPollutants)
+    result = solveInteger(costVectorC, pollutantMatrix, targetPollutants, maxIter=1)
+    assert result['status'] == 'IterationLimit'
+    assert result['stalledNodes'] == 1
+
+
+# a plan found while the only open nodes are ones that stopped at the
+# iteration limit is not reported as the node limit
+def testStalledNodes(problemData, monkeypatch):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=16)[0]
+    solveNode = branchAndBound.solveNode
+
+    def stallChildren(task, problem=None):
+        lower, upper, _ = task
+        if lower.any() or (upper < 20).any():
+            return 'IterationLimit', np.inf, None, None, 1
+        return solveNode(task, problem)
+
+    monkeypatch.setattr(branchAndBound, "solveNode", stallChildren)
+    result = solveInteger(costVectorC, pollutantMatrix, targetPollutants)
+    assert result['status'] == 'Stalled'
+    assert result['stalledNodes'] == 2
+    assert result['bestBound'] <= result['Z']
+    assertWholePlan(result, costVectorC, pollutantMatrix, targetPollutants)
+
+
+# x1 - x2 = 0.5 has fractional solutions only
+def testNoWholePlan():
+    costVectorC = np.array([1.0, 1.0])
+    pollutantMatrix = np.array([[1.0, -1.0], [-1.0, 1.0]])
+    targetPollutants = np.array([0.5, -0.5])
+    result = solveInteger(costVectorC, pollutantMatrix, targetPollutants, maxNodes=1)
+    assert result['status'] == 'NoIncumbent'
+    assert result['Z'] == np.inf and not result['basicSolution'].any()
+    assert solveInteger(costVectorC, pollutantMatrix, targetPollutants)['status'] == 'Infeasible'
@@ -0,0 +1,73 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import PROJECTS_PATH, TARGETS_PATH
+from utils.catalog import ProjectCatalog
+from utils.scenario import scenarioProblem
+
+
+# copies of data/ with an extra display column on the projects
+@pytest.fixture
+def sources(tmp_path):
+    projectsDF = pd.read_csv(PROJECTS_PATH)
+    projectsDF.insert(2, 'Sector', ['sector %d' % (i % 3) for i in range(len(projectsDF))])
+    projectsPath, targetsPath = tmp_path / "projects.csv", tmp_path / "targets.csv"
+    projectsDF.to_csv(projectsPath, index=False)
+    pd.read_csv(TARGETS_PATH).to_csv(targetsPath, index=False)
+    return str(projectsPath), str(targetsPath), str(tmp_path / "store")
+
+
+def testRoundTrip(sources):
+    projectsPath, targetsPath, storeDir = sources
+    catalog = ProjectCatalog(projectsPath, targetsPath, storeDir)
+    pd.testing.assert_frame_equal(catalog.projectsDF(), pd.read_csv(projectsPath), check_dtype=False)
+    pd.testing.assert_frame_equal(catalog.targetsDF(), pd.read_csv(targetsPath), check_dtype=False)
+
+    indices = catalog.indicesOf([catalog.names[3], catalog.names[1]])
+    costVectorC, pollutantMatrix, targetPollutants = catalog.problem(indices)
+    np.testing.assert_array_equal(costVectorC, pd.read_csv(projectsPath)['Costs'].values[[3, 1]])
+    with pytest.raises(ValueError):
+        costVectorC[0] = 1.0
+    with pytest.raises(ValueError):
+        catalog.problem(np.arange(4))[1][0, 0] = 1.0
+    targetPollutants[:] = 0
+    assert catalog.targets.min() > 0
+
+
+# a touched file is only hashed, changed contents point the index at a new matrix
+def testReload(sources):
+    projectsPath, targetsPath, storeDir = sources
+    catalog = ProjectCatalog(projectsPath, targetsPath, storeDir)
+    matrixName = catalog.index['matrix']
+    assert not catalog.refresh()
+    os.utime(projectsPath, ns=(0, 0))
+    assert not catalog.refresh()
+    assert catalog.index['matrix'] == matrixName
+    # another process opening the store reuses it
+    assert not ProjectCatalog(projectsPath, targetsPath, storeDir).refresh()
+
+    projectsDF = pd.read_csv(projectsPath)
+    projectsDF.loc[0, 'Costs'] = 1234
+    projectsDF.to_csv(projectsPath, index=False)
+    assert catalog.refresh()
+    assert catalog.index['matrix'] != matrixName
+    assert not os.path.exists(catalog.path(matrixName))
+    assert catalog.problem([0])[0][0] == 1234
+    assert catalog.projectsDF().loc[0, 'Costs'] == 1234
+
+
+def testScenarioProblem(sources):
+    catalog = ProjectCatalog(*sources)
+    names = catalog.names[:4]
+    scenario = {"projects": names, "costScale": 2.0, "costs": {names[1]: 10.0}, "targets": {"NOx": 5}}
+    _, indices, costVectorC, pollutantMatrix, targetPollutants = scenarioProblem(catalog, scenario)
+    np.testing.assert_array_equal(indices, np.arange(4))
+    expected = 2.0 * np.asarray(catalog.problem(indices)[0])
+    expected[1] = 10.0
+    np.testing.assert_array_equal(costVectorC, expected)
+    assert targetPollutants[catalog.pollutants.index("NOx")] == 5
+    assert catalog.targets[catalog.pollutants.index("NOx")] != 5
+    for bad in ({"projects": ["nowhere"]}, {"costs": {"nowhere": 1}}, {"targets": {"XYZ": 1}}, []):
+        with pytest.raises(ValueError):
+            scenarioProblem(catalog, bad)
@@ -0,0 +1,50 @@
+import csv
+import json
+import cli
+from conftest import PROJECTS_PATH, TARGETS_PATH
+
+
+def runCli(tmp_path, scenarios, *extra, projects=PROJECTS_PATH, targets=TARGETS_PATH):
+    scenariosPath = tmp_path / "scenarios.jsonl"
+    scenariosPath.write_text("".join(json.dumps(scenario) + "\n" for scenario in scenarios), encoding="utf-8")
+    outputPath = tmp_path / "results.out"
+    cli.main(["--projects", str(projects), "--targets", str(targets), "--catalog-dir", str(tmp_path / "catalog"),
+              "--scenarios", str(scenariosPath), "--output", str(outputPath), *extra])
+    return outputPath.read_text(encoding="utf-8")
+
+
+def testUnknownKeysSkipOnlyThatScenario(tmp_path, capsys):
+    output = runCli(tmp_path, [{"id": 1, "costs": {"nope": 5}}, {"id": 2, "targets": {"nope": 1}}, {"id": 3}])
+    records = [json.loads(line) for line in output.splitlines()]
+    assert [record["id"] for record in records] == [3]
+    assert records[0]["status"] == "Optimal"
+    errors = capsys.readouterr().err
+    assert "scenario 1: unknown projects in costs ['nope']" in errors
+    assert "scenario 2: unknown pollutants in targets ['nope']" in errors
+
+
+# CO2 needs x1 >= 15, which costs 75 tons of NOx that x2 can't make up.
+# every target is within reach on its own, so the tableau engine has to
+# find the infeasibility
+def writeMixedSign(tmp_path):
+    projects = tmp_path / "projects.csv"
+    projects.write_text("Project Name,Costs,CO2,NOx\nA,1,10,-5\nB,1,0,3\n", encoding="utf-8")
+    targets = tmp_path / "targets.csv"
+    targets.write_text("Pollutant,Target\nCO2,150\nNOx,50\n", encoding="utf-8")
+    return projects, targets
+
+
+def testInfeasibleHasNoUnits(tmp_path):
+    projects, targets = writeMixedSign(tmp_path)
+    output = runCli(tmp_path, [{"id": 1}, {"id": 2, "targets": {"NOx": -100}}], "--engine", "tableau",
+                    projects=projects, targets=targets)
+    infeasible, optimal = [json.loads(line) for line in output.splitlines()]
+    assert infeasible["status"] == "Infeasible"
+    assert infeasible["Z"] is None and infeasible["units"] is None
+    assert optimal["status"] == "Optimal"
+    assert optimal["units"] == {"A": 15.0}
+
+    output = runCli(tmp_path, [{"id": 1}], "--engine", "tableau", "--format", "csv", projects=projects,
+                    targets=targets)
+    assert list(csv.reader(output.splitlines())) == [["id", "status", "Z", "project", "units"],
+                                                      ["1", "Infeasible", "", "", ""]]
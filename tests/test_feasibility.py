@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from conftest import randomProblems, mixedSignProblems
+from utils.feasibility import findIIS, precheck
+from utils.solveLP import solveLP
+
+
+# some x within the limits in limits (a mask, 1e7 elsewhere) meets the targets
+# in rows, checked on the x the bounded engine returns
+def feasible(pollutantMatrix, targetPollutants, rows, limits, upper):
+    if len(rows) == 0:
+        return True
+    upperBound = np.where(limits, upper, 1e7)
+    result = solveLP(np.full(pollutantMatrix.shape[1], 1e-9), pollutantMatrix[rows], targetPollutants[rows],
+                     engine="bounded", trace="off", upperBound=upperBound, maxIter=100000)
+    if result['status'] != 'Optimal':
+        return False
+    x = result['basicSolution']
+    assert np.all(x >= -1e-9) and np.all(x <= upperBound + 1e-9)
+    assert np.all(pollutantMatrix[rows] @ x >= targetPollutants[rows] - 1e-6 * (1 + np.abs(targetPollutants[rows])))
+    return True
+
+
+# the certificate proves the subset infeasible on its own and dropping any
+# one target or project limit makes the rest feasible
+def assertIrreducible(iis, pollutantMatrix, targetPollutants, upper):
+    rows = iis['targets']
+    limits = np.zeros(pollutantMatrix.shape[1], dtype=bool)
+    limits[iis['limits']] = True
+    y = np.zeros(len(targetPollutants))
+    y[rows] = iis['certificate'][rows]
+    pressure = pollutantMatrix.T @ y
+    assert np.all(y >= 0)
+    assert np.all(pressure[~limits] <= 1e-9 * (1 + np.abs(pressure).max()))
+    assert targetPollutants @ y > upper[limits] @ np.maximum(pressure[limits], 0.0)
+    for k in rows:
+        assert feasible(pollutantMatrix, targetPollutants, rows[rows != k], limits, upper)
+    for j in iis['limits']:
+        subsetLimits = limits.copy()
+        subsetLimits[j] = False
+        assert feasible(pollutantMatrix, targetPollutants, rows, subsetLimits, upper)
+
+
+# data/ has no negative coefficients, the precheck decides every subset
+def testCatalogSubsets(problemData):
+    infeasible = 0
+    for _, pollutantMatrix, targetPollutants in randomProblems(problemData, 30, seed=6):
+        upper = np.full(pollutantMatrix.shape[1], 20.0)
+        iis = findIIS(pollutantMatrix, targetPollutants, upper)
+        assert iis['tests'] == 0
+        assert precheck(pollutantMatrix, targetPollutants, upper)['status'] == iis['status']
+        if iis['status'] == 'Feasible':
+            assert feasible(pollutantMatrix, targetPollutants, np.arange(len(targetPollutants)),
+                            np.ones(len(upper), dtype=bool), upper)
+            continue
+        infeasible += 1
+        assertIrreducible(iis, pollutantMatrix, targetPollutants, upper)
+    assert infeasible > 0
+
+
+# negative coefficients leave most problems to the elastic solves and the deletion filter
+def testMixedSigns():
+    filtered = 0
+    for _, pollutantMatrix, targetPollutants, upper in mixedSignProblems(80, seed=16):
+        check = precheck(pollutantMatrix, targetPollutants, upper)['status']
+        iis = findIIS(pollutantMatrix, targetPollutants, upper)
+        everything = feasible(pollutantMatrix, targetPollutants, np.arange(len(targetPollutants)),
+                              np.ones(len(upper), dtype=bool), upper)
+        assert (iis['status'] == 'Feasible') == everything
+        if not everything:
+            filtered += check == 'Unknown' and iis['tests'] > 1
+            assertIrreducible(iis, pollutantMatrix, targetPollutants, upper)
+    assert filtered >= 5
+
+
+# the deletion tests of a batch run on the pool and give the same subset
+def testWorkers():
+    found = 0
+    for _, pollutantMatrix, targetPollutants, upper in mixedSignProblems(40, seed=16):
+        if precheck(pollutantMatrix, targetPollutants, upper)['status'] != 'Unknown':
+            continue
+        serial = findIIS(pollutantMatrix, targetPollutants, upper, batchSize=2)
+        if serial['status'] != 'Infeasible' or serial['tests'] < 3:
+            continue
+        pooled = findIIS(pollutantMatrix, targetPollutants, upper, workers=2)
+        for key in ('status', 'tests'):
+            assert pooled[key] == serial[key]
+        np.testing.assert_array_equal(pooled['targets'], serial['targets'])
+        np.testing.assert_array_equal(pooled['limits'], serial['limits'])
+        found += 1
+        if found == 3:
+            break
+    assert found == 3
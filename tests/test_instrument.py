@@ -0,0 +1,42 @@
+import json
+import threading
+import pytest
+from conftest import randomProblems
+from utils.instrument import profile
+from utils.solveLP import solveLP
+
+
+# one onIteration call per pivot, Z of the last one is the optimum
+@pytest.mark.parametrize("engine", ["tableau", "bounded", "revised"])
+def testCounters(problemData, engine, tmp_path):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=4)[0]
+    calls = []
+    path = tmp_path / "perf.json"
+    with profile(str(path), onIteration=calls.append) as stats:
+        result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine=engine, trace="off")
+    assert result['status'] == 'Optimal'
+    counters = json.loads(path.read_text())
+    assert counters == stats.toDict()
+    # the revised engine never builds a tableau
+    assert counters['solves'] == 1 and counters['builds'] == (engine != "revised")
+    assert counters['pivots'] == len(calls) == result['iterations']
+    assert [c['iteration'] for c in calls] == list(range(1, len(calls) + 1))
+    assert all(a['elapsedNs'] <= b['elapsedNs'] for a, b in zip(calls, calls[1:]))
+    assert calls[-1]['Z'] == pytest.approx(result['Z'])
+
+
+# solves report to the innermost block of their own thread only
+def testNesting(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=4)[0]
+    solve = lambda: solveLP(costVectorC, pollutantMatrix, targetPollutants, trace="off")
+    with profile() as outer:
+        with profile() as inner:
+            solve()
+        thread = threading.Thread(target=solve)
+        thread.start()
+        thread.join()
+        solve()
+    assert inner.toDict()['solves'] == 1
+    assert outer.toDict()['solves'] == 1
+    solve()
+    assert outer.toDict()['solves'] == 1
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from conftest import randomProblems, mixedSignProblems, assertSolved
+from utils.interiorPoint import InteriorPointSolver
+from utils.solveLP import AUTO_INTERIOR_SIZE, chooseEngine, solveLP
+from utils.synthetic import generateProblem
+
+
+def testCatalogSubsets(problemData):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 20, seed=14):
+        result = InteriorPointSolver().solve(costVectorC, pollutantMatrix, targetPollutants)
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+        if result['status'] == 'Optimal':
+            assert result['crossoverStatus'] == 'Optimal' and result['basis'] is not None
+
+
+# the interior method itself proves infeasibility, no precheck in between
+def testMixedSigns():
+    statuses = set()
+    for costVectorC, pollutantMatrix, targetPollutants, upper in mixedSignProblems(40, seed=15):
+        result = InteriorPointSolver().solve(costVectorC, pollutantMatrix, targetPollutants, upperBound=upper)
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants, upperBound=upper)
+        if result['status'] == 'Infeasible':
+            y = result['farkas']
+            assert np.all(y >= 0)
+            assert targetPollutants @ y > upper @ np.maximum(pollutantMatrix.T @ y, 0.0)
+        statuses.add(result['status'])
+    assert statuses == {'Optimal', 'Infeasible'}
+
+
+# without crossover or with it cut short the interior point is still optimal
+def testCrossover():
+    # one of the few problems whose crossover needs a pivot
+    costVectorC, pollutantMatrix, targetPollutants, upper = mixedSignProblems(40, seed=15)[32]
+    result = InteriorPointSolver().solve(costVectorC, pollutantMatrix, targetPollutants, upperBound=upper)
+    assertSolved(result, costVectorC, pollutantMatrix, targetPollutants, upperBound=upper)
+    pivots = result['crossoverIterations']
+    assert pivots > 0
+    for options in ({'crossover': False}, {'crossoverMaxIter': pivots - 1}):
+        cut = InteriorPointSolver().solve(costVectorC, pollutantMatrix, targetPollutants, upperBound=upper,
+                                          **options)
+        assert cut['status'] == 'Optimal' and cut['basis'] is None
+        x = cut['basicSolution']
+        assert np.all(x >= 0) and np.all(x <= upper)
+        assert np.all(pollutantMatrix @ x >= targetPollutants - 1e-6 * (1 + np.abs(targetPollutants)))
+        assert cut['Z'] == pytest.approx(result['Z'], rel=1e-6)
+    assert cut['crossoverStatus'] == 'IterationLimit' and cut['crossoverMaxIter'] == pivots - 1
+    with pytest.raises(ValueError):
+        InteriorPointSolver().solve(costVectorC, pollutantMatrix, targetPollutants, trace="full")
+
+
+def testAutoEngine():
+    assert chooseEngine(AUTO_INTERIOR_SIZE // 10, 10) == "interior"
+    assert chooseEngine(AUTO_INTERIOR_SIZE // 10 - 1, 10) == "bounded"
+    assert chooseEngine(AUTO_INTERIOR_SIZE, 10, warmStart={'basis': []}) == "bounded"
+    for numProjects, engine in ((30, "bounded"), (AUTO_INTERIOR_SIZE // 10, "interior")):
+        costVectorC, pollutantMatrix, targetPollutants = generateProblem(numProjects, 10, seed=1)
+        result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="auto")
+        assert result['engine'] == engine
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
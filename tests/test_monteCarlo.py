@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from conftest import assertSolved
+from utils.loadData import prepareProblem
+from utils.monteCarlo import runMonteCarlo, solveSamples
+from utils.solveLP import solveLP
+
+
+def catalogProblem(problemData):
+    projectsDF, targetsDF, pollutantCols = problemData
+    _, costVectorC, pollutantMatrix, targetPollutants = prepareProblem(projectsDF, targetsDF, pollutantCols,
+                                                                       projectsDF['Project Name'].tolist())
+    return np.asarray(costVectorC, dtype=float), pollutantMatrix.T.astype(float), targetPollutants.astype(float)
+
+
+# every sample of a chunk is the LP with that sample's costs and coefficients
+def testSamples(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = catalogProblem(problemData)
+    count = 40
+    arrays = {'cost': costVectorC, 'matrix': pollutantMatrix, 'targets': targetPollutants,
+              'Z': np.full(count, np.nan), 'units': np.zeros((count, len(costVectorC)))}
+    solveSamples(arrays, (0, count, 5, 0.2, 0.3))
+    rng = np.random.default_rng([5, 0])
+    costs = costVectorC * rng.lognormal(-0.2 ** 2 / 2, 0.2, (count, len(costVectorC)))
+    matrices = pollutantMatrix * rng.lognormal(-0.3 ** 2 / 2, 0.3, (count,) + pollutantMatrix.shape)
+    for s in range(count):
+        reference = solveLP(costs[s], matrices[s], targetPollutants, engine="bounded", trace="off")
+        assertSolved(reference, costs[s], matrices[s], targetPollutants)
+        if reference['status'] != 'Optimal':
+            assert arrays['Z'][s] == np.inf
+            continue
+        assert arrays['Z'][s] == pytest.approx(reference['Z'], rel=1e-9)
+        assert arrays['Z'][s] == pytest.approx(costs[s] @ arrays['units'][s], rel=1e-9)
+
+
+# a pool gives the same final aggregates as a run in this process
+def testWorkers(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = catalogProblem(problemData)
+    runs = {}
+    for workers in (1, 2):
+        updates = list(runMonteCarlo(costVectorC, pollutantMatrix, targetPollutants, numSamples=600, seed=3,
+                                     workers=workers, chunkSize=100, coeffSigma=0.3, maxSample=200))
+        assert [u['done'] for u in updates] == [100, 200, 300, 400, 500, 600]
+        assert [u['exact'] for u in updates] == [False] * 5 + [True]
+        runs[workers] = updates[-1]
+    assert 0 < runs[1]['feasibleRate'] < 1
+    assert runs[1]['feasibleRate'] == runs[2]['feasibleRate']
+    assert runs[1]['meanZ'] == pytest.approx(runs[2]['meanZ'], rel=1e-12)
+    for key in ('selectionFrequency', 'meanUnits'):
+        np.testing.assert_allclose(runs[1][key], runs[2][key], rtol=1e-12)
+    assert runs[1]['percentiles'] == runs[2]['percentiles']
+
+
+# closing the generator early releases the shared blocks and the pool
+def testStopEarly(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = catalogProblem(problemData)
+    updates = runMonteCarlo(costVectorC, pollutantMatrix, targetPollutants, numSamples=1000, workers=2, chunkSize=100)
+    assert next(updates)['done'] == 100
+    updates.close()
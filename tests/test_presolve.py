@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from conftest import randomProblems, mixedSignProblems, assertSolved
+from utils.presolve import presolve, solvePresolved
+
+ENGINES = ("tableau", "bounded", "revised")
+
+
+# problems with what presolve removes: empty and dominated projects,
+# proportional targets and targets that force projects to their limits
+def reducibleProblems(count, seed):
+    rng = np.random.default_rng(seed)
+    problems = []
+    for trial in range(count):
+        numProjects, numPollutants = int(rng.integers(3, 40)), int(rng.integers(2, 9))
+        A = rng.random((numPollutants, numProjects)) * (rng.random((numPollutants, numProjects)) < 0.6) * 10
+        c = 100 + 1000 * rng.random(numProjects)
+        A[:, rng.integers(numProjects)] = 0
+        A[-1] = 2 * A[0]
+        j, k = rng.integers(numProjects, size=2)
+        A[:, k] = 0.8 * A[:, j]
+        c[k] = 1.1 * c[j]
+        upper = rng.uniform(1, 20, numProjects) if trial % 2 else 20.0
+        b = rng.uniform(0.05, 1.0) * (A @ np.broadcast_to(upper, (numProjects,))) * rng.uniform(0.5, 1.0, numPollutants)
+        if trial % 3 == 0:
+            b[1] = 0.99 * A[1] @ np.broadcast_to(upper, (numProjects,))
+        problems.append((c, A, np.round(b, 3), upper))
+    return problems
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def testCatalogSubsets(problemData, engine):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 15, seed=10):
+        result = solvePresolved(costVectorC, pollutantMatrix, targetPollutants, engine=engine, trace="off")
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def testReducibleProblems(engine):
+    dropped = 0
+    for costVectorC, pollutantMatrix, targetPollutants, upper in reducibleProblems(40, seed=11):
+        result = solvePresolved(costVectorC, pollutantMatrix, targetPollutants, engine=engine, trace="off",
+                                upperBound=upper)
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants, upperBound=upper)
+        if result['status'] == 'Optimal':
+            info = result['presolve']
+            dropped += len(info['keptProjects']) < len(costVectorC) and len(info['keptPollutants']) < len(targetPollutants)
+    assert dropped > 0
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def testMixedSigns(engine):
+    for costVectorC, pollutantMatrix, targetPollutants, upper in mixedSignProblems(30, seed=12):
+        result = solvePresolved(costVectorC, pollutantMatrix, targetPollutants, engine=engine, trace="off",
+                                upperBound=upper)
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants, upperBound=upper)
+
+
+# a target above what every project at its limit reaches needs no solve
+def testInfeasibleWithoutSolve():
+    A = np.array([[1.0, 2.0], [0.0, 1.0]])
+    assert presolve(np.ones(2), A, np.array([10.0, 25.0]))['status'] == 'Infeasible'
+    result = solvePresolved(np.ones(2), A, np.array([10.0, 25.0]))
+    assert result['status'] == 'Infeasible' and result['Z'] == np.inf
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from conftest import randomProblems, assertSolved
+from utils.revisedSimplex import BasisFactor, RevisedSimplexSolver
+from utils.synthetic import generateProblem
+
+
+def testRandomSubsets(problemData):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 25, seed=11):
+        result = RevisedSimplexSolver().solve(costVectorC, pollutantMatrix, targetPollutants, trace="off")
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+
+
+# a refactorization every few pivots or almost never ends in the same optimum
+@pytest.mark.parametrize("refactorEvery", [2, 7, 10000])
+def testRefactorization(refactorEvery):
+    costVectorC, pollutantMatrix, targetPollutants = generateProblem(200, 20, seed=1)
+    result = RevisedSimplexSolver(refactorEvery=refactorEvery).solve(costVectorC, pollutantMatrix,
+                                                                     targetPollutants, maxIter=10000)
+    assert result['status'] == 'Optimal'
+    assert len(result['pivotSummary']) == result['iterations']
+    assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+
+
+def testBasisUpdates():
+    rng = np.random.default_rng(12)
+    B = rng.normal(size=(6, 6)) + 6 * np.eye(6)
+    factor = BasisFactor(B)
+    for r in [2, 0, 5, 2]:
+        column = rng.normal(size=6) + 6 * np.eye(6)[r]
+        factor.update(r, factor.ftran(column))
+        B[:, r] = column
+    v = rng.normal(size=6)
+    np.testing.assert_allclose(B @ factor.ftran(v), v, atol=1e-10)
+    np.testing.assert_allclose(factor.btran(v) @ B, v, atol=1e-10)
+    np.testing.assert_allclose(factor.row(3) @ B, np.eye(6)[3], atol=1e-10)
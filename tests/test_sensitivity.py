@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from conftest import randomProblems
+from utils.solveLP import solveLP
+
+
+def insideRange(value, low, high, rng):
+    low = max(low, value - 50.0) if np.isfinite(low) else value - 50.0
+    high = min(high, value + 50.0) if np.isfinite(high) else value + 50.0
+    return rng.uniform(low, high)
+
+
+# Z moves linearly inside every range: by x_j for a cost, by the shadow
+# price for a target
+@pytest.mark.parametrize("engine", ["tableau", "bounded", "revised"])
+def testRanges(problemData, engine):
+    rng = np.random.default_rng(13)
+    checked = 0
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 10, seed=13):
+        result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine=engine, trace="off",
+                         sensitivity=True)
+        if result['status'] != 'Optimal':
+            continue
+        for j in rng.choice(len(costVectorC), 3, replace=False):
+            costs = costVectorC.copy()
+            costs[j] = insideRange(costs[j], *result['costRange'][j], rng)
+            changed = solveLP(costs, pollutantMatrix, targetPollutants, engine="bounded", trace="off")
+            expected = result['Z'] + result['basicSolution'][j] * (costs[j] - costVectorC[j])
+            assert changed['Z'] == pytest.approx(expected, rel=1e-7)
+        for k in rng.choice(len(targetPollutants), 3, replace=False):
+            targets = targetPollutants.copy()
+            targets[k] = insideRange(targets[k], *result['targetRange'][k], rng)
+            changed = solveLP(costVectorC, pollutantMatrix, targets, engine="bounded", trace="off")
+            expected = result['Z'] + result['duals'][k] * (targets[k] - targetPollutants[k])
+            assert changed['Z'] == pytest.approx(expected, rel=1e-7)
+        checked += 1
+    assert checked > 0
+
+
+def testOnlyOnRequest(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=13)[0]
+    result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="bounded", trace="off")
+    assert result['status'] == 'Optimal'
+    assert 'costRange' not in result and 'reducedCosts' not in result
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from conftest import randomProblems, assertSolved
+from utils.createTableau import createTableau
+from utils.simplex import PRICING_RULES, SimplexSolver
+from utils.solveLP import solveLP
+
+
+def testTableauEngine(problemData):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 25, seed=1):
+        result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="tableau", trace="off")
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+
+
+# the vectorized ratio test and pivot take the same steps as the row loops
+def testPivotModes(problemData):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 10, seed=2):
+        tableau = createTableau(costVectorC, pollutantMatrix, targetPollutants)
+        vectorized = SimplexSolver().solve(tableau, len(costVectorC), costVectorC, trace="off")
+        loop = SimplexSolver().solve(tableau, len(costVectorC), costVectorC, pivotMode="loop", trace="off")
+        assert vectorized['status'] == loop['status']
+        assert vectorized['iterations'] == loop['iterations']
+        np.testing.assert_allclose(vectorized['finalTableau'], loop['finalTableau'], rtol=1e-9, atol=1e-9)
+    with pytest.raises(ValueError):
+        SimplexSolver().solve(tableau, len(costVectorC), costVectorC, pivotMode="gauss")
+
+
+# the tracked basis reads the same solution as scanning the tableau for unit columns
+def testTrackedBasis(problemData):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 5, seed=3):
+        tableau = createTableau(costVectorC, pollutantMatrix, targetPollutants)
+        result = SimplexSolver().solve(tableau, len(costVectorC), costVectorC)
+        for T, sol in zip(result['tableauList'][:-1], result['basicSolutions']):
+            scanned = np.zeros(T.shape[1])
+            for j in range(T.shape[1] - 1):
+                col = T[:-1, j]
+                if np.sum(col == 1) == 1 and np.sum(col == 0) == len(col) - 1:
+                    scanned[j] = T[np.argmax(col), -1]
+            scanned[-1] = T[-1, -1]
+            np.testing.assert_array_equal(sol, scanned)
+            solver = SimplexSolver()
+            np.testing.assert_array_equal(solver.extractBasicSol(T, solver.findBasis(T)), scanned)
+
+
+@pytest.mark.parametrize("pricing", PRICING_RULES)
+def testPricingRules(problemData, pricing):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 25, seed=3):
+        result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="tableau", trace="off",
+                         pricing=pricing, maxIter=10000)
+        assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+
+
+# Bland's rule taking over before the first devex pricing call still
+# updates the devex weights
+def testDevexFromBland(problemData):
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 5, seed=8):
+        tableau = createTableau(costVectorC, pollutantMatrix, targetPollutants)
+        result = SimplexSolver().solve(tableau, len(costVectorC), costVectorC, trace="off", pricing="devex",
+                                       blandAfter=0, maxIter=10000)
+        assert result['status'] in ('Optimal', 'Infeasible')
+
+
+def testUnknownPricing(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=4)[0]
+    with pytest.raises(ValueError):
+        solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="tableau", pricing="largest")
+
+
+# round-off entries of about 1e-16 in the pivot column used to pass the
+# ratio test and end in a wrong "Optimal"
+@pytest.mark.parametrize("cost", [140.03, 148.55, 152.0])
+def testRoundOffIsNotPivotedOn(problemData, cost):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 2, seed=21)[1]
+    costVectorC = costVectorC.copy()
+    costVectorC[21] = cost
+    result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="tableau", trace="off")
+    assert result['status'] == 'Optimal'
+    assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+
+
+# every breakpoint of the frontier is the optimum of the targets at its t
+def testParametricFrontier(problemData):
+    traced = 0
+    for costVectorC, pollutantMatrix, targetPollutants in randomProblems(problemData, 10, seed=15):
+        tableau = createTableau(costVectorC, pollutantMatrix, 0.2 * targetPollutants)
+        frontier = SimplexSolver().parametric(tableau, len(costVectorC), costVectorC, targetPollutants, 0.2, 1.5)
+        for _, point in frontier['frontier'].iterrows():
+            targets = point['t'] * targetPollutants
+            result = solveLP(costVectorC, pollutantMatrix, targets, engine="bounded", trace="off")
+            assertSolved(result, costVectorC, pollutantMatrix, targets)
+            assert point['Z'] == pytest.approx(result['Z'], rel=1e-7, abs=1e-7)
+            traced += 1
+        if frontier['tInfeasible'] is not None:
+            targets = (frontier['tInfeasible'] + 1e-3) * targetPollutants
+            result = solveLP(costVectorC, pollutantMatrix, targets, engine="bounded", trace="off")
+            assert result['status'] == 'Infeasible'
+    assert traced > 10
+
+
+# degenerate pivots count against maxPivots even though t doesn't move
+def testParametricPivotLimit(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=15)[0]
+    tableau = createTableau(costVectorC, pollutantMatrix, 0.2 * targetPollutants)
+    frontier = SimplexSolver().parametric(tableau, len(costVectorC), costVectorC, targetPollutants, 0.2, 1.5,
+                                          maxPivots=1)
+    assert frontier['status'] == 'IterationLimit'
+    assert len(frontier['frontier']) <= 2
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from conftest import randomProblems
+from utils.solveCache import SolveCache, cachedSolve
+from utils.solveLP import solveLP
+
+
+def testCacheRoundTrip(problemData, tmp_path):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=7)[0]
+    names = [f"project {j}" for j in range(len(costVectorC))]
+    result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="bounded", trace="off")
+
+    cache = SolveCache(cacheDir=str(tmp_path))
+    key = cache.makeKey(names, costVectorC, pollutantMatrix, targetPollutants, engine="bounded")
+    assert cache.get(key) is None
+    cache.put(key, result)
+    fromMemory = cache.get(key)
+    # a fresh cache on the same directory reads it back from disk
+    fromDisk = SolveCache(cacheDir=str(tmp_path)).get(key)
+    for cached in (fromMemory, fromDisk):
+        assert cached['status'] == result['status']
+        assert cached['Z'] == result['Z']
+        np.testing.assert_array_equal(cached['basicSolution'], result['basicSolution'])
+        with pytest.raises(ValueError):
+            cached['basicSolution'][0] = 1.0
+    assert cache.stats()['hits'] == 1
+
+    otherKey = cache.makeKey(names, costVectorC, pollutantMatrix, targetPollutants, engine="tableau")
+    assert otherKey != key
+    assert cache.get(otherKey) is None
+
+
+# the least recently used entry goes first
+def testEviction():
+    cache = SolveCache(maxEntries=2)
+    for key in ("a", "b"):
+        cache.put(key, {'Z': 1.0})
+    cache.get("a")
+    cache.put("c", {'Z': 2.0})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()['entries'] == 2
+
+
+# a full trace comes back from disk as the same list of tableaus, an
+# unreadable file is a miss
+def testCachedSolve(problemData, tmp_path):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=7)[0]
+    names = [f"project {j}" for j in range(len(costVectorC))]
+    first = cachedSolve(SolveCache(cacheDir=str(tmp_path)), names, costVectorC, pollutantMatrix, targetPollutants)
+    cache = SolveCache(cacheDir=str(tmp_path))
+    second = cachedSolve(cache, names, costVectorC, pollutantMatrix, targetPollutants)
+    assert cache.stats()['diskHits'] == 1 and cache.stats()['misses'] == 0
+    assert len(second['tableauList']) == len(first['tableauList'])
+    for cached, solved in zip(second['tableauList'], first['tableauList']):
+        np.testing.assert_array_equal(cached, solved)
+    assert second['status'] == first['status'] and second['iterations'] == first['iterations']
+
+    for path in tmp_path.iterdir():
+        path.write_bytes(b"not a cache file")
+    cache = SolveCache(cacheDir=str(tmp_path))
+    key = cache.makeKey(names, costVectorC, pollutantMatrix, targetPollutants, engine="tableau", trace="full",
+                        upperBound=20.0)
+    assert cache.get(key) is None
+    assert cachedSolve(cache, names, costVectorC, pollutantMatrix, targetPollutants)['Z'] == first['Z']
@@ -0,0 +1,45 @@
+import threading
+from conftest import randomProblems
+from utils.solveJob import SolveJob
+from utils.solveLP import solveLP
+
+
+def testResultAndEvents(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=10)[0]
+    job = SolveJob(lambda job: solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="tableau",
+                                       trace="off")).start()
+    job.thread.join()
+    assert job.status() == 'Done'
+    assert job.result['status'] == 'Optimal'
+    assert job.eventCount == job.result['iterations'] == len(job.events)
+    assert job.performance is not None
+
+
+def testCancel():
+    started = threading.Event()
+
+    def spin(job):
+        started.set()
+        while True:
+            job.update({'iteration': 0})
+
+    job = SolveJob(spin).start()
+    started.wait()
+    job.cancel()
+    job.thread.join(5)
+    assert job.status() == 'Cancelled'
+    assert job.result is None
+
+
+# the kept events are thinned, not cut off, when a solve has many pivots
+def testEventsAreBounded():
+    def pivots(job):
+        for i in range(10000):
+            job.onIteration({'iteration': i + 1})
+        return {}
+
+    job = SolveJob(pivots, maxEvents=100).start()
+    job.thread.join()
+    assert job.eventCount == 10000
+    assert len(job.events) <= 100
+    assert [event['iteration'] - 1 for event in job.events] == list(range(0, 10000, job.eventStride))
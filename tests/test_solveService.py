@@ -0,0 +1,101 @@
+import asyncio
+import numpy as np
+import pytest
+from conftest import PROJECTS_PATH, TARGETS_PATH, assertSolved
+from utils import solveService
+from utils.catalog import ProjectCatalog
+from utils.scenario import scenarioProblem
+from utils.serviceClient import SolveClient
+from utils.solveLP import solveLP
+from utils.solveService import CatalogChanged, SolveService, serve, solveBatch
+
+
+# every answer is checked on the scenario's own problem
+def assertAnswer(answer, catalog, scenario):
+    names, _, costVectorC, pollutantMatrix, targetPollutants = scenarioProblem(catalog, scenario)
+    pollutantMatrix = np.asarray(pollutantMatrix, dtype=float).T
+    reference = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="bounded", trace="off")
+    assertSolved(reference, costVectorC, pollutantMatrix, targetPollutants)
+    assert answer['status'] == reference['status']
+    if reference['status'] != 'Optimal':
+        assert answer['Z'] is None and answer['units'] is None
+        return
+    # the service answers with the chosen projects only, solveBatch with every unit
+    units = answer['units']
+    x = np.array([units.get(name, 0.0) for name in names]) if isinstance(units, dict) else np.array(units)
+    assert np.all(x >= -1e-9) and np.all(x <= 20.0 + 1e-9)
+    assert np.all(pollutantMatrix @ x >= targetPollutants - 1e-6 * (1 + np.abs(targetPollutants)))
+    assert answer['Z'] == pytest.approx(costVectorC @ x, rel=1e-9)
+    assert answer['Z'] == pytest.approx(reference['Z'], rel=1e-9)
+
+
+# the batch of one selection: targets the precheck rules out, infeasible and
+# optimal scenarios in one stack
+@pytest.mark.parametrize("engine", ["tableau", "bounded"])
+def testSolveBatch(tmp_path, monkeypatch, engine):
+    catalog = ProjectCatalog(PROJECTS_PATH, TARGETS_PATH, storeDir=str(tmp_path))
+    monkeypatch.setitem(solveService.PROBLEM, 'catalog', catalog)
+    rng = np.random.default_rng(17)
+    indices = np.sort(rng.choice(len(catalog.names), 15, replace=False))
+    names = [catalog.names[i] for i in indices]
+    scenarios = [{"projects": names, "costScale": float(rng.uniform(0.8, 1.2)),
+                  "targets": {p: float(np.round(t * rng.uniform(0.2, 2.0)))
+                              for p, t in zip(catalog.pollutants, catalog.targets)}} for _ in range(30)]
+    scenarios.append({"projects": names, "targets": {"CO2": 1e9}})
+    problems = [scenarioProblem(catalog, scenario) for scenario in scenarios]
+    costs = np.array([problem[2] for problem in problems])
+    targets = np.array([problem[4] for problem in problems])
+    results = solveBatch((indices, costs, targets, engine, None, catalog.index['matrix']))
+    assert {result['status'] for result in results} == {'Optimal', 'Infeasible'}
+    for result, scenario in zip(results, scenarios):
+        assertAnswer(result, catalog, scenario)
+    with pytest.raises(CatalogChanged):
+        solveBatch((indices, costs, targets, engine, None, "catalog-old.npy"))
+
+
+# a warm service on a unix socket answering the blocking client
+def testService(tmp_path):
+    socketPath = str(tmp_path / "service.sock")
+    catalogDir = str(tmp_path / "catalog")
+    catalog = ProjectCatalog(PROJECTS_PATH, TARGETS_PATH, storeDir=catalogDir)
+    names = catalog.names[:12]
+    same = {"projects": names, "targets": {"CO2": 800}}
+    scenarios = [dict(same, id=i) for i in range(3)]
+    scenarios += [{"id": 3, "projects": names, "targets": {"CO2": 600}},
+                  {"id": 4, "projects": names, "targets": {"CO2": 1e9}},
+                  {"id": 5, "projects": ["nowhere"]}]
+
+    def requests():
+        with SolveClient(socketPath=socketPath) as client:
+            assert client.health()['workers'] == 1
+            answers = client.solveMany(scenarios)
+            assert [answer['id'] for answer in answers] == list(range(6))
+            for answer, scenario in zip(answers[:5], scenarios):
+                assertAnswer(answer, catalog, scenario)
+            assert "nowhere" in answers[5]['error']
+            assert client.solve(same) == dict(answers[0], id=None)
+            with pytest.raises(ValueError):
+                client.solve({"projects": ["nowhere"]})
+            with pytest.raises(RuntimeError, match="404"):
+                client.request("GET", "/nowhere")
+            with pytest.raises(RuntimeError, match="413"):
+                client.solve({"projects": names * 100})
+            return client.metrics()
+
+    async def run():
+        service = SolveService(PROJECTS_PATH, TARGETS_PATH, catalogDir=catalogDir, workers=1, batchWindow=0.05,
+                               maxBodyBytes=4096)
+        ready = asyncio.Event()
+        server = asyncio.create_task(serve(service, socketPath=socketPath, onReady=lambda _: ready.set()))
+        await ready.wait()
+        try:
+            return await asyncio.to_thread(requests)
+        finally:
+            server.cancel()
+            await asyncio.gather(server, return_exceptions=True)
+
+    metrics = asyncio.run(run())
+    # the three identical scenarios share one solve, the other two go in the same batch
+    assert metrics['coalesced'] == 2 and metrics['cacheHits'] == 1
+    assert metrics['batches'] == 1 and metrics['batchedScenarios'] == 3
+    assert metrics['errors'] == 2 and metrics['latencyMs']['samples'] == 6
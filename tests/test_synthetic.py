@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from conftest import assertSolved
+from utils.solveLP import solveLP
+from utils.synthetic import generateProblem
+
+
+@pytest.mark.parametrize("numProjects, numPollutants", [(30, 10), (200, 20), (500, 40)])
+def testInstances(numProjects, numPollutants):
+    costVectorC, pollutantMatrix, targetPollutants = generateProblem(numProjects, numPollutants, seed=2)
+    assert pollutantMatrix.shape == (numPollutants, numProjects)
+    for again, array in zip(generateProblem(numProjects, numPollutants, seed=2),
+                            (costVectorC, pollutantMatrix, targetPollutants)):
+        np.testing.assert_array_equal(again, array)
+    assert not np.array_equal(generateProblem(numProjects, numPollutants, seed=3)[0], costVectorC)
+    # every project cuts something and every target is met with all projects at their limit
+    assert (pollutantMatrix > 0).any(axis=0).all()
+    assert np.all(pollutantMatrix @ np.full(numProjects, 20.0) >= targetPollutants)
+    result = solveLP(costVectorC, pollutantMatrix, targetPollutants, engine="bounded", trace="off")
+    assertSolved(result, costVectorC, pollutantMatrix, targetPollutants)
+    assert result['status'] == 'Optimal'
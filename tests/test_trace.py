@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from conftest import randomProblems, mixedSignProblems
+from utils.boundedSimplex import BoundedSimplexSolver, remapWarmStart
+from utils.createTableau import createTableau, createBoundedTableau
+from utils.simplex import SimplexSolver
+from utils.trace import TRACE_MODES, LazyList
+
+
+def solveTraced(problemData, seed):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed)[0]
+    tableau = createTableau(costVectorC, pollutantMatrix, targetPollutants)
+    return {mode: SimplexSolver().solve(tableau, len(costVectorC), costVectorC, trace=mode) for mode in TRACE_MODES}
+
+
+# the trace mode changes what is kept, never the pivots taken
+@pytest.mark.parametrize("seed", [4, 5])
+def testTraceModes(problemData, seed):
+    results = solveTraced(problemData, seed)
+    full = results['full']
+    for result in results.values():
+        assert result['status'] == full['status']
+        assert result['iterations'] == full['iterations']
+        np.testing.assert_array_equal(result['finalTableau'], full['finalTableau'])
+    # an optimal solve also keeps its final tableau
+    assert len(full['tableauList']) == full['iterations'] + (full['status'] == 'Optimal')
+    summary = results['summary']
+    # an infeasible solve stops on an iteration without a pivot
+    assert len(summary['pivotSummary']) == full['iterations'] - (full['status'] == 'Infeasible')
+    assert summary['tableauList'] == []
+    if full['status'] == 'Optimal':
+        assert summary['pivotSummary'][-1]['Z'] == pytest.approx(full['Z'])
+    off = results['off']
+    assert off['tableauList'] == [] and off['basicSolutions'] == [] and off['pivotSummary'] == []
+
+
+# the pivot log rebuilds every tableau of the full trace, in any order
+@pytest.mark.parametrize("seed", [4, 5])
+def testPivotLogReplay(problemData, seed):
+    results = solveTraced(problemData, seed)
+    full, log = results['full'], results['pivot-log']
+    assert len(log['tableauList']) == len(full['tableauList'])
+    for k in reversed(range(len(full['tableauList']))):
+        np.testing.assert_allclose(log['tableauList'][k], full['tableauList'][k], atol=1e-9)
+        np.testing.assert_allclose(log['objectiveRowList'][k], full['objectiveRowList'][k], atol=1e-9)
+        np.testing.assert_allclose(log['basicSolutions'][k], full['basicSolutions'][k], atol=1e-9)
+    np.testing.assert_allclose(log['tableauList'][-1], full['finalTableau'], atol=1e-9)
+    assert log['pivotLog'].nbytes() < sum(T.nbytes for T in full['tableauList'])
+
+
+def testUnknownTraceMode(problemData):
+    costVectorC, pollutantMatrix, targetPollutants = randomProblems(problemData, 1, seed=4)[0]
+    tableau = createTableau(costVectorC, pollutantMatrix, targetPollutants)
+    with pytest.raises(ValueError):
+        SimplexSolver().solve(tableau, len(costVectorC), costVectorC, trace="everything")
+
+
+# a page of the iterations tab is a slice, only the sliced tableaus are rebuilt
+def testLazyPages():
+    built = []
+    pages = LazyList(23, lambda k: built.append(k) or k)
+    assert len(pages) == 23
+    assert pages[10:20] == list(range(10, 20)) and built == list(range(10, 20))
+    assert pages[20:30] == [20, 21, 22]
+    assert pages[-1] == 22
+    with pytest.raises(IndexError):
+        pages[23]
+
+
+# jumping back and forth through the pivot log gives the tableaus of a full trace
+def testPivotLogJumps(problemData):
+    results = solveTraced(problemData, seed=4)
+    full, log = results['full']['tableauList'], results['pivot-log']['pivotLog']
+    rng = np.random.default_rng(4)
+    for k in rng.integers(0, len(log), 40):
+        np.testing.assert_allclose(log.tableau(k), full[k], atol=1e-9)
+    with pytest.raises(IndexError):
+        log.tableau(len(log))
+
+
+# the steps the iterations tab reads: pivots, bound flips and the objective
+# row restored in a warm start from a problem with one project less
+def testBoundedSteps():
+    kinds = set()
+    solver = BoundedSimplexSolver()
+    for costVectorC, pollutantMatrix, targetPollutants, upper in mixedSignProblems(60, seed=5):
+        # a cheap project with a low limit, it enters by jumping to its limit
+        costVectorC[0], upper[0] = 1.0, 1.0
+        pollutantMatrix[:, 0] = np.abs(pollutantMatrix[:, 0]) + 1
+        solve = lambda c, A, u, **options: solver.solveBounded(createBoundedTableau(c, A, targetPollutants), len(c),
+                                                               c, upperBound=u, **options)
+        previous = solve(costVectorC[1:], pollutantMatrix[:, 1:], upper[1:], trace="off")
+        if previous['status'] != 'Optimal':
+            continue
+        names = list(range(len(costVectorC)))
+        pollutants = list(range(len(targetPollutants)))
+        warmStart = remapWarmStart(previous, names[1:], names, pollutants, pollutants)
+        result = solve(costVectorC, pollutantMatrix, upper, trace="pivot-log", warmStart=warmStart)
+        log = result['pivotLog']
+        for k, step in enumerate(log.steps):
+            if isinstance(step[0], str):
+                kinds.add("objective")
+                np.testing.assert_array_equal(log.tableau(k + 1)[-1], step[1])
+            elif step[0] < 0:
+                kinds.add("flip")
+                assert step[3] >= 0
+            else:
+                kinds.add("pivot")
+        if result['status'] == 'Optimal':
+            np.testing.assert_allclose(log.tableau(len(log) - 1), result['finalTableau'], atol=1e-8)
+    assert kinds == {"objective", "flip", "pivot"}
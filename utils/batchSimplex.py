@@ -0,0 +1,78 @@
+import numpy as np
+
+# runs the same dual simplex as SimplexSolver.solve on a stack of tableaus,
+# every scenario that still has a negative objective entry is pivoted at once
+class BatchSimplexSolver:
+    # the pivot and optimality tolerance of SimplexSolver
+    def __init__(self, tol=1e-9):
+        self.tol = tol
+
+    def solve(self, tableaus, numVars, maxIter=1000):
+        tableaus = np.array(tableaus, dtype=float)
+        S, n, m = tableaus.shape
+        n -= 1
+        status = np.full(S, 'Optimal', dtype=object)
+        iterations = np.zeros(S, dtype=int)
+
+        # working stack of the unfinished scenarios, shrunk only when some finish
+        T = tableaus
+        ids = np.arange(S)
+        iteration = 0
+        tol = self.tol
+        while len(ids) > 0 and iteration < maxIter:
+            finished = T[:, n, :m-1].min(axis=1) >= -tol
+            if finished.any():
+                tableaus[ids[finished]] = T[finished]
+                T, ids = T[~finished], ids[~finished]
+                if len(ids) == 0:
+                    break
+            iteration += 1
+            iterations[ids] = iteration
+            # pivot column per scenario
+            PC = np.argmin(T[:, n, :m-1], axis=1)
+            idx = np.arange(len(ids))
+            col = T[idx, :n, PC]
+            # masked ratio test
+            ratios = np.full(col.shape, np.inf)
+            np.divide(T[:, :n, -1], col, out=ratios, where=col > tol)
+            infeasible = np.isinf(ratios).all(axis=1)
+            if infeasible.any():
+                status[ids[infeasible]] = 'Infeasible'
+                tableaus[ids[infeasible]] = T[infeasible]
+                T, ids, PC = T[~infeasible], ids[~infeasible], PC[~infeasible]
+                col, ratios = col[~infeasible], ratios[~infeasible]
+                idx = np.arange(len(ids))
+                if len(ids) == 0:
+                    break
+            # harris' pass as in SimplexSolver.leavingRow, the largest pivot
+            # element among the tied rows leaves
+            relaxed = np.full(col.shape, np.inf)
+            np.divide(T[:, :n, -1] + tol, col, out=relaxed, where=col > tol)
+            ties = ratios <= relaxed.min(axis=1)[:, None]
+            PR = np.argmax(np.where(ties, col, -np.inf), axis=1)
+            # rank-1 update of every active tableau
+            pivotCol = T[idx, :, PC]
+            pivotRow = T[idx, PR, :] / pivotCol[idx, PR][:, None]
+            T -= pivotCol[:, :, None] * pivotRow[:, None, :]
+            T[idx, PR, :] = pivotRow
+        if len(ids) > 0:
+            # scenarios still pivoting when maxIter ran out
+            finished = T[:, n, :m-1].min(axis=1) >= -tol
+            status[ids[~finished]] = 'IterationLimit'
+            tableaus[ids] = T
+
+        # read the units and Z from the objective rows
+        slack_start_col = m - 2 - numVars
+        basicSolution = tableaus[:, n, slack_start_col : m-2].copy()
+        Z = tableaus[:, n, -1].copy()
+        infeasible = status != 'Optimal'
+        Z[infeasible] = np.inf
+        basicSolution[infeasible] = 0.0
+
+        final = {}
+        final['status'] = status
+        final['Z'] = Z
+        final['basicSolution'] = basicSolution
+        final['iterations'] = iterations
+        final['finalTableaus'] = tableaus
+        return final
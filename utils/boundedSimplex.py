@@ -0,0 +1,267 @@
+import numpy as np
+from utils.simplex import SimplexSolver
+from utils.trace import TraceRecorder
+from utils.instrument import activeStats
+
+# dual simplex on the primal problem with 0 <= x_j <= u_j handled implicitly.
+# a variable sitting at its upper bound is substituted by x_j = u_j - x'_j
+# (its column is negated), so every nonbasic variable is at zero in the tableau
+class BoundedSimplexSolver(SimplexSolver):
+    def __init__(self, tol=1e-9):
+        self.tol = tol
+
+    # basis and flip flags share one array so the trace can copy them together
+    def newState(self, tableau):
+        n, m = tableau.shape
+        state = np.zeros(n - 1 + m - 1, dtype=int)
+        return state, state[:n - 1], state[n - 1:]
+
+    # x_j = u_j - x'_j on a column
+    def flipColumn(self, tableau, j, upper, flipped):
+        tableau[:, -1] -= upper[j] * tableau[:, j]
+        tableau[:, j] *= -1
+        flipped[j] ^= 1
+
+    # same substitution for the basic variable of row PR
+    def flipBasic(self, tableau, PR, basis, upper, flipped):
+        self.flipColumn(tableau, basis[PR], upper, flipped)
+        tableau[PR, :] *= -1
+
+    def extractBoundedSol(self, tableau, state, upper):
+        n = tableau.shape[0] - 1
+        basis, flipped = state[:n], state[n:]
+        sol = np.zeros(tableau.shape[1])
+        sol[basis] = tableau[:n, -1]
+        undo = np.flatnonzero(flipped)
+        sol[undo] = upper[undo] - sol[undo]
+        sol[-1] = -tableau[n, -1]  # Z
+        return sol
+
+    # step = (PR, PC, flipRow, flipCol): optional flip of the leaving row,
+    # optional pivot (PR = -1 for a pure bound flip), optional flip after it
+    def applyBoundedStep(self, tableau, state, step, upper):
+        n = tableau.shape[0] - 1
+        if step[0] == "objective":
+            # the objective row restored after the dual phase of a warm start
+            tableau[n, :] = step[1]
+            return
+        PR, PC, flipRow, flipCol = step
+        basis, flipped = state[:n], state[n:]
+        if flipRow:
+            self.flipBasic(tableau, PR, basis, upper, flipped)
+        if PR >= 0:
+            self.applyPivot(tableau, basis, (PR, PC))
+        if flipCol >= 0:
+            self.flipColumn(tableau, flipCol, upper, flipped)
+
+    # pivot the starting tableau into a previous basis. columns that are
+    # missing or dependent are replaced by surplus columns
+    def crashBasis(self, tableau, state, upper, warmStart):
+        n, m = tableau.shape
+        n -= 1
+        tol = self.tol
+        basis, flipped = state[:n], state[n:]
+        work = np.empty_like(tableau)
+        pivotCol = np.empty(n + 1)
+        # nonbasic variables that ended at their upper bound
+        warmBasis = [j for j in dict.fromkeys(np.asarray(warmStart['basis'], dtype=int)) if 0 <= j < m - 1]
+        for j in np.flatnonzero(np.asarray(warmStart.get('flipped', []), dtype=bool)[:m-1]):
+            if j not in warmBasis and np.isfinite(upper[j]) and not flipped[j]:
+                self.flipColumn(tableau, j, upper, flipped)
+        assigned = np.zeros(n, dtype=bool)
+        for j in warmBasis:
+            col = np.where(assigned, 0.0, np.abs(tableau[:n, j]))
+            PR = np.argmax(col)
+            if col[PR] < 1e3 * tol:
+                continue
+            self.pivot(tableau, PR, j, work, pivotCol)
+            basis[PR] = j
+            assigned[PR] = True
+        surplus = np.flatnonzero(~np.isfinite(upper))
+        for PR in np.flatnonzero(~assigned):
+            candidates = surplus[~np.isin(surplus, basis[assigned])]
+            j = candidates[np.argmax(np.abs(tableau[PR, candidates]))]
+            self.pivot(tableau, PR, j, work, pivotCol)
+            basis[PR] = j
+            assigned[PR] = True
+
+    # rebuild the objective row from the costs for the current basis
+    def restoreObjective(self, tableau, state, upper, costVectorC):
+        n = tableau.shape[0] - 1
+        basis, flipped = state[:n], state[n:]
+        numVars = len(costVectorC)
+        row = np.zeros(tableau.shape[1])
+        row[:numVars] = np.where(flipped[:numVars], -1.0, 1.0) * costVectorC
+        isFlipped = flipped[:numVars].astype(bool)
+        row[-1] = -np.sum(costVectorC[isFlipped] * upper[:numVars][isFlipped])
+        row -= row[basis] @ tableau[:n, :]
+        tableau[n, :] = row
+
+    # dual simplex: fixes basic variables outside their bounds
+    def dualSimplex(self, tableau, state, upper, recorder, maxIter, stats=None, started=None):
+        n, m = tableau.shape
+        n -= 1
+        tol = self.tol
+        basis, flipped = state[:n], state[n:]
+        work = np.empty_like(tableau)
+        pivotCol = np.empty(n + 1)
+        ratios = np.empty(m - 1)
+        iteration = 0
+        while True:
+            # leaving row: the basic variable furthest outside its bounds
+            rhs = tableau[:n, -1]
+            above = rhs - upper[basis]
+            infeas = np.maximum(-rhs, above)
+            PR = np.argmax(infeas)
+            if infeas[PR] <= tol * (1 + np.abs(rhs[PR])):
+                return 'Optimal', iteration
+            if iteration >= maxIter:
+                return 'IterationLimit', iteration
+            recorder.record(tableau, state)
+            iteration += 1
+            # above its upper bound: substitute it so it is below zero instead
+            flipRow = bool(above[PR] > 0)
+            if flipRow:
+                self.flipBasic(tableau, PR, basis, upper, flipped)
+            # dual ratio test over the negative entries of the pivot row
+            row = tableau[PR, :m-1]
+            eligible = row < -tol
+            if not eligible.any():
+                return 'Infeasible', iteration
+            ratios.fill(np.inf)
+            np.divide(tableau[n, :m-1], -row, out=ratios, where=eligible)
+            PC = np.argmin(ratios)
+            leaving = basis[PR]
+            self.pivot(tableau, PR, PC, work, pivotCol)
+            basis[PR] = PC
+            recorder.recordPivot((PR, PC, flipRow, -1), PC, leaving, -tableau[n, -1])
+            if stats is not None:
+                stats.iteration(started, iteration, PC, leaving, ratios[PC], -tableau[n, -1])
+
+    # primal simplex: brings in columns with a negative reduced cost while
+    # keeping every basic variable inside its bounds
+    def primalSimplex(self, tableau, state, upper, recorder, maxIter, stats=None, started=None):
+        n, m = tableau.shape
+        n -= 1
+        tol = self.tol
+        basis, flipped = state[:n], state[n:]
+        work = np.empty_like(tableau)
+        pivotCol = np.empty(n + 1)
+        ratios = np.empty(n)
+        iteration = 0
+        while True:
+            PC = np.argmin(tableau[n, :m-1])
+            if tableau[n, PC] >= -tol:
+                return 'Optimal', iteration
+            if iteration >= maxIter:
+                return 'IterationLimit', iteration
+            recorder.record(tableau, state)
+            iteration += 1
+            col = tableau[:n, PC]
+            rhs = tableau[:n, -1]
+            # rows that reach zero, rows that reach their upper bound
+            ratios.fill(np.inf)
+            np.divide(rhs, col, out=ratios, where=col > tol)
+            toUpper = np.full(n, np.inf)
+            np.divide(rhs - upper[basis], col, out=toUpper, where=(col < -tol) & np.isfinite(upper[basis]))
+            PR = np.argmin(np.minimum(ratios, toUpper))
+            step = min(ratios[PR], toUpper[PR])
+            if upper[PC] <= step:
+                # the entering variable reaches its own bound first
+                if not np.isfinite(upper[PC]):
+                    return 'Unbounded', iteration
+                self.flipColumn(tableau, PC, upper, flipped)
+                recorder.recordPivot((-1, -1, False, PC), PC, PC, -tableau[n, -1])
+                if stats is not None:
+                    stats.iteration(started, iteration, PC, PC, upper[PC], -tableau[n, -1])
+                continue
+            leaving = basis[PR]
+            leavesAtUpper = toUpper[PR] < ratios[PR]
+            self.pivot(tableau, PR, PC, work, pivotCol)
+            basis[PR] = PC
+            flipCol = -1
+            if leavesAtUpper:
+                self.flipColumn(tableau, leaving, upper, flipped)
+                flipCol = leaving
+            recorder.recordPivot((PR, PC, False, flipCol), PC, leaving, -tableau[n, -1])
+            if stats is not None:
+                stats.iteration(started, iteration, PC, leaving, step, -tableau[n, -1])
+
+    # warmStart = {'basis': columns, 'flipped': mask} from a previous solve
+    # (see remapWarmStart). target changes are then fixed by dual simplex,
+    # added or removed project columns by primal simplex. more than maxIter
+    # pivots in total stops the solve with 'IterationLimit'
+    def solveBounded(self, tableau, numVars, costVectorC, upperBound=20.0, trace="full", warmStart=None,
+                     maxIter=1000):
+        tableau = np.array(tableau, dtype=float)
+        costVectorC = np.asarray(costVectorC, dtype=float)
+        n, m = tableau.shape
+        n -= 1
+        tol = self.tol
+        # surplus variables have no upper bound
+        upper = np.full(m - 1, np.inf)
+        upper[:numVars] = upperBound
+        state, basis, flipped = self.newState(tableau)
+        basis[:] = self.findBasis(tableau)
+
+        if warmStart is not None:
+            self.crashBasis(tableau, state, upper, warmStart)
+        else:
+            # a negative cost starts at its upper bound so the row stays dual feasible
+            for j in np.flatnonzero(tableau[n, :m-1] < 0):
+                self.flipColumn(tableau, j, upper, flipped)
+
+        final = {}
+        extract = lambda T, S: self.extractBoundedSol(T, S, upper)
+        recorder = TraceRecorder(trace, extract,
+                                 lambda T, S, step: self.applyBoundedStep(T, S, step, upper),
+                                 finalSol=extract)
+        stats = activeStats()
+        started = stats.startSolve() if stats is not None else None
+
+        # a basis that is neither primal nor dual feasible gets its negative
+        # reduced costs shifted to zero for the dual phase, then restored.
+        # the trace starts from the shifted row and records the restore as a step
+        shifted = tableau[n, :m-1] < -tol
+        if shifted.any():
+            tableau[n, :m-1][shifted] = 0.0
+        recorder.start(tableau, state)
+        status, iterations = self.dualSimplex(tableau, state, upper, recorder, maxIter, stats, started)
+        if status == 'Optimal' and shifted.any():
+            self.restoreObjective(tableau, state, upper, costVectorC)
+            recorder.recordStep(("objective", tableau[n, :].copy()))
+            status, more = self.primalSimplex(tableau, state, upper, recorder, maxIter - iterations, stats, started)
+            iterations += more
+
+        sol = extract(tableau, state)
+        final.update(recorder.result(tableau, state, finished=status == 'Optimal'))
+        final['finalTableau'] = tableau
+        final['basis'] = basis
+        final['flipped'] = flipped.astype(bool)
+        final['iterations'] = iterations
+        final['warmStarted'] = warmStart is not None
+        final['status'] = status
+        if stats is not None:
+            stats.endSolve(started, recorder.nbytes())
+        if status == 'Optimal':
+            final['basicSolution'] = sol[:numVars]
+            final['Z'] = sol[-1]
+            # reduced costs of the surplus columns are the shadow prices
+            final['duals'] = tableau[n, numVars:m-1].copy()
+        else:
+            final['basicSolution'] = np.zeros(numVars)
+            final['Z'] = np.inf
+        return final
+
+
+# maps the final basis of a previous bounded solve onto a new project
+# selection, columns are matched by project and pollutant name
+def remapWarmStart(previousResult, previousNames, newNames, previousPollutants, newPollutants):
+    oldCols = list(previousNames) + [("surplus", p) for p in previousPollutants]
+    newIndex = {name: j for j, name in enumerate(list(newNames) + [("surplus", p) for p in newPollutants])}
+    basis = [newIndex.get(oldCols[j], -1) for j in previousResult['basis']]
+    flipped = np.zeros(len(newIndex), dtype=bool)
+    for j in np.flatnonzero(previousResult['flipped']):
+        if oldCols[j] in newIndex:
+            flipped[newIndex[oldCols[j]]] = True
+    return {'basis': np.array(basis, dtype=int), 'flipped': flipped}
@@ -0,0 +1,144 @@
+import heapq
+import os
+from multiprocessing import get_context
+import numpy as np
+from utils.boundedSimplex import BoundedSimplexSolver
+from utils.createTableau import createBoundedTableau
+
+# problem data every pool worker keeps for the whole search. an in-process
+# search (workers=1) passes its own dict around instead, so searches on
+# several threads don't share it
+PROBLEM = {}
+
+def initWorker(costVectorC, pollutantMatrixApoll, targetVectorBpoll, maxIter):
+    PROBLEM.update(c=costVectorC, A=pollutantMatrixApoll, b=targetVectorBpoll, maxIter=maxIter)
+
+# LP relaxation of a node, lower <= x <= upper is shifted to 0 <= x' <= upper - lower.
+# warmStart is the parent's final basis, only the branched bound changed so
+# dual simplex is usually done in a couple of pivots
+def solveNode(task, problem=None):
+    lower, upper, warmStart = task
+    problem = PROBLEM if problem is None else problem
+    c, A, b = problem['c'], problem['A'], problem['b']
+    limit = {} if problem['maxIter'] is None else {'maxIter': problem['maxIter']}
+    tableau = createBoundedTableau(c, A, b - A @ lower)
+    result = BoundedSimplexSolver().solveBounded(tableau, numVars=len(c), costVectorC=c, upperBound=upper - lower,
+                                                 trace="off", warmStart=warmStart, **limit)
+    if result['status'] != 'Optimal':
+        return result['status'], np.inf, None, None, result['iterations']
+    x = lower + result['basicSolution']
+    return 'Optimal', c @ x, x, {'basis': result['basis'], 'flipped': result['flipped']}, result['iterations']
+
+# integer project units: best-bound branch-and-bound on the bounded engine.
+# open nodes are taken from the heap in batches and solved by the pool.
+# onProgress gets the node count and incumbent after every batch, raising
+# from it stops the search. maxIter caps the pivots of every node's LP, a node
+# stopped by it stays unexplored. the status is 'NodeLimit' when maxNodes
+# left open nodes, 'Stalled' when only such unexplored nodes could still hold
+# a cheaper plan (without any plan: 'NoIncumbent' and 'IterationLimit').
+# worker processes are spawned, forking a multithreaded process (the
+# dashboard runs this on a solve thread) can deadlock
+def solveInteger(costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound=20.0, workers=1,
+                 batchSize=None, maxNodes=100000, gap=1e-9, tol=1e-6, onProgress=None, maxIter=None):
+    c = np.asarray(costVectorC, dtype=float)
+    A = np.asarray(pollutantMatrixApoll, dtype=float)
+    b = np.asarray(targetVectorBpoll, dtype=float)
+    numVars = len(c)
+    upper = np.floor(np.broadcast_to(np.asarray(upperBound, dtype=float), (numVars,)) + tol)
+    workers = workers or os.cpu_count() or 1
+    batchSize = batchSize or (1 if workers == 1 else 4 * workers)
+
+    incumbent = {'Z': np.inf, 'x': None}
+    def tryIncumbent(x):
+        # rounding the relaxation up is often already a feasible plan
+        xr = np.minimum(np.ceil(x - tol), upper) + 0.0
+        Z = c @ xr
+        if Z < incumbent['Z'] and (A @ xr >= b - tol * (1 + np.abs(b))).all():
+            incumbent.update(Z=Z, x=xr)
+
+    def cutoff(bound):
+        return bound >= incumbent['Z'] - gap * (1 + abs(incumbent['Z']))
+
+    heap = []
+    counter = 0
+    heapq.heappush(heap, (-np.inf, counter, np.zeros(numVars), upper, None))
+    nodes = 0
+    pivots = 0
+    relaxationZ = None
+    # bounds of nodes whose LP hit the iteration limit, they stay unexplored
+    stalled = []
+    pool = None
+    try:
+        if workers == 1:
+            problem = {'c': c, 'A': A, 'b': b, 'maxIter': maxIter}
+            solveBatch = lambda tasks: (solveNode(task, problem) for task in tasks)
+        else:
+            pool = get_context("spawn").Pool(workers, initializer=initWorker, initargs=(c, A, b, maxIter))
+            solveBatch = lambda tasks: pool.map(solveNode, tasks, chunksize=max(1, len(tasks) // workers))
+
+        while heap and nodes < maxNodes:
+            batch = []
+            while heap and len(batch) < batchSize:
+                node = heapq.heappop(heap)
+                if not cutoff(node[0]):
+                    batch.append(node)
+            if not batch:
+                break
+            nodes += len(batch)
+            solved = solveBatch([(nodeLower, nodeUpper, warm) for _, _, nodeLower, nodeUpper, warm in batch])
+            for (bound, _, nodeLower, nodeUpper, _), (status, Z, x, warm, iterations) in zip(batch, solved):
+                pivots += iterations
+                if relaxationZ is None:
+                    relaxationZ = Z
+                if status == 'IterationLimit':
+                    stalled.append(bound)
+                    continue
+                if status != 'Optimal' or cutoff(Z):
+                    continue
+                frac = np.abs(x - np.round(x))
+                j = np.argmax(frac)
+                if frac[j] <= tol:
+                    incumbent.update(Z=Z, x=np.round(x) + 0.0)
+                    continue
+                tryIncumbent(x)
+                # x_j <= floor and x_j >= ceil, both children start from this basis
+                down = nodeUpper.copy()
+                down[j] = np.floor(x[j])
+                up = nodeLower.copy()
+                up[j] = np.ceil(x[j])
+                counter += 1
+                heapq.heappush(heap, (Z, counter, nodeLower, down, warm))
+                counter += 1
+                heapq.heappush(heap, (Z, counter, up, nodeUpper, warm))
+            if onProgress is not None:
+                onProgress({'nodes': nodes, 'Z': float(incumbent['Z'])})
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    final = {'tableauList': [], 'objectiveRowList': [], 'basicSolutions': [], 'pivotSummary': [],
+             'finalTableau': None, 'nodes': nodes, 'iterations': pivots, 'engine': "integer",
+             'relaxationZ': np.inf if relaxationZ is None else relaxationZ}
+    openNodes = [node[0] for node in heap if not cutoff(node[0])]
+    openStalled = [bound for bound in stalled if not cutoff(bound)]
+    openBounds = openNodes + openStalled
+    final['stalledNodes'] = len(openStalled)
+    if incumbent['x'] is None:
+        # stopped before any whole-unit plan was found, which doesn't mean there is none
+        if openNodes:
+            final['status'] = 'NoIncumbent'
+        else:
+            final['status'] = 'IterationLimit' if openStalled else 'Infeasible'
+        final['basicSolution'] = np.zeros(numVars)
+        final['Z'] = np.inf
+        final['bestBound'] = min(openBounds, default=np.inf)
+        return final
+    if openNodes:
+        final['status'] = 'NodeLimit'
+    else:
+        final['status'] = 'Stalled' if openStalled else 'Optimal'
+    final['basicSolution'] = incumbent['x']
+    final['Z'] = incumbent['Z']
+    final['bestBound'] = min(openBounds + [incumbent['Z']])
+    return final
@@ -0,0 +1,169 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+def fileHash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# integer columns come back as floats from the matrix, show them as integers again
+def wholeNumbers(column):
+    return column.astype(int) if np.all(column == np.round(column)) else column
+
+def fingerprint(path):
+    stat = os.stat(path)
+    return {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+
+# writes through a temp file of its own, so concurrent writers never share one
+def writeAtomic(path, write, mode="wb"):
+    fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, mode, **({} if "b" in mode else {'encoding': "utf-8"})) as f:
+            write(f)
+        os.replace(tmpPath, path)
+    except BaseException:
+        os.remove(tmpPath)
+        raise
+
+# the project csv converted once to a (projects x 1 + pollutants) .npy matrix,
+# costs first, opened as a memmap. names, pollutants, targets and any other
+# csv columns sit in a json index next to it with the fingerprints of the csv
+# files they came from. the matrix file is named after the hash of its
+# contents and never rewritten, a rebuild only points the index at a new one,
+# so dashboard sessions, cli.py and service workers can rebuild at the same
+# time while others still have the old matrix mapped
+class ProjectCatalog:
+    def __init__(self, projectsPath='data/projects_matrix.csv', targetsPath='data/pollutant_targets.csv',
+                 storeDir='.cache/catalog'):
+        self.sources = {'projects': projectsPath, 'targets': targetsPath}
+        key = hashlib.sha256("\x1f".join(os.path.abspath(p) for p in self.sources.values()).encode("utf-8"))
+        self.storeDir = os.path.join(storeDir, key.hexdigest()[:16])
+        os.makedirs(self.storeDir, exist_ok=True)
+        self.index = None
+        self.matrix = None
+        self.frame = None
+        self.refresh()
+
+    def path(self, name):
+        return os.path.join(self.storeDir, name)
+
+    # cheap stat on every call. a changed mtime or size is confirmed with a
+    # hash, the store is only rebuilt when the contents really changed
+    def refresh(self):
+        index = self.index
+        if index is None and os.path.exists(self.path("index.json")):
+            with open(self.path("index.json"), encoding="utf-8") as f:
+                index = json.load(f)
+        if index is None or 'matrix' not in index or not os.path.exists(self.path(index['matrix'])):
+            self.build()
+            return True
+        changed = False
+        for name, path in self.sources.items():
+            current = fingerprint(path)
+            source = index['sources'][name]
+            if current['mtime'] == source['mtime'] and current['size'] == source['size']:
+                continue
+            if fileHash(path) != source['hash']:
+                self.build()
+                return True
+            # touched but identical, remember the new mtime
+            source.update(current)
+            changed = True
+        if changed:
+            self.writeIndex(index)
+        if self.matrix is None:
+            self.open(index)
+        return False
+
+    def build(self):
+        projectsDF = pd.read_csv(self.sources['projects'])
+        targetsDF = pd.read_csv(self.sources['targets'])
+        pollutants = targetsDF['Pollutant'].tolist()
+        matrix = np.ascontiguousarray(projectsDF[['Costs'] + pollutants].to_numpy(dtype=float))
+        matrixName = f"catalog-{hashlib.sha256(matrix.tobytes()).hexdigest()[:16]}-{matrix.shape[0]}.npy"
+        if not os.path.exists(self.path(matrixName)):
+            writeAtomic(self.path(matrixName), lambda f: np.save(f, matrix))
+        # columns that are neither the name, the cost nor a pollutant, kept for display
+        extras = [column for column in projectsDF.columns if column not in ['Project Name', 'Costs'] + pollutants]
+        index = {
+            'matrix': matrixName,
+            'names': projectsDF['Project Name'].astype(str).tolist(),
+            'pollutants': pollutants,
+            'targets': targetsDF.set_index('Pollutant').loc[pollutants, 'Target'].astype(float).tolist(),
+            'columns': projectsDF.columns.tolist(),
+            'extras': projectsDF[extras].to_json(orient="split", index=False) if extras else None,
+            'sources': {name: dict(fingerprint(path), hash=fileHash(path)) for name, path in self.sources.items()}
+        }
+        self.writeIndex(index)
+        self.open(index)
+        self.removeStale(matrixName)
+
+    # older matrix files another process may still have mapped, those are
+    # left for the next rebuild
+    def removeStale(self, current):
+        for name in os.listdir(self.storeDir):
+            if name.startswith("catalog") and name.endswith(".npy") and name != current:
+                try:
+                    os.remove(self.path(name))
+                except OSError:
+                    pass
+
+    def writeIndex(self, index):
+        writeAtomic(self.path("index.json"), lambda f: json.dump(index, f), mode="w")
+
+    def open(self, index):
+        self.index = index
+        self.matrix = np.load(self.path(index['matrix']), mmap_mode="r")
+        self.nameIndex = {name: i for i, name in enumerate(index['names'])}
+        self.targets = np.asarray(index['targets'])
+        self.frame = None
+
+    @property
+    def names(self):
+        return self.index['names']
+
+    @property
+    def pollutants(self):
+        return self.index['pollutants']
+
+    def indicesOf(self, names):
+        return np.array([self.nameIndex[name] for name in names], dtype=int)
+
+    # a contiguous run of projects is a view into the memmap, any other
+    # selection only gathers the selected rows, read-only like the view
+    def rows(self, indices):
+        indices = np.asarray(indices, dtype=int)
+        if len(indices) and np.all(np.diff(indices) == 1):
+            return self.matrix[indices[0]:indices[-1] + 1]
+        rows = self.matrix[indices]
+        rows.flags.writeable = False
+        return rows
+
+    # same arrays as loadData.prepareProblem: costs, (projects x pollutants) matrix, targets.
+    # costs and matrix are read-only views of the memmap (copy them to edit),
+    # the targets are a fresh copy
+    def problem(self, indices):
+        rows = self.rows(indices)
+        return rows[:, 0], rows[:, 1:], self.targets.copy()
+
+    # the catalog as a dataframe for display, built once per reload
+    def projectsDF(self):
+        if self.frame is None:
+            frame = pd.DataFrame(np.asarray(self.matrix), columns=['Costs'] + self.pollutants)
+            frame['Costs'] = wholeNumbers(frame['Costs'])
+            frame.insert(0, 'Project Name', self.names)
+            if self.index.get('extras'):
+                extras = pd.read_json(io.StringIO(self.index['extras']), orient="split")
+                frame = pd.concat([frame, extras], axis=1)[self.index['columns']]
+            self.frame = frame
+        return self.frame
+
+    def targetsDF(self):
+        return pd.DataFrame({'Pollutant': self.pollutants, 'Target': wholeNumbers(pd.Series(self.targets))})
@@ -1,7 +1,9 @@
+import time
 import numpy as np
-import pandas as pd
+from utils.instrument import reportBuild
 
-def createTableau(costVectorC, pollutantMatrixApoll, targetVectorBpoll):
+def createTableau(costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound=20.0):
+    start = time.perf_counter()
     # get the number of projects 
     numProjects = len(costVectorC)
     # get the number of pollutants
@@ -12,8 +14,8 @@ def createTableau(costVectorC, pollutantMatrixApoll, targetVectorBpoll):
     pollVector = targetVectorBpoll.reshape(-1, 1)
     # project limits x >= 20 transformed to -x <= -20
     limitsA = np.eye(numProjects) * -1
-    # limit value 20 projects
-    limitsB = np.full((numProjects, 1), -20.0)
+    # limit value 20 projects (or one limit per project)
+    limitsB = -np.broadcast_to(np.asarray(upperBound, dtype=float), (numProjects,)).reshape(-1, 1)
     # stacking the pollutant matrix and the limits
     matrixLimits = np.vstack([pollMatrix, limitsA])
     # same with matrixLimits
@@ -42,4 +44,57 @@ def createTableau(costVectorC, pollutantMatrixApoll, targetVectorBpoll):
     
     # fill Z column
     tableau[-1, -2] = 1.0
+    reportBuild(tableau, start)
     return tableau
+
+
+def createBoundedTableau(costVectorC, pollutantMatrixApoll, targetVectorBpoll):
+    start = time.perf_counter()
+    # the project limits are kept as bounds on x instead of extra rows,
+    # so only the pollutant rows are left
+    numProjects = len(costVectorC)
+    numPollutants = len(targetVectorBpoll)
+    # surplus s = A x - b >= 0 written as -A x + s = -b
+    rows = numPollutants + 1
+    cols = numProjects + numPollutants + 1
+    tableau = np.zeros((rows, cols))
+    # fill coefficients
+    tableau[:numPollutants, :numProjects] = -pollutantMatrixApoll
+    tableau[:numPollutants, numProjects : numProjects + numPollutants] = np.eye(numPollutants)
+    # fill rhs
+    tableau[:numPollutants, -1] = -np.asarray(targetVectorBpoll, dtype=float)
+    # fill objective row (costs), its rhs holds -Z
+    tableau[-1, :numProjects] = costVectorC
+    reportBuild(tableau, start)
+    return tableau
+
+
+def createTableauBatch(costMatrixC, pollutantMatrixApoll, targetMatrixBpoll, upperBound=20.0):
+    # same layout as createTableau, one tableau per scenario stacked on axis 0.
+    # costs (S, P) or (P,), targets (S, K) or (K,), pollutant matrix (K, P) or (S, K, P)
+    start = time.perf_counter()
+    costMatrixC = np.asarray(costMatrixC, dtype=float)
+    targetMatrixBpoll = np.asarray(targetMatrixBpoll, dtype=float)
+    pollMatrix = np.asarray(pollutantMatrixApoll, dtype=float)
+    numPollutants, numProjects = pollMatrix.shape[-2:]
+    numScenarios = max(costMatrixC.reshape(-1, numProjects).shape[0],
+                       targetMatrixBpoll.reshape(-1, numPollutants).shape[0],
+                       pollMatrix.reshape(-1, numPollutants, numProjects).shape[0])
+    numDualVars = numPollutants + numProjects
+    numSlacks = numProjects
+    rows = numSlacks + 1
+    cols = numDualVars + numSlacks + 2
+    tableaus = np.zeros((numScenarios, rows, cols))
+    # fill coefficients, the transposed pollutant matrix and the -I limits
+    tableaus[:, :numSlacks, :numPollutants] = np.swapaxes(pollMatrix, -1, -2)
+    tableaus[:, :numSlacks, numPollutants:numDualVars] = np.eye(numProjects) * -1
+    tableaus[:, :numSlacks, numDualVars:numDualVars + numSlacks] = np.eye(numSlacks)
+    # fill rhs
+    tableaus[:, :numSlacks, -1] = costMatrixC
+    # fill objective row
+    tableaus[:, -1, :numPollutants] = -targetMatrixBpoll
+    tableaus[:, -1, numPollutants:numDualVars] = np.broadcast_to(np.asarray(upperBound, dtype=float), (numProjects,))
+    # fill Z column
+    tableaus[:, -1, -2] = 1.0
+    reportBuild(tableaus, start)
+    return tableaus
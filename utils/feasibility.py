@@ -0,0 +1,185 @@
+import os
+from multiprocessing import get_context
+import numpy as np
+from utils.boundedSimplex import BoundedSimplexSolver, remapWarmStart
+from utils.createTableau import createBoundedTableau
+
+# problem data every pool worker keeps for the whole search. an in-process
+# search (workers=1) passes its own dict around instead, so searches on
+# several threads don't share it
+PROBLEM = {}
+
+def initWorker(pollutantMatrixApoll, targetVectorBpoll, upper, maxIter):
+    PROBLEM.update(A=pollutantMatrixApoll, b=targetVectorBpoll, upper=upper, maxIter=maxIter)
+
+# no solve needed: a target above what every project at its limit could reach
+# can't be met, and if every project at its limit meets every target the
+# selection is feasible. anything else is 'Unknown' (negative coefficients)
+def precheck(pollutantMatrixApoll, targetVectorBpoll, upperBound=20.0, tol=1e-9):
+    A = np.asarray(pollutantMatrixApoll, dtype=float)
+    b = np.asarray(targetVectorBpoll, dtype=float)
+    upper = np.broadcast_to(np.asarray(upperBound, dtype=float), (A.shape[1],))
+    slack = tol * (1 + np.abs(b))
+    maxActivity = np.clip(A, 0.0, None) @ upper
+    short = maxActivity < b - slack
+    if short.any():
+        status = 'Infeasible'
+    elif (A @ upper >= b - slack).all():
+        status = 'Feasible'
+    else:
+        status = 'Unknown'
+    return {'status': status, 'maxActivity': maxActivity, 'shortTargets': np.flatnonzero(short)}
+
+# elastic LP over the targets in rows and the limits in limits (a boolean mask):
+# min sum w_k t_k s.t. A x + t >= b, 0 <= x <= u where limited, t >= 0.
+# a positive optimum means the subset is infeasible and the shadow prices y
+# prove it, b y > sum of u_j max((A^T y)_j, 0) over the limited projects.
+# with every project at cost zero the dual simplex can cycle, so it first runs
+# with tiny distinct project costs and the basis it ends in is re-solved with
+# the real ones (usually without a single pivot). the shortfall is None when
+# either solve hit its iteration limit
+def solveElastic(problem, rows, limits, warmStart=None):
+    A, b, upper = problem['A'], problem['b'], problem['upper']
+    numPollutants, numProjects = A.shape
+    if len(rows) == 0:
+        return 0.0, np.zeros(numPollutants), None
+    weights = 1.0 / (1.0 + np.abs(b[rows]))
+    cost = np.concatenate([np.zeros(numProjects), weights])
+    perturbed = cost.copy()
+    perturbed[:numProjects] = 1e-6 * weights.min() * (1 + np.arange(numProjects) / numProjects)
+    bounds = np.concatenate([np.where(limits, upper, np.inf), np.full(len(rows), np.inf)])
+    matrix = np.hstack([A[rows], np.eye(len(rows))])
+    solve = lambda c, warm: BoundedSimplexSolver().solveBounded(
+        createBoundedTableau(c, matrix, b[rows]), numVars=len(c), costVectorC=c, upperBound=bounds, trace="off",
+        warmStart=warm, maxIter=problem['maxIter'])
+    result = solve(perturbed, warmStart)
+    if result['status'] != 'Optimal' and warmStart is not None:
+        # a warm start can still stall, a cold start rarely does
+        result = solve(perturbed, None)
+    if result['status'] == 'Optimal':
+        result = solve(cost, {'basis': result['basis'], 'flipped': result['flipped']})
+    if result['status'] != 'Optimal':
+        return None, np.zeros(numPollutants), None
+    y = np.zeros(numPollutants)
+    y[rows] = np.maximum(result['duals'], 0.0)
+    return result['Z'], y, {'basis': result['basis'], 'flipped': result['flipped'], 'rows': rows}
+
+def columnNames(numProjects, rows):
+    return list(range(numProjects)) + [("elastic", k) for k in rows]
+
+# one deletion test, the subset without constraint i. warm is the final basis
+# of the subset it was taken from
+def testSubset(task, problem=None):
+    rows, limits, warm = task
+    warmStart = None
+    if warm is not None:
+        numProjects = len(limits)
+        warmStart = remapWarmStart(warm, columnNames(numProjects, warm['rows']), columnNames(numProjects, rows),
+                                   warm['rows'], rows)
+    return solveElastic(PROBLEM if problem is None else problem, rows, limits, warmStart)
+
+# rows and limits a certificate y actually uses, kept only if y still proves
+# infeasibility on them alone
+def certificateSupport(problem, y, rows, limits, tol):
+    A, b, upper = problem['A'], problem['b'], problem['upper']
+    seedRows = rows[y[rows] > tol * y.max()]
+    yRows = np.zeros_like(y)
+    yRows[seedRows] = y[seedRows]
+    pressure = A.T @ yRows
+    seedLimits = limits & (pressure > 0)
+    if (pressure[~seedLimits] > 0).any():
+        return rows, limits
+    if b @ yRows - upper[seedLimits] @ pressure[seedLimits] <= tol * (1 + np.abs(b[seedRows]) @ y[seedRows]):
+        return rows, limits
+    return seedRows, seedLimits
+
+# irreducible infeasible subset of the pollutant targets and project limits:
+# dropping any one of them makes the rest feasible. targets the precheck already
+# rules out need no solve at all, otherwise the subset starts from the
+# support of a farkas certificate, then a deletion filter tests batches of
+# candidates on the pool. a feasible test marks its constraint as needed for
+# good, the first infeasible one shrinks the subset to its own certificate.
+# an elastic solve that hits maxIter stops the search with 'IterationLimit'
+def findIIS(pollutantMatrixApoll, targetVectorBpoll, upperBound=20.0, workers=1, batchSize=None, maxIter=10000,
+            tol=1e-9):
+    A = np.asarray(pollutantMatrixApoll, dtype=float)
+    b = np.asarray(targetVectorBpoll, dtype=float)
+    numPollutants, numProjects = A.shape
+    upper = np.broadcast_to(np.asarray(upperBound, dtype=float), (numProjects,)).copy()
+    workers = workers or os.cpu_count() or 1
+    batchSize = batchSize or workers
+
+    check = precheck(A, b, upper)
+    if check['status'] == 'Infeasible':
+        # a target out of reach on its own only conflicts with the limits of
+        # the projects that reduce it, take the one with the fewest
+        positive = (A[check['shortTargets']] > 0) & np.isfinite(upper)
+        k = check['shortTargets'][np.argmin(positive.sum(axis=1))]
+        certificate = np.zeros(numPollutants)
+        certificate[k] = 1.0
+        return {'status': 'Infeasible', 'shortfall': None, 'tests': 0, 'targets': np.array([k]),
+                'limits': np.flatnonzero((A[k] > 0) & np.isfinite(upper)), 'certificate': certificate}
+    if check['status'] == 'Feasible':
+        return {'status': 'Feasible', 'shortfall': 0.0, 'tests': 0, 'targets': np.zeros(0, dtype=int),
+                'limits': np.zeros(0, dtype=int), 'certificate': np.zeros(numPollutants)}
+
+    problem = {'A': A, 'b': b, 'upper': upper, 'maxIter': maxIter}
+    rows = np.arange(numPollutants)
+    limits = np.isfinite(upper)
+    shortfall, y, warm = solveElastic(problem, rows, limits)
+    final = {'shortfall': shortfall, 'tests': 1, 'targets': np.zeros(0, dtype=int),
+             'limits': np.zeros(0, dtype=int), 'certificate': np.zeros(numPollutants)}
+    if shortfall is None or shortfall <= tol * (1 + len(rows)):
+        final['status'] = 'IterationLimit' if shortfall is None else 'Feasible'
+        return final
+    rows, limits = certificateSupport(problem, y, rows, limits, tol)
+    certificate = y
+    neededRows = np.zeros(numPollutants, dtype=bool)
+    neededLimits = np.zeros(numProjects, dtype=bool)
+    pool = None
+    try:
+        if workers > 1:
+            pool = get_context().Pool(workers, initializer=initWorker, initargs=(A, b, upper, maxIter))
+        status = 'Infeasible'
+        while status == 'Infeasible':
+            # limits first, they are usually most of the subset and cheap to drop
+            candidates = [("limit", j) for j in np.flatnonzero(limits & ~neededLimits)]
+            candidates += [("target", k) for k in rows if not neededRows[k]]
+            if not candidates:
+                break
+            batch = candidates[:batchSize]
+            tasks = []
+            for kind, i in batch:
+                if kind == "limit":
+                    subsetLimits = limits.copy()
+                    subsetLimits[i] = False
+                    tasks.append((rows, subsetLimits, warm))
+                else:
+                    tasks.append((rows[rows != i], limits, warm))
+            solved = pool.map(testSubset, tasks) if pool is not None else (testSubset(task, problem) for task in tasks)
+            shrunk = False
+            for (kind, i), task, (Z, y, testWarm) in zip(batch, tasks, solved):
+                final['tests'] += 1
+                if Z is None:
+                    # the subset found so far is infeasible but may not be minimal
+                    status = 'IterationLimit'
+                elif Z <= tol * (1 + len(task[0])):
+                    # feasible without it, stays needed in every smaller subset
+                    if kind == "limit":
+                        neededLimits[i] = True
+                    else:
+                        neededRows[i] = True
+                elif not shrunk:
+                    rows, limits = certificateSupport(problem, y, *task[:2], tol)
+                    certificate, warm = y, testWarm
+                    shrunk = True
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    final['status'] = status
+    final['targets'] = rows
+    final['limits'] = np.flatnonzero(limits)
+    final['certificate'] = certificate
+    return final
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# collectors of the open profile() blocks per thread, builders and solvers
+# report to the innermost one and skip all timing when there is none
+LOCAL = threading.local()
+
+def activeStack():
+    if not hasattr(LOCAL, 'stack'):
+        LOCAL.stack = []
+    return LOCAL.stack
+
+def activeStats():
+    stack = activeStack()
+    return stack[-1] if stack else None
+
+# counters over every build and solve inside one profile() block, onIteration
+# gets a dict per pivot (entering, leaving, ratio, Z, elapsedNs since the solve started)
+class SolverStats:
+    def __init__(self, onIteration=None):
+        self.onIteration = onIteration
+        self.counters = {
+            'builds': 0,
+            'buildSeconds': 0.0,
+            'tableauShape': None,
+            'peakTableauBytes': 0,
+            'solves': 0,
+            'solveSeconds': 0.0,
+            'pivots': 0,
+            'degeneratePivots': 0,
+            'peakTraceBytes': 0
+        }
+
+    def build(self, tableau, seconds):
+        counters = self.counters
+        counters['builds'] += 1
+        counters['buildSeconds'] += seconds
+        counters['tableauShape'] = list(tableau.shape)
+        counters['peakTableauBytes'] = max(counters['peakTableauBytes'], int(tableau.nbytes))
+
+    def startSolve(self):
+        return time.perf_counter_ns()
+
+    # ratio is the step length of the pivot, zero means Z did not move
+    def iteration(self, start, iteration, entering, leaving, ratio, Z):
+        elapsed = time.perf_counter_ns() - start
+        self.counters['pivots'] += 1
+        if ratio == 0:
+            self.counters['degeneratePivots'] += 1
+        if self.onIteration is not None:
+            self.onIteration({
+                'iteration': int(iteration),
+                'entering': int(entering),
+                'leaving': int(leaving),
+                'ratio': float(ratio),
+                'Z': float(Z),
+                'elapsedNs': elapsed
+            })
+
+    def endSolve(self, start, traceBytes=0):
+        counters = self.counters
+        counters['solves'] += 1
+        counters['solveSeconds'] += (time.perf_counter_ns() - start) / 1e9
+        counters['peakTraceBytes'] = max(counters['peakTraceBytes'], int(traceBytes))
+
+    def toDict(self):
+        return dict(self.counters)
+
+# called by the tableau builders with their start time
+def reportBuild(tableau, start):
+    stats = activeStats()
+    if stats is not None:
+        stats.build(tableau, time.perf_counter() - start)
+
+# with profile("perf.json") as stats: ... collects every solve in the block
+# and writes the counters as json when it closes
+@contextmanager
+def profile(path=None, onIteration=None):
+    stats = SolverStats(onIteration)
+    stack = activeStack()
+    stack.append(stats)
+    try:
+        yield stats
+    finally:
+        stack.remove(stats)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(stats.toDict(), f, indent=2)
@@ -0,0 +1,192 @@
+import numpy as np
+from utils.instrument import activeStats
+from utils.boundedSimplex import BoundedSimplexSolver
+from utils.createTableau import createBoundedTableau
+
+# largest step in [0, 1] along d that keeps v + step * d > 0
+def maxStep(v, d):
+    shrinking = d < 0
+    if not shrinking.any():
+        return 1.0
+    return min(1.0, float(np.min(-v[shrinking] / d[shrinking])))
+
+# N y = r for the symmetric positive definite normal matrix. the diagonal is
+# nudged when the factorization fails, which happens when some columns of
+# theta have gone to zero near the optimum
+def choleskySolve(N, r):
+    shift = 0.0
+    scale = max(np.abs(np.diag(N)).max(), 1.0)
+    while True:
+        try:
+            L = np.linalg.cholesky(N + shift * np.eye(len(N)))
+            return np.linalg.solve(L.T, np.linalg.solve(L, r))
+        except np.linalg.LinAlgError:
+            shift = max(10 * shift, 1e-14 * scale)
+
+# Mehrotra predictor-corrector on min c x s.t. A x - s = b, 0 <= x <= u, s >= 0.
+# every iteration factors one pollutants x pollutants normal matrix, so the cost
+# grows linearly with the number of projects instead of with the pivots of a
+# tableau. crossover pivots the interior solution onto a vertex with the
+# bounded engine, so the units and the basis match what simplex reports.
+# crossoverMaxIter caps its pivots, the result reports the cap
+class InteriorPointSolver:
+    def __init__(self, maxIter=100, tol=1e-8):
+        self.maxIter = maxIter
+        self.tol = tol
+
+    def solve(self, costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound=20.0, trace="summary",
+              crossover=True, crossoverMaxIter=1000):
+        if trace not in ("off", "summary"):
+            raise ValueError("InteriorPointSolver only records trace='off' or 'summary'")
+        tol = self.tol
+        c = np.asarray(costVectorC, dtype=float)
+        A = np.asarray(pollutantMatrixApoll, dtype=float)
+        b = np.asarray(targetVectorBpoll, dtype=float)
+        numPollutants, numProjects = A.shape
+        # v = [x, s], only the projects have an upper bound
+        M = np.hstack([A, -np.eye(numPollutants)])
+        cost = np.concatenate([c, np.zeros(numPollutants)])
+        hasUpper = np.zeros(numProjects + numPollutants, dtype=bool)
+        hasUpper[:numProjects] = True
+        u = np.zeros(len(hasUpper))
+        u[:numProjects] = upperBound
+
+        # start in the middle of the box with the dual residual at zero
+        delta = max(1.0, np.abs(c).mean())
+        v = np.concatenate([u[:numProjects] / 2, np.maximum(A @ (u[:numProjects] / 2) - b, 1.0)])
+        w = np.where(hasUpper, u - v, 1.0)
+        y = np.full(numPollutants, delta / max(np.abs(A).sum(axis=1).mean(), 1.0))
+        reduced = cost - M.T @ y
+        z = np.maximum(reduced, 0.0) + delta
+        q = np.where(hasUpper, np.maximum(-reduced, 0.0) + delta, 0.0)
+        z[~hasUpper] = np.maximum(reduced[~hasUpper], 0.0) + y.min()
+        numPairs = len(v) + numProjects
+        normB = 1 + np.linalg.norm(b)
+        normC = 1 + np.linalg.norm(cost)
+        normU = 1 + np.linalg.norm(u)
+
+        def direction(rp, ru, rd, rcz, rcq):
+            # Z dv + V dz = rcz, Q dw + W dq = rcq, dv + dw = ru reduce to
+            # (M theta M^T) dy = rp + M theta r
+            invTheta = z / v + np.where(hasUpper, q / w, 0.0)
+            theta = 1.0 / invTheta
+            r = rd - rcz / v + np.where(hasUpper, (rcq - q * ru) / w, 0.0)
+            dy = choleskySolve((M * theta) @ M.T, rp + M @ (theta * r))
+            dv = theta * (M.T @ dy - r)
+            dz = (rcz - z * dv) / v
+            dw = np.where(hasUpper, ru - dv, 0.0)
+            dq = np.where(hasUpper, (rcq - q * dw) / w, 0.0)
+            return dv, dw, dy, dz, dq
+
+        stats = activeStats()
+        started = stats.startSolve() if stats is not None else None
+        final = {}
+        iterationSummary = []
+        status = 'IterationLimit'
+        iteration = 0
+        while iteration < self.maxIter:
+            rp = b - M @ v
+            ru = np.where(hasUpper, u - v - w, 0.0)
+            rd = cost - M.T @ y - z + q
+            mu = (v @ z + w[hasUpper] @ q[hasUpper]) / numPairs
+            primalZ = cost @ v
+            dualZ = b @ y - u @ q
+            primalRes = max(np.linalg.norm(rp) / normB, np.linalg.norm(ru) / normU)
+            dualRes = np.linalg.norm(rd) / normC
+            if primalRes < tol and dualRes < tol and abs(primalZ - dualZ) < tol * (1 + abs(primalZ)):
+                status = 'Optimal'
+                break
+            # y >= 0 with b y > max over the box of y A x proves the targets can't be met
+            yPos = np.maximum(y, 0.0)
+            reach = u[:numProjects] @ np.maximum(A.T @ yPos, 0.0)
+            if b @ yPos - reach > tol * (1 + abs(b @ yPos) + reach):
+                status = 'Infeasible'
+                break
+            iteration += 1
+
+            # predictor: pure Newton step towards complementarity
+            dv, dw, dy, dz, dq = direction(rp, ru, rd, -v * z, np.where(hasUpper, -w * q, 0.0))
+            alphaP = min(maxStep(v, dv), maxStep(w[hasUpper], dw[hasUpper]))
+            alphaD = min(maxStep(z, dz), maxStep(q[hasUpper], dq[hasUpper]))
+            muAff = ((v + alphaP * dv) @ (z + alphaD * dz)
+                     + (w + alphaP * dw)[hasUpper] @ (q + alphaD * dq)[hasUpper]) / numPairs
+            sigma = (muAff / mu) ** 3
+            # corrector: centred and with the second order term of the predictor
+            rcz = sigma * mu - v * z - dv * dz
+            rcq = np.where(hasUpper, sigma * mu - w * q - dw * dq, 0.0)
+            dv, dw, dy, dz, dq = direction(rp, ru, rd, rcz, rcq)
+            alphaP = min(1.0, 0.995 * min(maxStep(v, dv), maxStep(w[hasUpper], dw[hasUpper])))
+            alphaD = min(1.0, 0.995 * min(maxStep(z, dz), maxStep(q[hasUpper], dq[hasUpper])))
+            v += alphaP * dv
+            w += alphaP * dw
+            y += alphaD * dy
+            z += alphaD * dz
+            q += alphaD * dq
+
+            # no pivots here, the instrumentation gets -1 for entering and leaving
+            if stats is not None:
+                stats.iteration(started, iteration, -1, -1, alphaP, cost @ v)
+            if trace == "summary":
+                iterationSummary.append({
+                    "iteration": iteration,
+                    "Z": float(cost @ v),
+                    "mu": float(mu),
+                    "primalResidual": float(primalRes),
+                    "dualResidual": float(dualRes)
+                })
+
+        if stats is not None:
+            stats.endSolve(started, 40 * len(iterationSummary))
+        final['tableauList'] = []
+        final['objectiveRowList'] = []
+        final['basicSolutions'] = []
+        final['pivotSummary'] = iterationSummary
+        final['finalTableau'] = None
+        final['iterations'] = iteration
+        final['crossoverStatus'] = None
+        final['crossoverIterations'] = 0
+        final['crossoverMaxIter'] = crossoverMaxIter
+        final['basis'] = None
+        final['status'] = status
+        if status != 'Optimal':
+            final['basicSolution'] = np.zeros(numProjects)
+            final['Z'] = np.inf
+            if status == 'Infeasible':
+                final['farkas'] = yPos / max(yPos.max(), 1e-300)
+            return final
+        x = np.clip(v[:numProjects], 0.0, u[:numProjects])
+        final['basicSolution'] = x
+        final['Z'] = c @ x
+        final['duals'] = np.maximum(y, 0.0)
+        if crossover:
+            final.update(self.crossover(c, A, b, v, upperBound, crossoverMaxIter))
+        return final
+
+    # the columns furthest inside their bounds become the starting basis of a
+    # warm-started bounded solve, nonbasic projects start at the nearer bound
+    def crossover(self, c, A, b, v, upperBound, maxIter):
+        numPollutants, numProjects = A.shape
+        upper = np.full(len(v), np.inf)
+        upper[:numProjects] = upperBound
+        slack = np.minimum(v, upper - v)
+        slack[:numProjects] /= upper[:numProjects]
+        slack[numProjects:] /= 1 + np.abs(v[numProjects:]).max()
+        basis = np.argsort(-slack, kind="stable")[:numPollutants]
+        flipped = v > upper / 2
+        flipped[basis] = False
+        tableau = createBoundedTableau(c, A, b)
+        result = BoundedSimplexSolver().solveBounded(tableau, numVars=numProjects, costVectorC=c,
+                                                     upperBound=upperBound, trace="off",
+                                                     warmStart={'basis': basis, 'flipped': flipped}, maxIter=maxIter)
+        if result['status'] != 'Optimal':
+            # the interior solution is still optimal, it just isn't a vertex
+            return {'crossoverStatus': result['status'], 'crossoverIterations': result['iterations']}
+        return {
+            'crossoverStatus': result['status'],
+            'basicSolution': result['basicSolution'],
+            'Z': result['Z'],
+            'duals': result['duals'],
+            'basis': result['basis'],
+            'flipped': result['flipped'],
+            'crossoverIterations': result['iterations']
+        }
@@ -0,0 +1,19 @@
+import pandas as pd
+
+# reads the project matrix and the pollutant targets
+def loadProblemData(projectsPath='data/projects_matrix.csv', targetsPath='data/pollutant_targets.csv'):
+    projectsDF = pd.read_csv(projectsPath)
+    targetsDF = pd.read_csv(targetsPath)
+    pollutantCols = targetsDF['Pollutant'].tolist()
+    return projectsDF, targetsDF, pollutantCols
+
+# keeps the selected projects in the order they were selected and builds
+# the cost vector, the (projects x pollutants) matrix and the targets
+def prepareProblem(projectsDF, targetsDF, pollutantCols, selectedNames):
+    filteredDF = projectsDF[projectsDF['Project Name'].isin(selectedNames)].copy()
+    filteredDF['Project Name'] = pd.Categorical(filteredDF['Project Name'], categories=selectedNames, ordered=True)
+    filteredDF = filteredDF.sort_values('Project Name')
+    costVectorC = filteredDF['Costs'].values
+    pollutantMatrix = filteredDF[pollutantCols].values
+    targetPollutants = targetsDF.set_index('Pollutant').loc[pollutantCols, 'Target'].values
+    return filteredDF, costVectorC, pollutantMatrix, targetPollutants
@@ -0,0 +1,123 @@
+import os
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from utils.createTableau import createTableauBatch
+from utils.batchSimplex import BatchSimplexSolver
+
+# arrays the pool workers read and write in place, only names and shapes are
+# pickled. a run with workers=1 never touches it, it works on its own blocks
+SHARED = {}
+
+def attachShared(layout):
+    blocks = {}
+    for name, (shmName, shape) in layout.items():
+        shm = SharedMemory(name=shmName)
+        blocks[name] = (shm, np.ndarray(shape, dtype=float, buffer=shm.buf))
+    return blocks
+
+def initWorker(layout):
+    SHARED.update(attachShared(layout))
+
+# solves samples [start, start + count) as one batch, perturbations are
+# seeded by (seed, start) so every chunk is reproducible on any worker
+def solveSamples(arrays, task):
+    start, count, seed, costSigma, coeffSigma = task
+    c = arrays['cost']
+    A = arrays['matrix']
+    b = arrays['targets']
+    rng = np.random.default_rng([seed, start])
+    # lognormal factors keep costs and reductions positive with mean 1
+    costs = c * rng.lognormal(-costSigma ** 2 / 2, costSigma, (count, len(c)))
+    matrices = A * rng.lognormal(-coeffSigma ** 2 / 2, coeffSigma, (count,) + A.shape)
+    result = BatchSimplexSolver().solve(createTableauBatch(costs, matrices, b), numVars=len(c))
+    arrays['Z'][start:start + count] = result['Z']
+    arrays['units'][start:start + count] = result['basicSolution']
+    return start, count
+
+def solveChunk(task):
+    return solveSamples({name: array for name, (_, array) in SHARED.items()}, task)
+
+# yields running aggregates (Z percentiles, feasibility, how often each project
+# is chosen) every time a chunk of samples comes back from the pool. running
+# percentiles come from an evenly strided subsample of at most maxSample
+# values per update, the last update ('exact': True) uses every sample
+def runMonteCarlo(costVectorC, pollutantMatrixApoll, targetVectorBpoll, numSamples=10000, costSigma=0.1,
+                  coeffSigma=0.1, seed=0, workers=None, chunkSize=250, percentiles=(5, 50, 95), tol=1e-6,
+                  maxSample=4096):
+    costVectorC = np.asarray(costVectorC, dtype=float)
+    pollutantMatrixApoll = np.asarray(pollutantMatrixApoll, dtype=float)
+    targetVectorBpoll = np.asarray(targetVectorBpoll, dtype=float)
+    numProjects = len(costVectorC)
+    workers = workers or os.cpu_count() or 1
+    arrays = {
+        'cost': costVectorC,
+        'matrix': pollutantMatrixApoll,
+        'targets': targetVectorBpoll,
+        'Z': np.full(numSamples, np.nan),
+        'units': np.zeros((numSamples, numProjects))
+    }
+    owned = {}
+    layout = {}
+    views = {}
+    try:
+        for name, array in arrays.items():
+            shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=float, buffer=shm.buf)[...] = array
+            owned[name] = shm
+            layout[name] = (shm.name, array.shape)
+        for name, (_, shape) in layout.items():
+            views[name] = np.ndarray(shape, dtype=float, buffer=owned[name].buf)
+        tasks = [(start, min(chunkSize, numSamples - start), seed, costSigma, coeffSigma)
+                 for start in range(0, numSamples, chunkSize)]
+
+        stride = -(-numSamples // maxSample)
+        totals = {'done': 0, 'feasible': 0, 'sumZ': 0.0}
+        selected = np.zeros(numProjects)
+        unitSum = np.zeros(numProjects)
+        strided = []
+
+        # every update only looks at the chunk that came back
+        def summary(start, count):
+            chunkZ = views['Z'][start:start + count]
+            chunkUnits = views['units'][start:start + count]
+            feasible = np.isfinite(chunkZ)
+            totals['done'] += count
+            totals['feasible'] += int(feasible.sum())
+            totals['sumZ'] += float(chunkZ[feasible].sum())
+            selected[:] += (chunkUnits[feasible] > tol).sum(axis=0)
+            unitSum[:] += chunkUnits[feasible].sum(axis=0)
+            # samples whose index is a multiple of stride, so the subsample is even over the whole run
+            first = -(-start // stride) * stride
+            strided.append(views['Z'][first:start + count:stride])
+            exact = totals['done'] == numSamples
+            if exact:
+                sampleZ = views['Z'][np.isfinite(views['Z'])]
+            else:
+                sampleZ = np.concatenate(strided)
+                sampleZ = sampleZ[np.isfinite(sampleZ)]
+            numFeasible = totals['feasible']
+            return {
+                'done': totals['done'],
+                'numSamples': numSamples,
+                'feasibleRate': numFeasible / totals['done'],
+                'percentiles': dict(zip(percentiles, np.percentile(sampleZ, percentiles))) if len(sampleZ) else {},
+                'exact': exact,
+                'meanZ': totals['sumZ'] / numFeasible if numFeasible else np.inf,
+                'selectionFrequency': selected / max(numFeasible, 1),
+                'meanUnits': unitSum / max(numFeasible, 1)
+            }
+
+        if workers == 1:
+            for task in tasks:
+                yield summary(*solveSamples(views, task))
+        else:
+            with get_context().Pool(workers, initializer=initWorker, initargs=(layout,)) as pool:
+                for start, count in pool.imap_unordered(solveChunk, tasks):
+                    yield summary(start, count)
+    finally:
+        # drop the views before the shared blocks are closed
+        views.clear()
+        for shm in owned.values():
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,205 @@
+import numpy as np
+from utils.solveLP import solveLP
+from utils.boundedSimplex import remapWarmStart
+
+# nearest power of two, so scaling never rounds the coefficients
+def powerOfTwo(scale):
+    return np.exp2(np.round(np.log2(scale)))
+
+# shrinks min c x s.t. A x >= b, 0 <= x <= u before the tableau is built.
+# keep is a mask of projects that must not be dropped
+def presolve(costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound=20.0, keep=None, tol=1e-9):
+    c = np.asarray(costVectorC, dtype=float)
+    A = np.asarray(pollutantMatrixApoll, dtype=float)
+    b = np.asarray(targetVectorBpoll, dtype=float)
+    numPollutants, numProjects = A.shape
+    upper = np.broadcast_to(np.asarray(upperBound, dtype=float), (numProjects,)).copy()
+    lower = np.zeros(numProjects)
+    keep = np.zeros(numProjects, dtype=bool) if keep is None else np.asarray(keep, dtype=bool)
+    cols = np.ones(numProjects, dtype=bool)
+    rows = np.ones(numPollutants, dtype=bool)
+    info = {'status': 'Reduced', 'numProjects': numProjects, 'numPollutants': numPollutants,
+            'original': (c, A, b, upper.copy()), 'dominated': np.zeros(numProjects, dtype=bool),
+            'dominatedBy': np.full(numProjects, -1)}
+
+    # projects that cannot help any target are fixed at a bound
+    useless = (A <= 0).all(axis=0) & (c >= 0) & ~keep
+    cols &= ~useless
+    free = (A >= 0).all(axis=0) & (c < 0) & ~keep
+    lower[free] = upper[free]
+    cols &= ~free
+
+    # tighten lower bounds from the row activities until nothing changes
+    Apos = np.maximum(A, 0)
+    Aneg = np.minimum(A, 0)
+    for _ in range(10):
+        maxAct = Apos @ upper + Aneg @ lower
+        if (maxAct < b - tol * (1 + np.abs(b))).any():
+            info['status'] = 'Infeasible'
+            return info
+        # x_j >= (b_i - everything else at its best) / a_ij
+        rest = maxAct[:, None] - Apos * upper
+        with np.errstate(divide='ignore', invalid='ignore'):
+            need = np.where(A > tol, (b[:, None] - rest) / A, -np.inf)
+        newLower = np.maximum(lower, need.max(axis=0, initial=-np.inf))
+        newLower = np.minimum(np.maximum(newLower, 0), upper)
+        if np.all(newLower <= lower + tol):
+            break
+        lower = newLower
+    # a lower bound that reaches the upper bound fixes the project
+    fixed = cols & (lower >= upper - tol)
+    lower[fixed] = upper[fixed]
+    cols &= ~fixed
+
+    # shift x = lower + x', the rest of the presolve works on x'
+    bShift = b - A @ lower
+    uShift = upper - lower
+    # rows that hold for every x' in its bounds
+    minAct = np.minimum(A[:, cols], 0) @ uShift[cols]
+    rows &= ~(minAct >= bShift - tol * (1 + np.abs(bShift)))
+
+    # a project that costs more and reduces every remaining pollutant by
+    # less than another one is dropped, postsolve checks it stays priced out
+    Ar = A[rows][:, cols]
+    cr = c[cols]
+    idx = np.flatnonzero(cols)
+    if len(idx) > 1:
+        geq = np.ones((len(idx), len(idx)), dtype=bool)
+        for i in range(Ar.shape[0]):
+            geq &= Ar[i][:, None] >= Ar[i][None, :]
+        geq &= cr[:, None] <= cr[None, :]
+        # identical projects: only the first one survives
+        same = geq & geq.T
+        strict = geq & ~same
+        earlier = same & (np.arange(len(idx))[:, None] < np.arange(len(idx))[None, :])
+        dominates = strict | earlier
+        dominated = dominates.any(axis=0) & ~keep[idx]
+        info['dominated'][idx[dominated]] = True
+        info['dominatedBy'][idx[dominated]] = idx[np.argmax(dominates[:, dominated], axis=0)]
+        cols[idx[dominated]] = False
+
+    # a target implied by a tighter multiple of another target is redundant
+    rIdx = np.flatnonzero(rows & (bShift > tol))
+    Ac = A[:, cols]
+    if len(rIdx) > 1:
+        ratio = bShift[rIdx][:, None] / bShift[rIdx][None, :]
+        implied = np.ones((len(rIdx), len(rIdx)), dtype=bool)
+        for j in range(Ac.shape[1]):
+            implied &= Ac[rIdx, j][:, None] >= ratio * Ac[rIdx, j][None, :] - tol
+        np.fill_diagonal(implied, False)
+        # of two equivalent targets keep the first
+        mutual = implied & implied.T
+        implied &= ~(mutual & (np.arange(len(rIdx))[:, None] < np.arange(len(rIdx))[None, :]))
+        rows[rIdx[implied.any(axis=1)]] = False
+
+    # equilibrate rows then columns with power-of-two factors
+    Ared = A[rows][:, cols]
+    rowScale = np.ones(rows.sum())
+    colScale = np.ones(cols.sum())
+    if Ared.size:
+        rowMax = np.abs(Ared).max(axis=1)
+        rowScale = np.where(rowMax > 0, powerOfTwo(1 / np.where(rowMax > 0, rowMax, 1)), 1.0)
+        colMax = np.abs(Ared * rowScale[:, None]).max(axis=0)
+        colScale = np.where(colMax > 0, powerOfTwo(1 / np.where(colMax > 0, colMax, 1)), 1.0)
+
+    info['keptProjects'] = np.flatnonzero(cols)
+    info['keptPollutants'] = np.flatnonzero(rows)
+    info['lower'] = lower
+    info['rowScale'] = rowScale
+    info['colScale'] = colScale
+    info['costVectorC'] = c[cols] * colScale
+    info['pollutantMatrixApoll'] = rowScale[:, None] * Ared * colScale
+    info['targetVectorBpoll'] = rowScale * bShift[rows]
+    info['upperBound'] = uShift[cols] / colScale
+    info['objectiveOffset'] = c @ lower
+    return info
+
+# the duals of the reduced problem leave out the targets presolve removed or
+# used to tighten bounds. when they don't prove x optimal, the original
+# problem is re-solved from the basis x sits in, usually in a pivot or two,
+# and its solution and duals replace the postsolved ones
+def recoverDuals(info, final, tol=1e-7):
+    c, A, b, upper = info['original']
+    x, Z = final['basicSolution'], final['Z']
+    y = np.maximum(final['duals'], 0.0)
+    if b @ y - upper @ np.maximum(A.T @ y - c, 0.0) >= Z - tol * (1 + abs(Z)):
+        return final
+    inside = (x > tol) & (x < upper - tol)
+    slack = A @ x - b > tol * (1 + np.abs(b))
+    warmStart = {'basis': np.concatenate([np.flatnonzero(inside), len(c) + np.flatnonzero(slack)]),
+                 'flipped': np.concatenate([x >= upper - tol, np.zeros(len(b), dtype=bool)])}
+    result = solveLP(c, A, b, engine="bounded", trace="off", upperBound=upper, warmStart=warmStart)
+    if result['status'] == 'Optimal':
+        final['basicSolution'] = result['basicSolution']
+        final['Z'] = c @ result['basicSolution']
+        final['duals'] = result['duals']
+        final['reducedCosts'] = c - result['duals'] @ A
+    return final
+
+# maps a solve of the reduced problem back onto the original projects
+def postsolve(info, result):
+    c, A, b, upper = info['original']
+    final = dict(result)
+    if info['status'] == 'Infeasible' or result['status'] != 'Optimal':
+        final['status'] = 'Infeasible' if info['status'] == 'Infeasible' else result['status']
+        final['basicSolution'] = np.zeros(info['numProjects'])
+        final['Z'] = np.inf
+        return final
+    x = info['lower'].copy()
+    x[info['keptProjects']] += info['colScale'] * np.asarray(result['basicSolution'])
+    duals = np.zeros(info['numPollutants'])
+    if 'duals' in result:
+        duals[info['keptPollutants']] = info['rowScale'] * np.asarray(result['duals'])
+    final['basicSolution'] = x
+    final['Z'] = c @ x
+    final['duals'] = duals
+    final['reducedCosts'] = c - duals @ A
+    # ranges of the reduced problem don't carry over to the original one
+    final.pop('costRange', None)
+    final.pop('targetRange', None)
+    final['presolve'] = info
+    return final
+
+# presolve, solve the reduced LP and postsolve. dropped projects that turn
+# out to have a negative reduced cost are put back and the LP is re-solved
+def solvePresolved(costVectorC, pollutantMatrixApoll, targetVectorBpoll, engine="tableau", trace="full",
+                   upperBound=20.0, tol=1e-7, pricing="dantzig", maxIter=None):
+    keep = None
+    previous = None
+    while True:
+        info = presolve(costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound, keep=keep)
+        if info['status'] == 'Infeasible':
+            return postsolve(info, {'status': 'Infeasible'})
+        if len(info['keptPollutants']) == 0:
+            # every target is already met by the fixed projects
+            result = {'status': 'Optimal', 'basicSolution': np.zeros(len(info['keptProjects'])),
+                      'duals': np.zeros(0), 'Z': 0.0}
+        elif len(info['keptProjects']) == 0:
+            result = {'status': 'Infeasible'}
+        else:
+            warmStart = None
+            if previous is not None and previous[0]['status'] == 'Optimal' and previous[0].get('engine') == "bounded":
+                # re-solves after putting projects back start from the last basis (engine="auto" then stays bounded)
+                warmStart = remapWarmStart(previous[0], previous[1]['keptProjects'], info['keptProjects'],
+                                           previous[1]['keptPollutants'], info['keptPollutants'])
+            result = solveLP(info['costVectorC'], info['pollutantMatrixApoll'], info['targetVectorBpoll'],
+                             engine=engine, trace=trace, upperBound=info['upperBound'], warmStart=warmStart,
+                             pricing=pricing, maxIter=maxIter)
+        previous = (result, info)
+        final = postsolve(info, result)
+        if final['status'] == 'Infeasible' and info['dominated'].any():
+            # the dominating projects may have hit their limits, retry with all of them
+            keep = info['dominated'] if keep is None else keep | info['dominated']
+            continue
+        if final['status'] != 'Optimal':
+            return final
+        c, A, b, upper = info['original']
+        reducedCost = c - final['duals'] @ A
+        putBack = info['dominated'] & (reducedCost < -tol * (1 + np.abs(c)))
+        if not putBack.any():
+            return recoverDuals(info, final)
+        # projects whose dominating project is at its limit are likely next
+        dominator = info['dominatedBy']
+        atLimit = final['basicSolution'][np.maximum(dominator, 0)] >= upper[np.maximum(dominator, 0)] - tol
+        putBack |= info['dominated'] & atLimit
+        keep = putBack if keep is None else keep | putBack
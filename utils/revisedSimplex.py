@@ -0,0 +1,164 @@
+import numpy as np
+from utils.instrument import activeStats
+
+# explicit inverse of the basis. it is taken from a fresh LU factorization
+# (LAPACK) at every refactorization and each pivot applies its eta column
+# to it as a rank-1 update, so ftran and btran are one matrix-vector
+# product each instead of triangular solves in python
+class BasisFactor:
+    def __init__(self, B):
+        self.inverse = np.linalg.inv(B)
+        self.updates = 0
+
+    # B x = v
+    def ftran(self, v):
+        return self.inverse @ v
+
+    # y B = v
+    def btran(self, v):
+        return v @ self.inverse
+
+    # row r of B^-1, the btran of the r-th unit vector
+    def row(self, r):
+        return self.inverse[r]
+
+    # basis column r replaced, alpha = B^-1 a_q of the entering column
+    def update(self, r, alpha):
+        inverse = self.inverse
+        pivotRow = inverse[r] / alpha[r]
+        inverse -= np.outer(alpha, pivotRow)
+        inverse[r] = pivotRow
+        self.updates += 1
+
+# revised dual simplex on min c x s.t. A x >= b, 0 <= x <= u. only the
+# K x K basis is factored, reduced costs are updated from the pivot row
+# and recomputed from scratch at every refactorization
+class RevisedSimplexSolver:
+    def __init__(self, refactorEvery=50, tol=1e-9):
+        self.refactorEvery = refactorEvery
+        self.tol = tol
+
+    def solve(self, costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound=20.0, trace="summary",
+              maxIter=1000):
+        if trace not in ("off", "summary"):
+            raise ValueError("RevisedSimplexSolver only records trace='off' or 'summary'")
+        tol = self.tol
+        A = np.asarray(pollutantMatrixApoll, dtype=float)
+        b = np.asarray(targetVectorBpoll, dtype=float)
+        numPollutants, numProjects = A.shape
+        numCols = numProjects + numPollutants
+        # A x - s = b with the surplus columns -I as the starting basis
+        Afull = np.hstack([A, -np.eye(numPollutants)])
+        cost = np.zeros(numCols)
+        cost[:numProjects] = costVectorC
+        upper = np.full(numCols, np.inf)
+        upper[:numProjects] = upperBound
+
+        basis = np.arange(numProjects, numCols)
+        isBasic = np.zeros(numCols, dtype=bool)
+        isBasic[basis] = True
+        # a negative cost starts at its upper bound so the basis is dual feasible
+        atUpper = cost < 0
+
+        def refactor():
+            factor = BasisFactor(Afull[:, basis])
+            xN = np.where(atUpper & ~isBasic, upper, 0.0)
+            xB = factor.ftran(b - Afull @ xN)
+            y = factor.btran(cost[basis])
+            d = cost - y @ Afull
+            d[basis] = 0.0
+            return factor, xB, d
+
+        stats = activeStats()
+        started = stats.startSolve() if stats is not None else None
+        factor, xB, d = refactor()
+        # buffers reused by every iteration
+        alphaRow = np.empty(numCols)
+        ratios = np.empty(numCols)
+        final = {}
+        pivotSummary = []
+        iteration = 0
+        status = 'Optimal'
+        while True:
+            # leaving row: the basic variable furthest outside its bounds
+            below = -xB
+            above = xB - upper[basis]
+            infeas = np.maximum(below, above)
+            r = np.argmax(infeas)
+            if infeas[r] <= tol * (1 + abs(xB[r])):
+                break
+            if iteration >= maxIter:
+                status = 'IterationLimit'
+                break
+            iteration += 1
+            toUpper = above[r] > below[r]
+            # row r of B^-1 [A -I]
+            rho = factor.row(r)
+            np.dot(rho, A, out=alphaRow[:numProjects])
+            np.negative(rho, out=alphaRow[numProjects:])
+            # columns that can move x_B[r] back towards the violated bound
+            sign = 1.0 if toUpper else -1.0
+            eligible = ~isBasic & (((sign * alphaRow > tol) & ~atUpper) | ((sign * alphaRow < -tol) & atUpper))
+            if not eligible.any():
+                status = 'Infeasible'
+                break
+            ratios.fill(np.inf)
+            np.divide(d, alphaRow, out=ratios, where=eligible)
+            np.abs(ratios, out=ratios)
+            q = np.argmin(ratios)
+
+            # dual update
+            thetaD = d[q] / alphaRow[q]
+            d -= thetaD * alphaRow
+            # primal update
+            alphaQ = factor.ftran(Afull[:, q])
+            leaving = basis[r]
+            bound = upper[leaving] if toUpper else 0.0
+            thetaP = (xB[r] - bound) / alphaQ[r]
+            xQ = (upper[q] if atUpper[q] else 0.0) + thetaP
+            xB -= thetaP * alphaQ
+            xB[r] = xQ
+            d[q] = 0.0
+            atUpper[leaving] = toUpper
+            atUpper[q] = False
+            isBasic[leaving] = False
+            isBasic[q] = True
+            basis[r] = q
+
+            if factor.updates + 1 >= self.refactorEvery:
+                factor, xB, d = refactor()
+            else:
+                factor.update(r, alphaQ)
+            if trace == "summary" or stats is not None:
+                x = np.where(atUpper, upper, 0.0)
+                x[basis] = xB
+            if stats is not None:
+                stats.iteration(started, iteration, q, leaving, ratios[q], cost @ x)
+            if trace == "summary":
+                pivotSummary.append({
+                    "iteration": iteration,
+                    "entering": int(q),
+                    "leaving": int(leaving),
+                    "Z": float(cost @ x)
+                })
+
+        x = np.where(atUpper & ~isBasic, upper, 0.0)
+        x[basis] = xB
+        final['tableauList'] = []
+        final['objectiveRowList'] = []
+        final['basicSolutions'] = []
+        final['pivotSummary'] = pivotSummary
+        final['finalTableau'] = None
+        final['basis'] = basis
+        final['iterations'] = iteration
+        final['status'] = status
+        if stats is not None:
+            stats.endSolve(started, 32 * len(pivotSummary))
+        if status == 'Optimal':
+            final['basicSolution'] = x[:numProjects]
+            final['Z'] = cost @ x
+            final['duals'] = BasisFactor(Afull[:, basis]).btran(cost[basis])
+        else:
+            final['basicSolution'] = np.zeros(numProjects)
+            final['Z'] = np.inf
+        return final
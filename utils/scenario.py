@@ -0,0 +1,30 @@
+import numpy as np
+
+# the problem arrays of a scenario (see cli.py for the keys) on the catalog.
+# names defaults to every project. a key naming an unknown project or
+# pollutant raises ValueError with the offending names
+def scenarioProblem(catalog, scenario, names=None):
+    if not isinstance(scenario, dict):
+        raise ValueError("a scenario is a json object")
+    pollutantCols = catalog.pollutants
+    names = list(scenario.get("projects") or names or catalog.names)
+    unknown = [name for name in names if name not in catalog.nameIndex]
+    if unknown:
+        raise ValueError(f"unknown projects {unknown}")
+    costs = scenario.get("costs", {})
+    unknown = [name for name in costs if name not in names]
+    if unknown:
+        raise ValueError(f"unknown projects in costs {unknown}")
+    targets = scenario.get("targets", {})
+    unknown = [pollutant for pollutant in targets if pollutant not in pollutantCols]
+    if unknown:
+        raise ValueError(f"unknown pollutants in targets {unknown}")
+    indices = catalog.indicesOf(names)
+    costVectorC, pollutantMatrix, targetPollutants = catalog.problem(indices)
+    costVectorC = np.asarray(costVectorC, dtype=float) * float(scenario.get("costScale", 1.0))
+    for name, cost in costs.items():
+        costVectorC[names.index(name)] = cost
+    targetPollutants = targetPollutants.astype(float)
+    for pollutant, target in targets.items():
+        targetPollutants[pollutantCols.index(pollutant)] = target
+    return names, indices, costVectorC, pollutantMatrix, targetPollutants
@@ -0,0 +1,122 @@
+import numpy as np
+from utils.boundedSimplex import BoundedSimplexSolver
+from utils.createTableau import createBoundedTableau
+
+# [low, high] of every t for which v + t * col stays inside [lower, upper],
+# one column of cols per range
+def stepRange(v, cols, lower, upper, tol):
+    v = v[:, None]
+    lower = np.broadcast_to(lower, v.shape)
+    upper = np.broadcast_to(upper, v.shape)
+    lo = np.full(cols.shape, -np.inf)
+    hi = np.full(cols.shape, np.inf)
+    up = cols > tol
+    down = cols < -tol
+    with np.errstate(invalid='ignore'):
+        np.divide(lower - v, cols, out=lo, where=up)
+        np.divide(upper - v, cols, out=hi, where=up & np.isfinite(upper))
+        hiDown = np.full(cols.shape, np.inf)
+        np.divide(lower - v, cols, out=hiDown, where=down)
+        loDown = np.full(cols.shape, -np.inf)
+        np.divide(upper - v, cols, out=loDown, where=down & np.isfinite(upper))
+    return np.minimum(np.maximum(lo, loDown).max(axis=0), 0.0), np.maximum(np.minimum(hi, hiDown).min(axis=0), 0.0)
+
+# change of one objective coefficient of a basic column, rows holds the
+# tableau row of each basic column: the reduced costs must stay >= 0
+def basicCostRange(objRow, rows, nonbasic, tol):
+    cols = -rows * nonbasic
+    return stepRange(objRow, cols.T, 0.0, np.inf, tol)
+
+# dual tableau of SimplexSolver: the costs are its right hand side and the
+# targets its objective, so cost ranging is rhs ranging and the other way round
+def dualTableauRanges(tableau, basis, costVectorC, targetVectorBpoll, tol=1e-9):
+    n, m = tableau.shape
+    n -= 1
+    numVars = len(costVectorC)
+    numPollutants = len(targetVectorBpoll)
+    slackCols = np.arange(m - 2 - numVars, m - 2)
+    objRow = tableau[n, :m-2]
+    nonbasic = np.ones(m - 2, dtype=bool)
+    nonbasic[basis] = False
+
+    # c_j + d moves the rhs by d times the slack column of row j
+    lo, hi = stepRange(tableau[:n, -1], tableau[:n, slackCols], 0.0, np.inf, tol)
+    costRange = np.column_stack((costVectorC + lo, costVectorC + hi))
+
+    # a nonbasic pollutant dual can take the target up by its reduced cost,
+    # a basic one keeps the other reduced costs >= 0
+    targetRange = np.column_stack((np.full(numPollutants, -np.inf), targetVectorBpoll + objRow[:numPollutants]))
+    rowOf = np.full(m - 2, -1)
+    rowOf[basis] = np.arange(n)
+    basic = np.flatnonzero(rowOf[:numPollutants] >= 0)
+    if len(basic):
+        lo, hi = basicCostRange(objRow, -tableau[rowOf[basic], :m-2], nonbasic, tol)
+        targetRange[basic] = np.column_stack((targetVectorBpoll[basic] + lo, targetVectorBpoll[basic] + hi))
+
+    # dual slack minus bound dual is c_j - y A_j
+    sol = np.zeros(m)
+    sol[basis] = tableau[:n, -1]
+    reducedCosts = sol[slackCols] - sol[numPollutants:numPollutants + numVars]
+    return reducedCosts, costRange, targetRange
+
+# bounded tableau of BoundedSimplexSolver: the costs are its objective and the
+# targets its right hand side, flipped columns are x_j = u_j - x'_j
+def boundedRanges(tableau, basis, flipped, upper, costVectorC, targetVectorBpoll, tol=1e-9):
+    n, m = tableau.shape
+    n -= 1
+    numVars = len(costVectorC)
+    sign = np.where(flipped[:numVars], -1.0, 1.0)
+    objRow = tableau[n, :m-1]
+    nonbasic = np.ones(m - 1, dtype=bool)
+    nonbasic[basis] = False
+
+    # nonbasic project: its own reduced cost is the only limit
+    d = objRow[:numVars]
+    lo = np.where(sign > 0, -d, -np.inf)
+    hi = np.where(sign > 0, np.inf, d)
+    rowOf = np.full(m - 1, -1)
+    rowOf[basis] = np.arange(n)
+    basic = np.flatnonzero(rowOf[:numVars] >= 0)
+    if len(basic):
+        # the tableau coefficient moves by sign * d, keep the other reduced costs >= 0
+        low, high = basicCostRange(objRow, tableau[rowOf[basic], :m-1], nonbasic, tol)
+        s = sign[basic]
+        lo[basic] = np.where(s > 0, low, -high)
+        hi[basic] = np.where(s > 0, high, -low)
+    costRange = np.column_stack((costVectorC + lo, costVectorC + hi))
+
+    # b_i + d moves the rhs by -d times the surplus column of row i
+    surplusCols = np.arange(numVars, m - 1)
+    lo, hi = stepRange(tableau[:n, -1], -tableau[:n, surplusCols], 0.0, upper[basis][:, None], tol)
+    targetRange = np.column_stack((targetVectorBpoll + lo, targetVectorBpoll + hi))
+    reducedCosts = sign * d
+    return reducedCosts, costRange, targetRange
+
+# shadow prices are the 'duals' of the result, this adds the project reduced
+# costs and the ranges of every cost and target over which the optimal basis
+# stays optimal. inside a range Z moves linearly (by x_j or the shadow price)
+def sensitivityReport(result, costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound=20.0, tol=1e-9):
+    costVectorC = np.asarray(costVectorC, dtype=float)
+    targetVectorBpoll = np.asarray(targetVectorBpoll, dtype=float)
+    numVars = len(costVectorC)
+    engine = result.get('engine', "tableau")
+    if engine == "tableau":
+        ranges = dualTableauRanges(result['finalTableau'], result['basis'], costVectorC, targetVectorBpoll, tol)
+    else:
+        upper = np.full(numVars + len(targetVectorBpoll), np.inf)
+        upper[:numVars] = upperBound
+        if engine == "bounded":
+            tableau, flipped = result['finalTableau'], result['flipped']
+        else:
+            # the revised and interior engines keep no tableau, pivot one into their final basis
+            solver = BoundedSimplexSolver(tol)
+            tableau = createBoundedTableau(costVectorC, pollutantMatrixApoll, targetVectorBpoll)
+            state, basis, flipped = solver.newState(tableau)
+            basis[:] = solver.findBasis(tableau)
+            isBasic = np.zeros(numVars, dtype=bool)
+            isBasic[result['basis'][result['basis'] < numVars]] = True
+            atUpper = ~isBasic & (result['basicSolution'] >= upper[:numVars] - tol)
+            solver.crashBasis(tableau, state, upper, {'basis': result['basis'], 'flipped': atUpper})
+        ranges = boundedRanges(tableau, result['basis'] if engine == "bounded" else basis, flipped, upper,
+                               costVectorC, targetVectorBpoll, tol)
+    return dict(zip(('reducedCosts', 'costRange', 'targetRange'), ranges))
@@ -0,0 +1,70 @@
+import http.client
+import json
+import socket
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socketPath, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socketPath = socketPath
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socketPath)
+
+# blocking client for server.py, one keep-alive connection per client. use one
+# client per thread for concurrent requests
+class SolveClient:
+    def __init__(self, host="127.0.0.1", port=8765, socketPath=None, timeout=60.0):
+        if socketPath is not None:
+            self.connect = lambda: UnixHTTPConnection(socketPath, timeout=timeout)
+        else:
+            self.connect = lambda: http.client.HTTPConnection(host, port, timeout=timeout)
+        self.connection = None
+
+    def request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        # a kept-alive connection the server already closed is opened once more
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self.connect()
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                data = json.loads(response.read())
+                break
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.CannotSendRequest):
+                self.close()
+                if attempt == 1:
+                    raise
+        if response.status == 400:
+            raise ValueError(data["error"])
+        if response.status != 200:
+            raise RuntimeError(f"{response.status}: {data.get('error')}")
+        return data
+
+    # a scenario as in cli.py ("projects", "targets", "costScale", "costs")
+    # plus "engine" and "maxIter", the keyword arguments are merged into it
+    def solve(self, scenario=None, **options):
+        return self.request("POST", "/solve", dict(scenario or {}, **options))
+
+    def solveMany(self, scenarios):
+        return self.request("POST", "/solve", list(scenarios))
+
+    def metrics(self):
+        return self.request("GET", "/metrics")
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
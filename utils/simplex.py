@@ -1,74 +1,231 @@
 import numpy as np
 import pandas as pd
+from utils.trace import TraceRecorder
+from utils.instrument import activeStats
+
+PRICING_RULES = ("dantzig", "steepest-edge", "devex", "partial", "bland")
+
 class SimplexSolver:
-    def __init__(self):
-        pass
-    def extractBasicSol(self, tableau, numVars):
+    # entries within tol of zero are round-off: they are never pivoted on and
+    # reduced costs above -tol count as optimal
+    def __init__(self, tol=1e-9):
+        self.tol = tol
+
+    # ratio test on the pivot column using a mask instead of a python loop
+    def ratioTest(self, tableau, PC, ratios):
+        n = tableau.shape[0] - 1
+        col = tableau[:n, PC]
+        ratios.fill(np.inf)
+        np.divide(tableau[:n, -1], col, out=ratios, where=col > self.tol)
+        return ratios
+
+    # harris' pass: ratios up to the smallest one with every right-hand side
+    # relaxed by tol are ties. the largest pivot element among them leaves,
+    # under Bland's rule the lowest basic index
+    def leavingRow(self, tableau, PC, ratios, basis, useBland=False):
+        n = len(ratios)
+        col = tableau[:n, PC]
+        eligible = np.isfinite(ratios)
+        bound = np.min((tableau[:n, -1][eligible] + self.tol) / col[eligible])
+        ties = np.flatnonzero(ratios <= bound)
+        if useBland:
+            return ties[np.argmin(basis[ties])]
+        return ties[np.argmax(col[ties])]
+
+    # gauss-jordan step as one rank-1 update, done in place on the tableau
+    def pivot(self, tableau, PR, PC, work, pivotCol):
+        pivotCol[:] = tableau[:, PC]
+        tableau[PR, :] /= pivotCol[PR]
+        pivotRow = tableau[PR, :].copy()
+        np.multiply(pivotCol[:, None], pivotRow[None, :], out=work)
+        tableau -= work
+        tableau[PR, :] = pivotRow
+
+    # the original row by row pivot, kept so both paths can be compared
+    def loopRatioTest(self, tableau, PC, ratios):
+        n = tableau.shape[0] - 1
+        ratios.fill(np.inf)
+        for i in range(n):
+            if tableau[i, PC] > self.tol:
+                ratios[i] = tableau[i, -1] / tableau[i, PC]
+        return ratios
+
+    def loopPivot(self, tableau, PR, PC, work, pivotCol):
+        n = tableau.shape[0] - 1
+        tableau[PR, :] /= tableau[PR, PC]
+        for i in range(n + 1):
+            if i != PR:
+                tableau[i, :] -= tableau[i, PC] * tableau[PR, :]
+    # find the starting basis once: for every row, the last identity column
+    # that covers it (slack columns come after the dual variables)
+    def findBasis(self, tableau):
+        n = tableau.shape[0] - 1
+        body = tableau[:n, :-1]
+        isUnit = (np.count_nonzero(body, axis=0) == 1) & (body.sum(axis=0) == 1)
+        basis = np.full(n, -1, dtype=int)
+        unitCols = np.flatnonzero(isUnit)
+        basis[np.argmax(body[:, unitCols], axis=0)] = unitCols
+        return basis
+
+    # basic solution read from the tracked basis in O(rows)
+    def extractBasicSol(self, tableau, basis):
         n, m = tableau.shape
         n -= 1  # number of constraint rows
-        sol = np.zeros(m - 1)
-
-        for j in range(m - 1):
-            col = tableau[:n, j]  # only constraint rows
-            if np.sum(col == 1) == 1 and np.sum(col == 0) == (n - 1):
-                row_index = np.where(col == 1)[0][0]
-                sol[j] = tableau[row_index, -1]  # RHS value
-        Z = tableau[n, -1]
-        finalSol = np.append(sol, Z)
-        return finalSol
-
-    def solve(self, tableau, numVars, costVectorC):
-        tableau = tableau.copy()
+        sol = np.zeros(m)
+        rows = np.flatnonzero(basis >= 0)
+        sol[basis[rows]] = tableau[rows, -1]  # RHS value
+        sol[-1] = tableau[n, -1]  # Z
+        return sol
+
+    # entering column rules, only called while some reduced cost is negative.
+    # state keeps what a rule carries between iterations
+    def dantzigPricing(self, tableau, state):
+        return np.argmin(tableau[-1, :-2])
+
+    # the tableau has every column explicitly, so the exact edge norms are
+    # one pass over the body
+    def steepestEdgePricing(self, tableau, state):
+        n = tableau.shape[0] - 1
+        body = tableau[:n, :-2]
+        objRow = tableau[n, :-2]
+        norms = 1.0 + np.einsum('ij,ij->j', body, body)
+        return np.argmax(np.where(objRow < -self.tol, objRow * objRow / norms, -1.0))
+
+    # reference weights approximate the edge norms, they are updated from the
+    # pivot row in updateDevex and reset when they grow too large
+    def devexPricing(self, tableau, state):
+        objRow = tableau[-1, :-2]
+        weights = state.setdefault('weights', np.ones(len(objRow)))
+        return np.argmax(np.where(objRow < -self.tol, objRow * objRow / weights, -1.0))
+
+    def updateDevex(self, tableau, state, PR, PC, leaving):
+        weights = state['weights']
+        alpha = tableau[PR, :-2] / tableau[PR, PC]
+        wq = weights[PC]
+        np.maximum(weights, alpha * alpha * wq, out=weights)
+        weights[leaving] = max(wq / tableau[PR, PC] ** 2, 1.0)
+        weights[PC] = 1.0
+        if weights.max() > 1e6:
+            weights.fill(1.0)
+
+    # most negative reduced cost within one block of columns, the next search
+    # starts at the block after it
+    def partialPricing(self, tableau, state):
+        objRow = tableau[-1, :-2]
+        size = state.setdefault('blockSize', max(16, len(objRow) // 8))
+        start = state.get('start', 0)
+        for offset in range(0, len(objRow) + size, size):
+            block = (start + offset + np.arange(size)) % len(objRow)
+            j = block[np.argmin(objRow[block])]
+            if objRow[j] < -self.tol:
+                state['start'] = (block[-1] + 1) % len(objRow)
+                return j
+        return np.argmin(objRow)
+
+    # lowest index with a negative reduced cost, can't cycle
+    def blandPricing(self, tableau, state):
+        return np.flatnonzero(tableau[-1, :-2] < -self.tol)[0]
+
+    # replays one recorded (PR, PC) pivot, used by the pivot-log trace
+    def applyPivot(self, tableau, basis, step, pivot=None):
+        PR, PC = step
+        pivot = pivot or self.pivot
+        pivot(tableau, PR, PC, np.empty_like(tableau), np.empty(tableau.shape[0]))
+        basis[PR] = PC
+
+    # trace: "full" keeps every tableau, "pivot-log" only the pivots,
+    # "summary" only Z and the entering/leaving variables, "off" nothing.
+    # pricing picks the entering column (see PRICING_RULES), after blandAfter
+    # degenerate pivots in a row Bland's rule takes over until Z moves again.
+    # a solve still pivoting after maxIter iterations stops with 'IterationLimit'
+    def solve(self, tableau, numVars, costVectorC, pivotMode="vectorized", trace="full", pricing="dantzig",
+              blandAfter=50, maxIter=1000):
+        if pivotMode == "vectorized":
+            ratioTest, pivot = self.ratioTest, self.pivot
+        elif pivotMode == "loop":
+            ratioTest, pivot = self.loopRatioTest, self.loopPivot
+        else:
+            raise ValueError(f"Unknown pivotMode: {pivotMode}")
+        rules = {
+            "dantzig": self.dantzigPricing,
+            "steepest-edge": self.steepestEdgePricing,
+            "devex": self.devexPricing,
+            "partial": self.partialPricing,
+            "bland": self.blandPricing,
+        }
+        if pricing not in rules:
+            raise ValueError(f"Unknown pricing: {pricing}. Use one of {PRICING_RULES}")
+        price = rules[pricing]
+        pricingState = {}
+        tableau = np.array(tableau, dtype=float)
         n, m = tableau.shape # get the number of rows and cols of the tableau
         n -= 1  
+        if pricing == "devex":
+            # updated on every pivot, also the ones Bland's rule picks
+            pricingState['weights'] = np.ones(m - 2)
+        # buffers reused by every pivot
+        ratios = np.empty(n)
+        work = np.empty_like(tableau)
+        pivotCol = np.empty(n + 1)
+        basis = self.findBasis(tableau)
         # setting up the solutions 
         final = {} 
-        tableauList = []
-        objectiveRowList = []
-        basicSolutions = [] 
+        recorder = TraceRecorder(trace, self.extractBasicSol,
+                                 lambda T, B, step: self.applyPivot(T, B, step, pivot))
+        recorder.start(tableau, basis)
+        stats = activeStats()
+        started = stats.startSolve() if stats is not None else None
         
-        maxIter = 1000
         iteration = 0
+        degenerate = 0
         # gaussian to solve for the minimization  
-        while tableau[n, :m-1].min() < 0 and iteration < maxIter:
-            # append the tableau and objective row per iteration
-            tableauList.append(tableau.copy())
-            objectiveRowList.append(tableau[n, :].copy())
-            
-            # basicSolutions.append(tableau[n, :].copy()) 
-            basicSolutions.append(self.extractBasicSol(tableau, numVars))
+        tol = self.tol
+        while tableau[n, :m-1].min() < -tol and iteration < maxIter:
+            # record the tableau and basic solution per iteration
+            recorder.record(tableau, basis)
 
             iteration += 1
             # getting the pivot column
-            PC = np.argmin(tableau[n, :m-1]) 
-            ratios = np.full(n, np.inf)
-            # normalize
-            for i in range(n):
-                if tableau[i, PC] > 0:
-                    ratios[i] = tableau[i, -1] / tableau[i, PC]
+            useBland = degenerate >= blandAfter
+            PC = self.blandPricing(tableau, pricingState) if useBland else price(tableau, pricingState)
+            ratioTest(tableau, PC, ratios)
             # check if infeasible if there division by zero if there's a inf value
             if np.all(np.isinf(ratios)):
                 final['status'] = 'Infeasible'
                 final['finalTableau'] = tableau
-                final['basicSolution'] = tableau[n, :]
+                final['basicSolution'] = np.zeros(numVars)
                 final['Z'] = np.inf
-                final['tableauList'] = tableauList
-                final['objectiveRowList'] = objectiveRowList 
-                final['basicSolutions'] = basicSolutions
+                final.update(recorder.result(tableau, basis, finished=False))
+                final['basis'] = basis
+                final['iterations'] = iteration
+                if stats is not None:
+                    stats.endSolve(started, recorder.nbytes())
                 return final
             # getting the pivot row
-            PR = np.argmin(ratios) 
-            # normalize
-            tableau[PR, :] /= tableau[PR, PC]
-            for i in range(n + 1):
-                if i != PR:
-                    tableau[i, :] -= tableau[i, PC] * tableau[PR, :]
-        # adding the latest tableau and objective row
-        tableauList.append(tableau.copy())
-        objectiveRowList.append(tableau[n, :].copy())
-        
-        # store the basic solutions
-        basicSolutions.append(tableau[n, :].copy()) 
+            PR = self.leavingRow(tableau, PC, ratios, basis, useBland)
+            degenerate = degenerate + 1 if ratios[PR] <= tol else 0
+            leaving = basis[PR]
+            if pricing == "devex":
+                self.updateDevex(tableau, pricingState, PR, PC, leaving)
+            # normalize and eliminate
+            pivot(tableau, PR, PC, work, pivotCol)
+            basis[PR] = PC
+            recorder.recordPivot((PR, PC), PC, leaving, tableau[n, -1])
+            if stats is not None:
+                stats.iteration(started, iteration, PC, leaving, ratios[PR], tableau[n, -1])
+
+        if tableau[n, :m-1].min() < -tol:
+            # stopped by maxIter, the objective row is not optimal yet
+            final['status'] = 'IterationLimit'
+            final['finalTableau'] = tableau
+            final['basicSolution'] = np.zeros(numVars)
+            final['Z'] = np.inf
+            final.update(recorder.result(tableau, basis, finished=False))
+            final['basis'] = basis
+            final['iterations'] = iteration
+            if stats is not None:
+                stats.endSolve(started, recorder.nbytes())
+            return final
         
         # for the solution table 
         slack_start_col = m - 2 - numVars
@@ -76,12 +233,95 @@ class SimplexSolver:
         # final cost
         Z = tableau[n, -1]  
 
-        final['tableauList'] = tableauList
-        final['objectiveRowList'] = objectiveRowList
-        final['basicSolutions'] = basicSolutions 
+        # adding the latest tableau, objective row and basic solution
+        final.update(recorder.result(tableau, basis, finished=True))
         final['finalTableau'] = tableau
         final['basicSolution'] = finalSol #for the charts
         final['Z'] = Z
+        # shadow prices of the pollutant targets are the first dual variables
+        numPollutants = m - 2 - 2 * numVars
+        final['duals'] = self.extractBasicSol(tableau, basis)[:numPollutants]
+        final['basis'] = basis
+        final['iterations'] = iteration
         final['status'] = 'Optimal'
+        if stats is not None:
+            stats.endSolve(started, recorder.nbytes())
+
+        return final
+
+    # traces Z over targets b(t) = b(tStart) + (t - tStart) * targetDirection,
+    # starting from the optimal tableau of b(tStart). between breakpoints the
+    # basis stays optimal and Z is linear, each breakpoint costs one pivot
+    def parametric(self, tableau, numVars, costVectorC, targetDirection, tStart, tEnd, maxBreakpoints=1000,
+                   maxPivots=10000, tol=1e-9):
+        result = self.solve(tableau, numVars, costVectorC, trace="off")
+        final = {'status': result['status'], 'tInfeasible': None}
+        if result['status'] != 'Optimal':
+            final['frontier'] = pd.DataFrame(columns=['t', 'Z'] + [f"x{j + 1}" for j in range(numVars)])
+            if result['status'] == 'Infeasible':
+                final['tInfeasible'] = tStart
+            return final
+        T = result['finalTableau']
+        basis = result['basis']
+        n, m = T.shape
+        n -= 1
+        slack_start_col = m - 2 - numVars
+        # the targets only appear in the objective row, their direction is
+        # carried as one extra row through every pivot
+        dirRow = np.zeros(m)
+        dirRow[:len(targetDirection)] = -np.asarray(targetDirection, dtype=float)
+        dirRow -= dirRow[basis] @ T[:n]
+        aug = np.vstack([T, dirRow])
+        objRow, dirRow = aug[n], aug[n + 1]
+        work = np.empty_like(aug)
+        pivotCol = np.empty(n + 2)
+        ratios = np.empty(n)
+
+        points = []
+        def addPoint(t):
+            points.append([t, objRow[-1]] + list(objRow[slack_start_col:m-2]))
+
+        t = tStart
+        addPoint(t)
+        # degenerate pivots don't add a point, so pivots are counted separately
+        pivots = 0
+        while len(points) < maxBreakpoints and pivots < maxPivots:
+            # next t where a reduced cost turns negative
+            slope = dirRow[:m-1]
+            steps = np.full(m - 1, np.inf)
+            np.divide(-objRow[:m-1], slope, out=steps, where=slope < -tol)
+            # steps lost in rounding are degenerate pivots, t stays put
+            steps[steps <= tol * (1 + abs(t))] = 0.0
+            PC = np.argmin(steps)
+            degenerate = steps[PC] == 0.0
+            if degenerate:
+                # Bland's rule while t stays put, lowest entering column
+                PC = np.flatnonzero(steps == 0.0)[0]
+            tNext = t + steps[PC]
+            if tNext >= tEnd:
+                objRow += (tEnd - t) * dirRow
+                addPoint(tEnd)
+                break
+            objRow += (tNext - t) * dirRow
+            if tNext > t:
+                addPoint(tNext)
+            t = tNext
+            self.ratioTest(aug[:n + 1], PC, ratios)
+            if np.all(np.isinf(ratios)):
+                # the dual is unbounded past t, so the targets can't be met
+                final['status'] = 'Infeasible'
+                final['tInfeasible'] = t
+                break
+            # and the lowest leaving column among tied rows
+            PR = self.leavingRow(aug[:n + 1], PC, ratios, basis, degenerate)
+            self.pivot(aug, PR, PC, work, pivotCol)
+            basis[PR] = PC
+            pivots += 1
+        else:
+            # maxBreakpoints or maxPivots reached before tEnd
+            final['status'] = 'IterationLimit'
 
-        return final
\ No newline at end of file
+        final['frontier'] = pd.DataFrame(points, columns=['t', 'Z'] + [f"x{j + 1}" for j in range(numVars)])
+        final['finalTableau'] = aug[:n + 1]
+        final['basis'] = basis
+        return final
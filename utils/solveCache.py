@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils.solveLP import solveLP
+
+# cached arrays are read-only copies, a caller that writes into a result it
+# got from the cache gets an error instead of changing it for everyone
+def frozen(value):
+    if isinstance(value, np.ndarray):
+        value = value.copy()
+        value.flags.writeable = False
+    elif isinstance(value, list) and any(isinstance(v, np.ndarray) for v in value):
+        value = [frozen(v) for v in value]
+    return value
+
+# results keyed by a hash of the problem data, with a bounded in-memory LRU
+# tier and an optional .npz tier under cacheDir. one cache can be shared by
+# threads (the dashboard's solve jobs) and processes can share cacheDir
+class SolveCache:
+    def __init__(self, maxEntries=128, cacheDir=None):
+        self.maxEntries = maxEntries
+        self.cacheDir = cacheDir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        if cacheDir is not None:
+            os.makedirs(cacheDir, exist_ok=True)
+
+    def makeKey(self, projectNames, costVectorC, pollutantMatrixApoll, targetVectorBpoll, **options):
+        h = hashlib.sha256()
+        h.update("\x1f".join(map(str, projectNames)).encode("utf-8"))
+        for array in (costVectorC, pollutantMatrixApoll, targetVectorBpoll):
+            array = np.ascontiguousarray(array, dtype=float)
+            h.update(str(array.shape).encode("utf-8"))
+            h.update(array.tobytes())
+        h.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return dict(self.entries[key])
+        if self.cacheDir is not None:
+            result = self.load(key)
+            if result is not None:
+                with self.lock:
+                    self.diskHits += 1
+                return dict(self.remember(key, result))
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, result):
+        self.remember(key, result)
+        if self.cacheDir is not None:
+            self.save(key, result)
+
+    def remember(self, key, result):
+        entry = {name: frozen(value) for name, value in result.items()}
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'diskHits': self.diskHits,
+            'misses': self.misses,
+            'entries': len(self.entries),
+            'maxEntries': self.maxEntries
+        }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def path(self, key):
+        return os.path.join(self.cacheDir, key + ".npz")
+
+    # arrays and equal-shaped array lists are stored as arrays, plain values
+    # as json, lazy traces are not written to disk
+    def save(self, key, result):
+        arrays = {}
+        for name, value in result.items():
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                arrays['a__' + name] = value
+            elif isinstance(value, list) and value and all(isinstance(v, np.ndarray) for v in value) \
+                    and len({v.shape for v in value}) == 1:
+                arrays['l__' + name] = np.stack(value)
+            elif isinstance(value, (list, str, bool, int, float, np.generic)) or value is None:
+                try:
+                    text = json.dumps(value, default=lambda v: v.item())
+                except (TypeError, AttributeError, ValueError):
+                    continue
+                arrays['j__' + name] = np.array(text)
+        # a temp file of its own, other threads and processes may write the same key
+        fd, tmpPath = tempfile.mkstemp(suffix=".tmp.npz", dir=self.cacheDir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmpPath, self.path(key))
+        except BaseException:
+            os.remove(tmpPath)
+            raise
+
+    def load(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        result = {}
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                for entry in data.files:
+                    kind, name = entry.split('__', 1)
+                    if kind == 'a':
+                        result[name] = data[entry]
+                    elif kind == 'l':
+                        result[name] = list(data[entry])
+                    else:
+                        result[name] = json.loads(str(data[entry]))
+        except (OSError, ValueError):
+            return None
+        return result
+
+
+# solveLP served from the cache when the same problem was solved before
+def cachedSolve(cache, projectNames, costVectorC, pollutantMatrixApoll, targetVectorBpoll,
+                engine="tableau", trace="full", upperBound=20.0):
+    key = cache.makeKey(projectNames, costVectorC, pollutantMatrixApoll, targetVectorBpoll,
+                        engine=engine, trace=trace, upperBound=np.asarray(upperBound).tolist())
+    result = cache.get(key)
+    if result is None:
+        result = solveLP(costVectorC, pollutantMatrixApoll, targetVectorBpoll, engine=engine, trace=trace,
+                         upperBound=upperBound)
+        cache.put(key, result)
+    return result
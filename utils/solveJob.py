@@ -0,0 +1,69 @@
+import threading
+from utils.instrument import profile
+
+class SolveCancelled(Exception):
+    pass
+
+# runs solve(job) on a background thread inside a profile() block. every
+# pivot updates the progress and checks the cancel flag, a cancelled solve
+# raises out of the pivot loop and leaves no result behind. at most
+# maxEvents pivot events are kept: when the list is full every second one is
+# dropped and only every eventStride-th pivot is kept from then on, so the
+# events still span the whole solve
+class SolveJob:
+    def __init__(self, solve, maxEvents=2000):
+        self.solve = solve
+        self.cancelEvent = threading.Event()
+        self.progress = {}
+        self.maxEvents = maxEvents
+        self.events = []
+        self.eventCount = 0
+        self.eventStride = 1
+        self.result = None
+        self.performance = None
+        self.error = None
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    # progress from solvers that report in coarser steps (branch-and-bound nodes)
+    def update(self, progress):
+        if self.cancelEvent.is_set():
+            raise SolveCancelled()
+        self.progress = progress
+
+    def onIteration(self, event):
+        self.update(event)
+        if self.eventCount % self.eventStride == 0:
+            if len(self.events) >= self.maxEvents:
+                self.events = self.events[::2]
+                self.eventStride *= 2
+            if self.eventCount % self.eventStride == 0:
+                self.events.append(event)
+        self.eventCount += 1
+
+    def run(self):
+        try:
+            with profile(onIteration=self.onIteration) as stats:
+                self.result = self.solve(self)
+            self.performance = stats.toDict()
+        except SolveCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+
+    def cancel(self):
+        self.cancelEvent.set()
+
+    def running(self):
+        return self.thread.is_alive()
+
+    def status(self):
+        if self.running():
+            return 'Running'
+        if self.cancelled:
+            return 'Cancelled'
+        return 'Failed' if self.error is not None else 'Done'
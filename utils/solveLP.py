@@ -0,0 +1,82 @@
+import numpy as np
+from utils.simplex import SimplexSolver
+from utils.boundedSimplex import BoundedSimplexSolver
+from utils.revisedSimplex import RevisedSimplexSolver
+from utils.interiorPoint import InteriorPointSolver
+from utils.createTableau import createTableau, createBoundedTableau
+from utils.sensitivity import sensitivityReport
+from utils.feasibility import precheck
+
+ENGINES = ("tableau", "bounded", "revised", "interior", "auto")
+
+# from about this many projects x pollutants the interior point method is
+# faster than the bounded simplex on the synthetic catalogs (benchmark.py)
+AUTO_INTERIOR_SIZE = 4000
+
+# the engine "auto" runs: bounded simplex for small problems and warm starts,
+# interior point with crossover for wide ones
+def chooseEngine(numProjects, numPollutants, warmStart=None):
+    if warmStart is None and numProjects * numPollutants >= AUTO_INTERIOR_SIZE:
+        return "interior"
+    return "bounded"
+
+# one entry point for every engine, all of them return the same result dict
+# warmStart (bounded engine only) re-optimizes from a previous basis,
+# see boundedSimplex.remapWarmStart. pricing (tableau engine only) is one of
+# simplex.PRICING_RULES. maxIter=None keeps the engine's own iteration limit.
+# sensitivity=True adds the reduced costs and the cost and target ranges of an
+# optimal result (sensitivity.sensitivityReport).
+# a target no selected project can reach is reported before any tableau is built
+def solveLP(costVectorC, pollutantMatrixApoll, targetVectorBpoll, engine="tableau", trace="full", upperBound=20.0,
+            warmStart=None, pricing="dantzig", maxIter=None, sensitivity=False):
+    costVectorC = np.asarray(costVectorC, dtype=float)
+    numVars = len(costVectorC)
+    if engine == "auto":
+        engine = chooseEngine(numVars, len(targetVectorBpoll), warmStart)
+        if engine == "interior" and trace not in ("off", "summary"):
+            trace = "summary"
+    if warmStart is not None and engine != "bounded":
+        raise ValueError("warmStart is only supported by the bounded engine")
+    if pricing != "dantzig" and engine != "tableau":
+        raise ValueError("pricing is only supported by the tableau engine")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}. Use one of {ENGINES}")
+    check = precheck(pollutantMatrixApoll, targetVectorBpoll, upperBound)
+    if check['status'] == 'Infeasible':
+        return {
+            'status': 'Infeasible',
+            'Z': np.inf,
+            'basicSolution': np.zeros(numVars),
+            'iterations': 0,
+            'tableauList': [],
+            'objectiveRowList': [],
+            'basicSolutions': [],
+            'pivotSummary': [],
+            'finalTableau': None,
+            'basis': None,
+            'engine': engine,
+            'shortTargets': check['shortTargets']
+        }
+    limit = {} if maxIter is None else {'maxIter': maxIter}
+    if engine == "tableau":
+        tableau = createTableau(costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound)
+        result = SimplexSolver().solve(tableau, numVars=numVars, costVectorC=costVectorC, trace=trace, pricing=pricing,
+                                       **limit)
+    elif engine == "bounded":
+        tableau = createBoundedTableau(costVectorC, pollutantMatrixApoll, targetVectorBpoll)
+        result = BoundedSimplexSolver().solveBounded(tableau, numVars=numVars, costVectorC=costVectorC,
+                                                     upperBound=upperBound, trace=trace, warmStart=warmStart, **limit)
+    elif engine == "revised":
+        result = RevisedSimplexSolver().solve(costVectorC, pollutantMatrixApoll, targetVectorBpoll,
+                                              upperBound=upperBound, trace=trace, **limit)
+    elif engine == "interior":
+        # the caller's limit caps the crossover pivots as well
+        result = InteriorPointSolver(**limit).solve(costVectorC, pollutantMatrixApoll, targetVectorBpoll,
+                                                    upperBound=upperBound, trace=trace,
+                                                    crossoverMaxIter=1000 if maxIter is None else maxIter)
+    result['engine'] = engine
+    # ranging is only done on request (the dashboard), without a crossover
+    # basis the interior solution only has shadow prices
+    if sensitivity and result['status'] == 'Optimal' and result.get('basis') is not None:
+        result.update(sensitivityReport(result, costVectorC, pollutantMatrixApoll, targetVectorBpoll, upperBound))
+    return result
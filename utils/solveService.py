@@ -0,0 +1,341 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import numpy as np
+from utils.catalog import ProjectCatalog
+from utils.solveCache import SolveCache
+from utils.solveLP import solveLP, ENGINES
+from utils.feasibility import precheck
+from utils.createTableau import createTableauBatch
+from utils.batchSimplex import BatchSimplexSolver
+from utils.scenario import scenarioProblem
+
+# catalog every worker process opens once and keeps for its whole life
+PROBLEM = {}
+
+def initWorker(projectsPath, targetsPath, catalogDir):
+    PROBLEM['catalog'] = ProjectCatalog(projectsPath, targetsPath, storeDir=catalogDir)
+
+# one solve on the whole catalog, so the first real request finds the imports
+# done and the matrix paged in
+def warmUp(_):
+    catalog = PROBLEM['catalog']
+    costVectorC, pollutantMatrix, targetPollutants = catalog.problem(np.arange(len(catalog.names)))
+    solveLP(costVectorC, pollutantMatrix.T, targetPollutants, trace="off")
+    return os.getpid()
+
+def summary(status, Z, iterations, units):
+    return {
+        'status': str(status),
+        'Z': float(Z) if status == 'Optimal' else None,
+        'iterations': int(iterations),
+        'units': [float(u) for u in units] if status == 'Optimal' else None
+    }
+
+# the csv files changed between building a request's cache key and solving it
+class CatalogChanged(RuntimeError):
+    pass
+
+# scenarios on the same project selection. with the tableau engine they are
+# pivoted together by BatchSimplexSolver, which takes the same pivots
+# SimplexSolver takes on each of them. targets the precheck rules out are
+# answered without a tableau, like solveLP does
+def solveBatch(task):
+    indices, costs, targets, engine, maxIter, version = task
+    catalog = PROBLEM['catalog']
+    catalog.refresh()
+    if catalog.index['matrix'] != version:
+        raise CatalogChanged("the project catalog changed while the request was queued, send it again")
+    A = np.asarray(catalog.problem(indices)[1], dtype=float).T
+    if engine != "tableau" or len(costs) == 1:
+        results = []
+        for costVectorC, targetPollutants in zip(costs, targets):
+            result = solveLP(costVectorC, A, targetPollutants, engine=engine, trace="off", maxIter=maxIter)
+            results.append(summary(result['status'], result['Z'], result['iterations'], result['basicSolution']))
+        return results
+    results = [None] * len(costs)
+    pending = []
+    for s, targetPollutants in enumerate(targets):
+        if precheck(A, targetPollutants)['status'] == 'Infeasible':
+            results[s] = summary('Infeasible', np.inf, 0, np.zeros(len(indices)))
+        else:
+            pending.append(s)
+    if pending:
+        limit = {} if maxIter is None else {'maxIter': maxIter}
+        batch = BatchSimplexSolver().solve(createTableauBatch(costs[pending], A, targets[pending]), len(indices),
+                                           **limit)
+        for i, s in enumerate(pending):
+            results[s] = summary(batch['status'][i], batch['Z'][i], batch['iterations'][i], batch['basicSolution'][i])
+    return results
+
+
+# asyncio front end over a warm process pool. identical requests that arrive
+# while one of them is still solving share its result, different requests on
+# the same project selection that arrive within batchWindow seconds are sent
+# to one worker as a single batch
+class SolveService:
+    def __init__(self, projectsPath='data/projects_matrix.csv', targetsPath='data/pollutant_targets.csv',
+                 catalogDir='.cache/catalog', workers=None, engine="tableau", batchWindow=0.002, maxBatch=64,
+                 cacheEntries=1024, maxBodyBytes=1 << 20, readTimeout=30.0):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}. Use one of {ENGINES}")
+        self.poolArgs = (projectsPath, targetsPath, catalogDir)
+        self.catalog = ProjectCatalog(projectsPath, targetsPath, storeDir=catalogDir)
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.batchWindow = batchWindow
+        self.maxBatch = maxBatch
+        self.maxBodyBytes = maxBodyBytes
+        self.readTimeout = readTimeout
+        self.cache = SolveCache(maxEntries=cacheEntries)
+        self.pool = None
+        self.inflight = {}
+        self.batches = {}
+        self.latencies = deque(maxlen=4096)
+        self.completed = deque()
+        self.counters = {'requests': 0, 'solved': 0, 'coalesced': 0, 'cacheHits': 0, 'errors': 0, 'batches': 0,
+                         'batchedScenarios': 0}
+        self.started = time.monotonic()
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=get_context(), initializer=initWorker,
+                                        initargs=self.poolArgs)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, warmUp, i) for i in range(self.workers)))
+        self.started = time.monotonic()
+        return self
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    # scenarios are read by utils.scenario.scenarioProblem like in cli.py,
+    # plus "engine" and "maxIter". version names the catalog matrix the
+    # arrays (and so the cache key) came from
+    def problem(self, scenario):
+        self.catalog.refresh()
+        names, indices, costVectorC, pollutantMatrix, targetPollutants = scenarioProblem(self.catalog, scenario)
+        engine = scenario.get("engine", self.engine)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}. Use one of {ENGINES}")
+        return (names, indices, costVectorC, pollutantMatrix, targetPollutants, engine, scenario.get("maxIter"),
+                self.catalog.index['matrix'])
+
+    async def solve(self, scenario):
+        started = time.perf_counter()
+        self.counters['requests'] += 1
+        try:
+            names, indices, costVectorC, pollutantMatrix, targetPollutants, engine, maxIter, version = \
+                self.problem(scenario)
+            key = self.cache.makeKey(names, costVectorC, pollutantMatrix.T, targetPollutants, engine=engine,
+                                     maxIter=maxIter)
+            result = self.cache.get(key)
+            if result is not None:
+                self.counters['cacheHits'] += 1
+            else:
+                task = self.inflight.get(key)
+                if task is not None:
+                    self.counters['coalesced'] += 1
+                else:
+                    task = self.enqueue(indices, costVectorC, targetPollutants, engine, maxIter, version)
+                    self.inflight[key] = task
+                    task.add_done_callback(lambda done: self.finish(key, done))
+                # a client that goes away must not cancel a solve others wait for
+                result = await asyncio.shield(task)
+        except Exception:
+            self.counters['errors'] += 1
+            raise
+        self.latencies.append(time.perf_counter() - started)
+        self.completed.append(time.monotonic())
+        return {
+            "id": scenario.get("id"),
+            "status": result['status'],
+            "Z": result['Z'],
+            "iterations": result['iterations'],
+            "units": None if result['units'] is None else {name: u for name, u in zip(names, result['units'])
+                                                            if u > 1e-9}
+        }
+
+    def finish(self, key, done):
+        del self.inflight[key]
+        if not done.cancelled() and done.exception() is None:
+            self.counters['solved'] += 1
+            self.cache.put(key, done.result())
+
+    # joins the open batch of this selection or opens one, which is sent
+    # when it is full or batchWindow after it was opened
+    def enqueue(self, indices, costVectorC, targetPollutants, engine, maxIter, version):
+        loop = asyncio.get_running_loop()
+        batchKey = (indices.tobytes(), engine, maxIter, version)
+        batch = self.batches.get(batchKey)
+        if batch is None:
+            batch = {'task': (indices, engine, maxIter, version), 'costs': [], 'targets': [], 'futures': []}
+            self.batches[batchKey] = batch
+            loop.call_later(self.batchWindow, self.flush, batchKey, batch)
+        future = loop.create_future()
+        batch['costs'].append(costVectorC)
+        batch['targets'].append(targetPollutants)
+        batch['futures'].append(future)
+        if len(batch['futures']) >= self.maxBatch:
+            self.flush(batchKey, batch)
+        return future
+
+    def flush(self, batchKey, batch):
+        # the timer of a batch that already went out because it was full
+        if self.batches.get(batchKey) is not batch:
+            return
+        del self.batches[batchKey]
+        self.counters['batches'] += 1
+        self.counters['batchedScenarios'] += len(batch['futures'])
+        indices, engine, maxIter, version = batch['task']
+        task = (indices, np.array(batch['costs']), np.array(batch['targets']), engine, maxIter, version)
+        work = asyncio.get_running_loop().run_in_executor(self.pool, solveBatch, task)
+        work.add_done_callback(lambda done: self.deliver(batch, done))
+
+    def deliver(self, batch, done):
+        error = done.exception()
+        for i, future in enumerate(batch['futures']):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[i])
+
+    def metrics(self):
+        now = time.monotonic()
+        while self.completed and self.completed[0] < now - 60:
+            self.completed.popleft()
+        window = min(60.0, now - self.started)
+        latencies = np.array(self.latencies) * 1000
+        metrics = dict(self.counters)
+        metrics['workers'] = self.workers
+        metrics['inflight'] = len(self.inflight)
+        metrics['queued'] = sum(len(batch['futures']) for batch in self.batches.values())
+        metrics['uptimeSeconds'] = now - self.started
+        # completed requests per second over the last minute
+        metrics['throughputPerSecond'] = len(self.completed) / window if window > 0 else 0.0
+        metrics['latencyMs'] = None
+        if len(latencies):
+            metrics['latencyMs'] = {
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'p99': float(np.percentile(latencies, 99)),
+                'max': float(latencies.max()),
+                'samples': len(latencies)
+            }
+        metrics['cache'] = self.cache.stats()
+        return metrics
+
+    # POST /solve takes one scenario or a list of them, GET /metrics and
+    # GET /health. answers are json, errors {"error": message}
+    async def route(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "workers": self.workers}
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics()
+        if path != "/solve":
+            return 404, {"error": f"no route {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST /solve"}
+        try:
+            payload = json.loads(body or b"{}")
+            if isinstance(payload, list):
+                # one bad scenario doesn't fail the others
+                results = await asyncio.gather(*(self.solve(scenario) for scenario in payload), return_exceptions=True)
+                return 200, [{"id": scenario.get("id") if isinstance(scenario, dict) else None, "error": str(result)}
+                             if isinstance(result, Exception) else result for scenario, result in zip(payload, results)]
+            return 200, await self.solve(payload)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except CatalogChanged as e:
+            return 409, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    # request line and headers, None on a closed connection. headers is None
+    # when there are more than MAX_HEADERS of them
+    async def readHead(self, reader):
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if not header.strip():
+                break
+            if len(headers) >= MAX_HEADERS:
+                return line.decode("latin-1").split(), None
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return line.decode("latin-1").split(), headers
+
+    # minimal http/1.1 with keep-alive, enough for the local client and curl.
+    # every read has readTimeout seconds (an idle keep-alive connection is
+    # closed after that) and bodies over maxBodyBytes are refused unread
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(self.readHead(reader), self.readTimeout)
+                except asyncio.TimeoutError:
+                    break
+                if head is None:
+                    break
+                parts, headers = head
+                keepAlive = headers is not None and headers.get("connection", "").lower() != "close"
+                length = int(headers.get("content-length", 0)) if headers is not None else 0
+                if headers is None:
+                    status, payload = 431, {"error": f"more than {MAX_HEADERS} headers"}
+                elif length < 0 or length > self.maxBodyBytes:
+                    status, payload, keepAlive = 413, {"error": f"body over {self.maxBodyBytes} bytes"}, False
+                else:
+                    try:
+                        body = await asyncio.wait_for(reader.readexactly(length), self.readTimeout)
+                    except asyncio.TimeoutError:
+                        body, keepAlive = None, False
+                    if body is None:
+                        status, payload = 408, {"error": "body not received in time"}
+                    elif len(parts) != 3:
+                        status, payload = 400, {"error": "malformed request line"}
+                    else:
+                        status, payload = await self.route(parts[0], parts[1].split("?")[0], body)
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keepAlive else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+MAX_HEADERS = 100
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout",
+               409: "Conflict", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+               500: "Internal Server Error"}
+
+# runs until cancelled, on a unix socket when socketPath is given
+async def serve(service, host="127.0.0.1", port=8765, socketPath=None, onReady=None):
+    await service.start()
+    try:
+        if socketPath is not None:
+            server = await asyncio.start_unix_server(service.handle, path=socketPath)
+        else:
+            server = await asyncio.start_server(service.handle, host, port)
+        if onReady is not None:
+            onReady(server)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        if socketPath is not None and os.path.exists(socketPath):
+            os.remove(socketPath)
@@ -0,0 +1,18 @@
+import numpy as np
+
+# random catalogs shaped like data/projects_matrix.csv: a few pollutants are
+# counted in much larger units than others, each project cuts some of them and
+# costs roughly in proportion to what it cuts. targets are a fraction of what
+# every project at its limit achieves, so every instance is feasible
+def generateProblem(numProjects, numPollutants, seed=0, upperBound=20.0, density=(0.2, 0.8)):
+    rng = np.random.default_rng([seed, numProjects, numPollutants])
+    scale = np.exp(rng.uniform(np.log(0.03), np.log(20), numPollutants))
+    mask = rng.random((numPollutants, numProjects)) < rng.uniform(*density, numProjects)
+    # every project reduces at least one pollutant
+    mask[rng.integers(numPollutants, size=numProjects), np.arange(numProjects)] = True
+    pollutantMatrixApoll = np.round(scale[:, None] * rng.lognormal(0.0, 1.0, mask.shape) * mask, 3)
+    value = (pollutantMatrixApoll / scale[:, None]).sum(axis=0)
+    costVectorC = np.round(100 * value * rng.lognormal(0.0, 0.5, numProjects) + 50, -1)
+    achievable = pollutantMatrixApoll @ np.full(numProjects, upperBound)
+    targetVectorBpoll = np.round(achievable * rng.uniform(0.08, 0.5, numPollutants), 2)
+    return costVectorC, pollutantMatrixApoll, targetVectorBpoll
@@ -0,0 +1,136 @@
+TRACE_MODES = ("off", "summary", "pivot-log", "full")
+
+# list-like view that only builds an item when it is indexed
+class LazyList:
+    def __init__(self, length, getItem):
+        self.length = length
+        self.getItem = getItem
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.getItem(i) for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("trace index out of range")
+        return self.getItem(index)
+
+    def __iter__(self):
+        for i in range(self.length):
+            yield self.getItem(i)
+
+# initial tableau plus the pivot steps, any iteration is rebuilt on demand
+class PivotLog:
+    def __init__(self, tableau, basis, applyStep):
+        self.initialTableau = tableau.copy()
+        self.initialBasis = basis.copy()
+        self.applyStep = applyStep
+        self.steps = []
+        # last rebuilt state, so stepping forward only replays one pivot
+        self.cached = (0, self.initialTableau.copy(), self.initialBasis.copy())
+
+    def record(self, step):
+        self.steps.append(step)
+
+    def __len__(self):
+        return len(self.steps) + 1
+
+    def state(self, k):
+        if not 0 <= k < len(self):
+            raise IndexError("pivot log index out of range")
+        start, tableau, basis = self.cached
+        if start > k:
+            start, tableau, basis = 0, self.initialTableau.copy(), self.initialBasis.copy()
+        else:
+            tableau, basis = tableau.copy(), basis.copy()
+        for step in self.steps[start:k]:
+            self.applyStep(tableau, basis, step)
+        self.cached = (k, tableau, basis)
+        return tableau.copy(), basis.copy()
+
+    def tableau(self, k):
+        return self.state(k)[0]
+
+    def nbytes(self):
+        return self.initialTableau.nbytes + self.initialBasis.nbytes + 16 * len(self.steps)
+
+# collects the per-iteration trace for the selected mode
+class TraceRecorder:
+    def __init__(self, mode, extractSol, applyStep, finalSol=None):
+        if mode not in TRACE_MODES:
+            raise ValueError(f"Unknown trace mode: {mode}. Use one of {TRACE_MODES}")
+        self.mode = mode
+        self.extractSol = extractSol
+        self.applyStep = applyStep
+        # the final row holds the solution of the minimization by default
+        self.finalSol = finalSol or (lambda tableau, basis: tableau[-1, :].copy())
+        self.tableauList = []
+        self.objectiveRowList = []
+        self.basicSolutions = []
+        self.pivotSummary = []
+        self.log = None
+
+    def start(self, tableau, basis):
+        if self.mode == "pivot-log":
+            self.log = PivotLog(tableau, basis, self.applyStep)
+
+    # state at the start of an iteration
+    def record(self, tableau, basis):
+        if self.mode == "full":
+            self.tableauList.append(tableau.copy())
+            self.objectiveRowList.append(tableau[-1, :].copy())
+            self.basicSolutions.append(self.extractSol(tableau, basis))
+
+    def recordPivot(self, step, entering, leaving, Z):
+        if self.mode == "summary":
+            self.pivotSummary.append({
+                "iteration": len(self.pivotSummary) + 1,
+                "entering": int(entering),
+                "leaving": int(leaving),
+                "Z": float(Z)
+            })
+        elif self.mode == "pivot-log":
+            self.log.record(step)
+
+    # a change of the tableau that isn't a pivot, only the pivot log replays it
+    def recordStep(self, step):
+        if self.mode == "pivot-log":
+            self.log.record(step)
+
+    # memory held by the trace so far
+    def nbytes(self):
+        if self.mode == "pivot-log":
+            return self.log.nbytes()
+        arrays = self.tableauList + self.objectiveRowList + self.basicSolutions
+        return sum(a.nbytes for a in arrays) + 32 * len(self.pivotSummary)
+
+    # trace entries for the result dict, finished adds the final tableau
+    def result(self, tableau, basis, finished):
+        if self.mode == "full" and finished:
+            self.tableauList.append(tableau.copy())
+            self.objectiveRowList.append(tableau[-1, :].copy())
+            self.basicSolutions.append(self.finalSol(tableau, basis))
+        trace = {
+            'tableauList': self.tableauList,
+            'objectiveRowList': self.objectiveRowList,
+            'basicSolutions': self.basicSolutions,
+            'pivotSummary': self.pivotSummary
+        }
+        if self.mode == "pivot-log":
+            log = self.log
+            length = len(log)
+
+            def basicSolution(k):
+                T, B = log.state(k)
+                if finished and k == length - 1:
+                    return self.finalSol(T, B)
+                return self.extractSol(T, B)
+
+            trace['tableauList'] = LazyList(length, log.tableau)
+            trace['objectiveRowList'] = LazyList(length, lambda k: log.tableau(k)[-1, :].copy())
+            trace['basicSolutions'] = LazyList(length, basicSolution)
+            trace['pivotLog'] = log
+        return trace